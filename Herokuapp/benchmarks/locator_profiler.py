@@ -0,0 +1,318 @@
+"""
+Locator profiler for page objects
+Times every locator of every page-object class against saved DOM snapshots or live pages,
+flags slow and ambiguous locators and suggests CSS selectors proven to match the same nodes
+"""
+
+import argparse
+import glob
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import re
+import statistics
+import sys
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from selenium.webdriver.common.by import By  # noqa: E402
+from utils.log_decorators import LoggingMixin  # noqa: E402
+
+DEFAULT_PACKAGES = ['pages']
+
+# Strategies whose locators get a CSS suggestion, id and CSS locators are already fast
+SUGGEST_FOR = (By.XPATH, By.LINK_TEXT, By.PARTIAL_LINK_TEXT, By.NAME, By.CLASS_NAME, By.TAG_NAME)
+
+# Times every locator in the page: {name: {count, ms, candidates, checks}}.
+# candidates are CSS selectors built from the matched nodes, checks tell for each given CSS selector
+# whether it matches exactly the same nodes in the same order, and how long it takes
+PROFILE_SCRIPT = """
+var locators = arguments[0], repeat = arguments[1], results = {};
+var STABLE_ATTRIBUTES = ['name', 'data-testid', 'data-test', 'data-component-type', 'aria-label', 'href',
+                         'type', 'for', 'title', 'placeholder', 'role', 'alt', 'value'];
+function find(by, value) {
+    switch (by) {
+        case 'id': return Array.from(document.querySelectorAll('[id="' + CSS.escape(value) + '"]'));
+        case 'css selector': return Array.from(document.querySelectorAll(value));
+        case 'name': return Array.from(document.getElementsByName(value));
+        case 'class name': return Array.from(document.getElementsByClassName(value));
+        case 'tag name': return Array.from(document.getElementsByTagName(value));
+        case 'link text':
+        case 'partial link text':
+            return Array.prototype.filter.call(document.getElementsByTagName('a'), function (link) {
+                var text = link.innerText.trim();
+                return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+            });
+        case 'xpath':
+            var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+            return nodes;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+function median(run) {
+    var times = [];
+    for (var i = 0; i < repeat; i++) {
+        var started = performance.now();
+        run();
+        times.push(performance.now() - started);
+    }
+    times.sort(function (a, b) { return a - b; });
+    return times[Math.floor(times.length / 2)];
+}
+function quote(value) { return '"' + value.replace(/\\\\/g, '\\\\\\\\').replace(/"/g, '\\\\"') + '"'; }
+function ownSelectors(element) {
+    var tag = element.tagName.toLowerCase(), selectors = [];
+    if (element.id) { selectors.push(tag + '#' + CSS.escape(element.id)); }
+    STABLE_ATTRIBUTES.forEach(function (attribute) {
+        var value = element.getAttribute(attribute);
+        if (value && value.length <= 80) { selectors.push(tag + '[' + attribute + '=' + quote(value) + ']'); }
+    });
+    if (element.classList.length) {
+        selectors.push(tag + Array.from(element.classList).map(function (name) { return '.' + CSS.escape(name); }).join(''));
+    }
+    return selectors;
+}
+function candidates(element) {
+    var tag = element.tagName.toLowerCase(), own = ownSelectors(element), found = own.slice();
+    var ancestor = element.parentElement;
+    for (var depth = 0; ancestor && ancestor !== document.body && depth < 6; depth++) {
+        ownSelectors(ancestor).slice(0, 3).forEach(function (scope) {
+            found.push(scope + ' ' + tag);
+            own.slice(0, 3).forEach(function (selector) { found.push(scope + ' ' + selector); });
+        });
+        ancestor = ancestor.parentElement;
+    }
+    return found.slice(0, 40);
+}
+function sameNodes(first, second) {
+    if (first.length !== second.length) { return false; }
+    for (var i = 0; i < first.length; i++) { if (first[i] !== second[i]) { return false; } }
+    return true;
+}
+locators.forEach(function (locator) {
+    var name = locator[0], by = locator[1], value = locator[2], result = {checks: {}};
+    try {
+        var nodes = find(by, value);
+        result.count = nodes.length;
+        result.ms = median(function () { find(by, value); });
+        result.candidates = nodes.length && locator[4] ? candidates(nodes[0]) : [];
+        locator[3].forEach(function (selector) {
+            try {
+                var same = sameNodes(nodes, Array.from(document.querySelectorAll(selector)));
+                result.checks[selector] = [same, median(function () { document.querySelectorAll(selector); })];
+            } catch (error) {
+                result.checks[selector] = [false, null];
+            }
+        });
+    } catch (error) {
+        result.error = String(error);
+    }
+    results[name] = result;
+});
+return results;
+"""
+
+# Copy of the document without scripts, so a saved snapshot renders the same DOM offline
+SNAPSHOT_SCRIPT = """
+var copy = document.documentElement.cloneNode(true);
+copy.querySelectorAll('script, noscript').forEach(function (node) { node.remove(); });
+return '<!DOCTYPE html>\\n' + copy.outerHTML;
+"""
+
+_LOCATOR_STRATEGIES = {value for name, value in vars(By).items() if name.isupper() and isinstance(value, str)}
+_XPATH_STEP = re.compile(r"(//|/)([a-zA-Z][\w-]*|\*)((?:\[[^\]]+\])*)")
+_XPATH_PREDICATE = re.compile(r"\[([^\]]+)\]")
+
+
+def page_locators(package: str) -> List[Tuple[str, Tuple[str, str]]]:
+    """("module.Class.NAME", locator) of every (By, value) class attribute of the classes in a package"""
+    found = []
+    root = importlib.import_module(package)
+    modules = [root] + [importlib.import_module(info.name)
+                        for info in pkgutil.walk_packages(root.__path__, f"{package}.")]
+    for module in modules:
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for attribute, value in vars(cls).items():
+                if (isinstance(value, tuple) and len(value) == 2 and value[0] in _LOCATOR_STRATEGIES
+                        and isinstance(value[1], str)):
+                    found.append((f"{module.__name__}.{class_name}.{attribute}", value))
+    return found
+
+
+def xpath_to_css(xpath: str) -> Optional[str]:
+    """Direct CSS translation of an XPath made of tag steps and attribute predicates, None otherwise"""
+    css, position = [], 0
+    for match in _XPATH_STEP.finditer(xpath):
+        if match.start() != position:
+            return None
+        axis, tag, predicates = match.groups()
+        if css:
+            css.append(" " if axis == "//" else " > ")
+        elif axis != "//":
+            return None
+        step = "" if tag == "*" else tag
+        for predicate in _XPATH_PREDICATE.findall(predicates):
+            attribute = re.fullmatch(r"\s*@([\w-]+)\s*(?:=\s*(['\"])(.*?)\2\s*)?", predicate)
+            contains = re.fullmatch(r"\s*contains\(\s*@([\w-]+)\s*,\s*(['\"])(.*?)\2\s*\)\s*", predicate)
+            if attribute and attribute.group(3) is not None:
+                step += f'[{attribute.group(1)}="{attribute.group(3)}"]'
+            elif attribute:
+                step += f"[{attribute.group(1)}]"
+            elif contains:
+                step += f'[{contains.group(1)}*="{contains.group(3)}"]'
+            else:
+                return None
+        css.append(step or "*")
+        position = match.end()
+    return "".join(css) if css and position == len(xpath) else None
+
+
+def resolve_sources(sources: List[str]) -> List[str]:
+    """URLs as given, snapshot directories expanded to their .html files, files as file:// URLs"""
+    urls = []
+    for source in sources:
+        if re.match(r"^(https?|file)://", source):
+            urls.append(source)
+        elif os.path.isdir(source):
+            urls.extend(f"file://{os.path.abspath(path)}" for path in sorted(glob.glob(os.path.join(source, "*.html"))))
+        else:
+            urls.append(f"file://{os.path.abspath(source)}")
+    return urls
+
+
+def save_snapshot(driver, url: str, directory: str) -> str:
+    """Save the DOM of a live page without its scripts, for profiling it again offline"""
+    driver.get(url)
+    name = re.sub(r"[^\w.-]+", "_", re.sub(r"^https?://", "", url)).strip("_")[:100] or "page"
+    path = os.path.join(directory, f"{name}.html")
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(driver.execute_script(SNAPSHOT_SCRIPT))
+    return path
+
+
+class LocatorProfiler(LoggingMixin):
+    """Times locators in the browser and proves CSS replacements on every profiled page"""
+
+    def __init__(self, driver, repeat: int = 25, slow_ms: float = 1.0):
+        self.driver = driver
+        self.repeat = repeat
+        self.slow_ms = slow_ms
+
+    def profile(self, locators: List[Tuple[str, Tuple[str, str]]], urls: List[str]) -> List[Dict[str, object]]:
+        """Per-locator timings on every page, flags and CSS suggestions, slowest first"""
+        static = {name: xpath_to_css(value) for name, (by, value) in locators if by == By.XPATH}
+        candidates = {name: set(filter(None, [static.get(name)])) for name, _ in locators}
+        for url in urls:
+            self.driver.get(url)
+            for name, result in self._run(locators, {}, True).items():
+                candidates[name].update(result.get("candidates", []))
+
+        # Second pass checks every candidate on every page, a suggestion must match the same nodes on all
+        checks = {name: sorted(found) for name, found in candidates.items()}
+        pages = {}
+        for url in urls:
+            self.driver.get(url)
+            pages[url] = self._run(locators, checks, False)
+        return sorted((self._summarise(name, locator, checks[name], pages) for name, locator in locators),
+                      key=lambda entry: entry["ms"] or 0, reverse=True)
+
+    def _run(self, locators, checks: Dict[str, List[str]], generate: bool) -> Dict[str, dict]:
+        return self.driver.execute_script(
+            PROFILE_SCRIPT,
+            [[name, by, value, checks.get(name, []), generate and by in SUGGEST_FOR] for name, (by, value) in locators],
+            self.repeat)
+
+    def _summarise(self, name: str, locator: Tuple[str, str], candidates: List[str],
+                   pages: Dict[str, Dict[str, dict]]) -> Dict[str, object]:
+        results = {url: result[name] for url, result in pages.items()}
+        matched = {url: result for url, result in results.items() if result.get("count")}
+        timings = [result["ms"] for result in matched.values()]
+        flags = []
+        errors = [result["error"] for result in results.values() if "error" in result]
+        if errors:
+            flags.append(f"invalid: {errors[0]}")
+        elif not matched:
+            flags.append("unmatched")
+        if timings and max(timings) > self.slow_ms:
+            flags.append("slow")
+        if any(result["count"] > 1 for result in matched.values()):
+            flags.append("ambiguous")
+
+        suggestion = None
+        if matched and locator[0] in SUGGEST_FOR:
+            proven = [selector for selector in candidates
+                      if all(result["checks"].get(selector, (False,))[0] for result in results.values())]
+            if proven:
+                # Fastest of the proven selectors, the shorter one on equal timing
+                selector = min(proven, key=lambda css: (max(result["checks"][css][1] or 0
+                                                                for result in matched.values()), len(css)))
+                suggestion = {"css": selector,
+                              "ms": max(result["checks"][selector][1] or 0 for result in matched.values())}
+        return {
+            "locator": name,
+            "by": locator[0],
+            "value": locator[1],
+            "ms": statistics.median(timings) if timings else None,
+            "matches": {url: result.get("count", 0) for url, result in results.items()},
+            "flags": flags,
+            "suggestion": suggestion,
+        }
+
+
+def print_results(entries: List[Dict[str, object]]) -> None:
+    print(f"{'LOCATOR':<60} {'MS':>8} {'NODES':>6}  FLAGS")
+    for entry in entries:
+        ms = f"{entry['ms']:.3f}" if entry["ms"] is not None else "-"
+        nodes = max(entry["matches"].values(), default=0)
+        print(f"{entry['locator']:<60} {ms:>8} {nodes:>6}  {', '.join(entry['flags'])}")
+        if entry["suggestion"]:
+            print(f"    {entry['by']}={entry['value']}")
+            print(f"    -> css selector={entry['suggestion']['css']} ({entry['suggestion']['ms']:.3f}ms)")
+
+
+def main():
+    """Main function to handle command line arguments"""
+    parser = argparse.ArgumentParser(description='Page-object locator profiler')
+    parser.add_argument('sources', nargs='+',
+                        help='Saved DOM snapshots (.html files or directories of them) or live page URLs')
+    parser.add_argument('--package', action='append',
+                        help='Package with page-object classes, repeatable (default: ' + ', '.join(DEFAULT_PACKAGES) + ')')
+    parser.add_argument('--save-snapshots', metavar='DIR',
+                        help='Save the DOM of every live URL to DIR and profile the saved copies')
+    parser.add_argument('--repeat', type=int, default=25, help='Evaluations per locator, the median is reported')
+    parser.add_argument('--slow-ms', type=float, default=1.0, help='Flag locators slower than this')
+    parser.add_argument('--browser', default='chrome', choices=['chrome', 'firefox'])
+    parser.add_argument('--report', default='reports/locator_profile.json', help='JSON report path')
+    args = parser.parse_args()
+
+    from utils.driver_factory import create_driver, quit_driver
+    locators = [locator for package in args.package or DEFAULT_PACKAGES for locator in page_locators(package)]
+    driver = create_driver(args.browser, headless=True)
+    try:
+        urls = resolve_sources(args.sources)
+        if args.save_snapshots:
+            urls = resolve_sources([save_snapshot(driver, url, args.save_snapshots) if url.startswith("http") else url
+                                    for url in urls])
+        entries = LocatorProfiler(driver, args.repeat, args.slow_ms).profile(locators, urls)
+    finally:
+        quit_driver(driver)
+
+    print_results(entries)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as file:
+        json.dump(entries, file, indent=2)
+    print(f"\nReport saved: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
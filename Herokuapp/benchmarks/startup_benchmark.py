@@ -0,0 +1,115 @@
+"""
+Startup benchmark for pytest runs
+Measures wall time and python -X importtime totals of a collection-only run and a run of the API tests,
+optionally against another git revision to show the time saved
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scenario name -> pytest arguments; api-only runs the tests, so the browser-free startup path is measured end to end
+SCENARIOS = {
+    "collect-only": ["tests/", "--collect-only", "-q"],
+    "api-only": ["tests/test_api_integration.py", "-m", "api", "-q"]
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """Total import time and cumulative time per top-level module, in ms"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented, their time is already in the parent's cumulative time
+        if name.startswith("  "):
+            continue
+        modules[name.strip()] = modules.get(name.strip(), 0) + int(cumulative) / 1000
+    return sum(modules.values()), modules
+
+
+def run_scenario(project_dir: str, args: List[str], repeat: int) -> Dict[str, object]:
+    cmd = [sys.executable, "-X", "importtime", "-m", "pytest", "-p", "no:cacheprovider"] + args
+    wall_times, import_totals, modules = [], [], {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(cmd, cwd=project_dir, capture_output=True, text=True)
+        wall_times.append((time.perf_counter() - started) * 1000)
+        total, modules = parse_importtime(result.stderr)
+        import_totals.append(total)
+    top = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "wall_ms": statistics.median(wall_times),
+        "import_ms": statistics.median(import_totals),
+        "top_modules": top,
+        "exit_code": result.returncode
+    }
+
+
+def run_benchmark(project_dir: str, repeat: int) -> Dict[str, Dict[str, object]]:
+    return {name: run_scenario(project_dir, args, repeat) for name, args in SCENARIOS.items()}
+
+
+def checkout_revision(ref: str) -> Tuple[str, str]:
+    """Create a temporary worktree at ref, returns worktree path and project dir inside it"""
+    top_level = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=PROJECT_DIR, check=True,
+                               capture_output=True, text=True).stdout.strip()
+    worktree = tempfile.mkdtemp(prefix="startup-benchmark-")
+    subprocess.run(["git", "worktree", "add", "--detach", worktree, ref], cwd=top_level, check=True,
+                   capture_output=True)
+    return worktree, os.path.join(worktree, os.path.relpath(PROJECT_DIR, top_level))
+
+
+def remove_revision(worktree: str) -> None:
+    subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=PROJECT_DIR, capture_output=True)
+    shutil.rmtree(worktree, ignore_errors=True)
+
+
+def print_results(current: Dict[str, Dict[str, object]], baseline: Dict[str, Dict[str, object]] = None,
+                  show_modules: bool = False) -> None:
+    for name, result in current.items():
+        line = f"{name:<14} wall {result['wall_ms']:>8.1f}ms   imports {result['import_ms']:>8.1f}ms"
+        if baseline:
+            before = baseline[name]
+            line += (f"   (baseline wall {before['wall_ms']:.1f}ms, imports {before['import_ms']:.1f}ms, "
+                     f"saved {before['wall_ms'] - result['wall_ms']:.1f}ms)")
+        if result["exit_code"] not in (0, 5):
+            line += f"   [pytest exit code {result['exit_code']}]"
+        print(line)
+        if show_modules:
+            for module, duration in result["top_modules"]:
+                print(f"    {duration:>8.1f}ms  {module}")
+
+
+def main():
+    """Main function to handle command line arguments"""
+    parser = argparse.ArgumentParser(description='pytest startup benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per scenario, the median is reported')
+    parser.add_argument('--compare-ref', help='Git revision to compare against, e.g. HEAD~1')
+    parser.add_argument('--modules', action='store_true', help='Show slowest top-level imports')
+    args = parser.parse_args()
+
+    current = run_benchmark(PROJECT_DIR, args.repeat)
+    baseline = None
+    if args.compare_ref:
+        worktree, baseline_dir = checkout_revision(args.compare_ref)
+        try:
+            baseline = run_benchmark(baseline_dir, args.repeat)
+        finally:
+            remove_revision(worktree)
+
+    print_results(current, baseline, args.modules)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
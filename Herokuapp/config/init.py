@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.logger import LoggerConfig
 
 
@@ -50,6 +50,82 @@ class Config:
             'password': self.get('db_password')
         }
 
+    @property
+    def db_slow_query_ms(self) -> float:
+        return self.get('db_slow_query_ms', 200)
+
+    @property
+    def db_notify_tables(self) -> list:
+        return self.get('db_notify_tables', [])
+
+    @property
+    def wiremock_mode(self) -> str:
+        return self.get('wiremock_mode', 'external')
+
+    @property
+    def wiremock_url(self) -> str:
+        return self.get('wiremock_url', 'http://localhost:8080')
+
+    @property
+    def wiremock_session_stubs(self) -> list:
+        return self.get('wiremock_session_stubs', [])
+
+    @property
+    def browser_profile(self) -> str:
+        return self.get('browser_profile')
+
+    @property
+    def browser_profiles(self) -> dict:
+        return self.get('browser_profiles', {})
+
+    @property
+    def browser_cache_mode(self) -> str:
+        return self.get('browser_cache_mode', 'cold')
+
+    @property
+    def browser_template_dir(self) -> str:
+        return self.get('browser_template_dir', 'reports/browser-template')
+
+    @property
+    def browser_shared_cache(self) -> bool:
+        return self.get('browser_shared_cache', True)
+
+    @property
+    def browser_warmup_urls(self) -> list:
+        return self.get('browser_warmup_urls', [self.base_url])
+
+    @property
+    def driver_service_reuse(self) -> bool:
+        return self.get('driver_service_reuse', True)
+
+    @property
+    def driver_mode(self) -> str:
+        return self.get('driver_mode', 'browser')
+
+    @property
+    def shared_browser_dir(self) -> str:
+        return self.get('shared_browser_dir', 'reports/shared-browser')
+
+    @property
+    def driver_async_quit(self) -> bool:
+        return self.get('driver_async_quit', True)
+
+    @property
+    def driver_quit_timeout(self) -> float:
+        return self.get('driver_quit_timeout', 10)
+
+    @property
+    def test_hang_timeout(self) -> Optional[float]:
+        return self.get('test_hang_timeout')
+
+    @property
+    def browser_reuse(self) -> bool:
+        return self.get('browser_reuse', False)
+
+    @property
+    def browser_memory_limits(self) -> dict:
+        return self.get('browser_memory_limits', {})
+
     @property
     def log_level(self) -> str:
-        return self.get('logging', {}).get('level', 'INFO')
\ No newline at end of file
+        return self.get('logging', {}).get('level', 'INFO')
@@ -1,16 +1,15 @@
 import pytest
-import allure
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from config.init import Config
-from services.database_service import DatabaseService
-from services.wiremock_service import WireMockService
 import os
 import time
 from utils.log_decorators import LoggerConfig
-from pages.iframe_page import IFramePage
+from utils.resource_monitor import WorkerThrottle
+from utils.report_paths import reports_path
 
+# Selenium, allure, database and page modules are imported inside the fixtures that use them,
+# so collection-only and API-only runs do not pay for them at startup
+
+pytest_plugins = ["utils.pytest_scheduling", "utils.pytest_selection"]
 
 # Logging is now automatically configured via Config class
 
@@ -25,6 +24,22 @@ def pytest_addoption(parser):
     parser.addoption(
         "--headless", action="store_true", help="Run tests in headless mode"
     )
+    parser.addoption(
+        "--browser-profile", action="store", default=None,
+        help="Browser launch profile: fast-headless, debug, parity or one defined in config"
+    )
+    parser.addoption(
+        "--browser-cache", action="store", default=None, choices=["warm", "cold"],
+        help="warm: start from a copy of a pre-built profile sharing one HTTP cache, cold: empty temporary profile"
+    )
+    parser.addoption(
+        "--driver-mode", action="store", default=None, choices=["browser", "context"],
+        help="browser: a browser per test, context: an isolated context per test in one shared Chrome"
+    )
+    parser.addoption(
+        "--wiremock-mode", action="store", default=None, choices=["embedded", "external"],
+        help="WireMock: embedded in-process mock server or external WireMock container"
+    )
     # Use a different name to avoid conflict
     parser.addoption(
         "--log-level-pytest", action="store", default="INFO",
@@ -50,55 +65,147 @@ def config(request):
     return config_obj
 
 
+@pytest.fixture(scope="session")
+def driver_reaper(config):
+    """Background teardown of browser sessions, reports browser processes leaked by this worker"""
+    from utils.driver_reaper import DriverReaper
+    reaper = DriverReaper(config.driver_quit_timeout).start()
+    yield reaper
+    reaper.stop()
+
+
+@pytest.fixture(scope="session")
+def driver_services(config, driver_reaper):
+    """Driver services shared by all sessions of this worker, stopped at the end of the run"""
+    yield config.driver_service_reuse
+    # Sessions still being quit need their service
+    driver_reaper.drain()
+    if config.driver_service_reuse:
+        from utils.driver_factory import shutdown_services
+        shutdown_services()
+
+
+@pytest.fixture(scope="session")
+def browser_context_pool(request, config, driver_reaper, driver_services):
+    """Shared Chrome for context driver mode, None when every test starts its own browser"""
+    from utils.browser_contexts import BrowserContextPool, SharedBrowser
+    from utils.driver_factory import resolve_profile
+    logger = LoggerConfig.get_logger(__name__)
+
+    mode = request.config.getoption("--driver-mode") or config.driver_mode
+    browser = request.config.getoption("--browser")
+    if mode != "context":
+        yield None
+        return
+    if browser.lower() != "chrome":
+        logger.warning(f"Context driver mode needs Chrome, starting a {browser} browser per test")
+        yield None
+        return
+
+    headless = request.config.getoption("--headless") or config.get('headless', False)
+    profile_name = (request.config.getoption("--browser-profile") or config.browser_profile
+                    or ("fast-headless" if headless else "debug"))
+    shared_browser = SharedBrowser(config.shared_browser_dir, resolve_profile(profile_name, config.browser_profiles),
+                                   headless)
+    pool = BrowserContextPool(shared_browser, reuse_service=driver_services).start()
+    # Other workers may still use the shared browser when this one finishes
+    driver_reaper.keep(shared_browser.state["pid"])
+    try:
+        yield pool
+    finally:
+        driver_reaper.drain()
+        pool.stop()
+
+
+@pytest.fixture(scope="session")
+def browser_memory(config):
+    """Browser memory sampled around every test, per-test deltas saved in reports/browser_memory.json"""
+    from utils.browser_memory import BrowserMemoryMonitor
+    monitor = BrowserMemoryMonitor(**config.browser_memory_limits)
+    yield monitor
+    monitor.write_report()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def wait_stats():
+    """Polls used by every page wait, summarised by wait in reports/wait_stats.json"""
+    from utils.adaptive_wait import wait_stats
+    yield wait_stats
+    wait_stats.write_report()
+
+
+@pytest.fixture(scope="session")
+def reusable_browser(driver_reaper, driver_services):
+    """Browser this worker keeps between tests when browser_reuse is on"""
+    from utils.browser_memory import ReusableBrowser
+    from utils.driver_factory import quit_driver
+    kept = ReusableBrowser()
+    yield kept
+    driver = kept.take()
+    if driver is not None:
+        driver_reaper.submit(driver, quit_driver)
+
+
 @pytest.fixture
-def driver(request, config):
+def driver(request, config, driver_reaper, driver_services, browser_context_pool, browser_memory,
+           reusable_browser):
     """WebDriver fixture with custom options"""
+    from utils.driver_factory import create_driver, quit_driver, resolve_profile
+    from utils.warm_profile import WarmProfile
     logger = LoggerConfig.get_logger(__name__)
 
     browser = request.config.getoption("--browser")
     headless = request.config.getoption("--headless") or config.get('headless', False)
-
-    logger.info(f"Initializing {browser} browser (headless: {headless})")
-
-    if browser.lower() == "chrome":
-        options = Options()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-extensions")
-
-        driver = webdriver.Chrome(options=options)
-    elif browser.lower() == "firefox":
-        options = FirefoxOptions()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--width=1920")
-        options.add_argument("--height=1080")
-
-        driver = webdriver.Firefox(options=options)
+    profile_name = (request.config.getoption("--browser-profile") or config.browser_profile
+                    or ("fast-headless" if headless else "debug"))
+
+    # Performance tests marked cold_browser always measure cold loads
+    cache_mode = "cold" if request.node.get_closest_marker("cold_browser") else \
+        (request.config.getoption("--browser-cache") or config.browser_cache_mode)
+    warm_profile = None
+    if cache_mode == "warm":
+        warm_profile = WarmProfile(browser, config.browser_template_dir, config.browser_warmup_urls,
+                                   shared_cache=config.browser_shared_cache)
+
+    logger.info(f"Initializing {browser} browser (headless: {headless}, profile: {profile_name}, "
+                f"cache: {cache_mode})")
+
+    # Tests that need a cold start never share a browser
+    reuse = (config.browser_reuse and browser_context_pool is None
+             and not request.node.get_closest_marker("cold_browser"))
+    driver = reusable_browser.take() if reuse else None
+    if driver is not None:
+        logger.info(f"Reusing browser, {reusable_browser.tests} tests run in it")
+    elif browser_context_pool is not None:
+        driver = browser_context_pool.open()
     else:
-        raise ValueError(f"Unsupported browser: {browser}")
-
+        # A kept browser this test does not reuse (cold_browser) would otherwise leak its session
+        kept = reusable_browser.take()
+        if kept is not None:
+            driver_reaper.submit(kept, quit_driver)
+        driver = create_driver(browser, resolve_profile(profile_name, config.browser_profiles), headless,
+                               warm_profile, reuse_service=driver_services)
+        reusable_browser.reset()
     driver.implicitly_wait(config.get('timeout', 10))
-    driver.maximize_window()
 
     logger.info("WebDriver initialized successfully")
 
+    own_processes = browser_context_pool is None
+    memory_before = browser_memory.sample(driver, own_processes)
+
     yield driver
 
     # Take screenshot on test failure
     if hasattr(request.node, 'rep_call') and request.node.rep_call.failed:
         try:
-            screenshot_dir = "reports/screenshots"
+            screenshot_dir = reports_path("screenshots")
             os.makedirs(screenshot_dir, exist_ok=True)
             screenshot_path = os.path.join(
                 screenshot_dir,
                 f"{request.node.name}_{int(time.time())}.png"
             )
             driver.save_screenshot(screenshot_path)
+            import allure
             allure.attach.file(
                 screenshot_path,
                 name="failure_screenshot",
@@ -108,33 +215,106 @@ def driver(request, config):
         except Exception as e:
             logger.error(f"Failed to take screenshot: {e}")
 
-    driver.quit()
-    logger.info("WebDriver closed")
+    from utils.request_interceptor import RequestInterceptor
+    RequestInterceptor.release(driver)
+    tests_in_browser = reusable_browser.tests + 1 if reuse else 1
+    memory_after = browser_memory.sample(driver, own_processes)
+    browser_memory.record(request.node.nodeid, memory_before, memory_after, tests_in_browser)
+    if reuse:
+        failed = hasattr(request.node, 'rep_call') and request.node.rep_call.failed
+        recycle_reason = "test failed" if failed else browser_memory.over_limit(memory_after, tests_in_browser)
+        if recycle_reason is None and reusable_browser.keep(driver):
+            return
+        logger.info(f"Recycling browser: {recycle_reason or 'state not cleared'}")
+        reusable_browser.reset()
+
+    close = browser_context_pool.close if browser_context_pool is not None else quit_driver
+    if config.driver_async_quit:
+        # The next test starts while this session quits in the background
+        driver_reaper.submit(driver, close, own_processes)
+        logger.info("WebDriver queued for teardown")
+    else:
+        close(driver)
+        logger.info("WebDriver closed")
 
 
 @pytest.fixture(scope="session")
 def database_service(config):
     """Database service fixture"""
+    from services.database_service import DatabaseService
     logger = LoggerConfig.get_logger(__name__)
-    service = DatabaseService(config.db_config)
+    service = DatabaseService(config.db_config, slow_query_threshold_ms=config.db_slow_query_ms)
     try:
         service.connect()
         logger.info("Database service connected")
+        if config.db_notify_tables:
+            try:
+                service.install_change_notifications(config.db_notify_tables)
+            except Exception as e:
+                logger.warning(f"Change notifications not installed, waits will poll: {e}")
         yield service
     finally:
-        service.disconnect()
-        logger.info("Database service disconnected")
+        try:
+            service.remove_change_notifications()
+        except Exception as e:
+            logger.warning(f"Change notification triggers not removed: {e}")
+        try:
+            service.write_query_report()
+        finally:
+            service.disconnect()
+            logger.info("Database service disconnected")
+
+
+@pytest.fixture(scope="session")
+def wiremock_url(request, config):
+    """WireMock base URL, starting an embedded mock server for this worker when configured"""
+    logger = LoggerConfig.get_logger(__name__)
+    mode = request.config.getoption("--wiremock-mode") or config.wiremock_mode
+    if mode != "embedded":
+        yield config.wiremock_url
+        return
+
+    from services.embedded_mock_server import EmbeddedMockServer
+    server = EmbeddedMockServer().start()
+    logger.info(f"Embedded mock server used for WireMock: {server.base_url}")
+    try:
+        yield server.base_url
+    finally:
+        server.stop()
+
+
+@pytest.fixture(scope="session")
+def wiremock_session_stubs(config, wiremock_url):
+    """Register stubs shared by the whole session once, in a single import call"""
+    logger = LoggerConfig.get_logger(__name__)
+    stub_files = config.wiremock_session_stubs
+    if stub_files:
+        from services.wiremock_service import WireMockService
+        service = WireMockService(wiremock_url)
+        try:
+            # Session stubs carry no test scope, so per-test cleanup never removes them
+            service.import_stub_files(*stub_files)
+        except Exception as e:
+            logger.warning(f"Failed to register session WireMock stubs: {e}")
+        finally:
+            service.session.close()
+    return stub_files
 
 
 @pytest.fixture
-def wiremock_service():
-    """WireMock service fixture"""
+def wiremock_service(request, wiremock_url, wiremock_session_stubs):
+    """WireMock service fixture scoped to the current test and xdist worker"""
+    from services.wiremock_service import WireMockService
     logger = LoggerConfig.get_logger(__name__)
-    service = WireMockService()
+    scope = {
+        "worker": os.environ.get("PYTEST_XDIST_WORKER", "master"),
+        "test": request.node.nodeid
+    }
+    service = WireMockService(wiremock_url, scope=scope)
     logger.info("WireMock service initialized")
     yield service
-    # Cleanup: reset mappings after each test
-    service.reset_mappings()
+    # Cleanup: remove only this test's mappings so parallel workers keep their stubs
+    service.remove_scoped_stubs()
     logger.info("WireMock service cleanup completed")
 
 
@@ -148,6 +328,17 @@ def pytest_runtest_makereport(item, call):
     setattr(item, "rep_" + rep.when, rep)
 
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Hold a worker slot while the test runs so run_tests.py can lower concurrency under memory pressure"""
+    throttle = WorkerThrottle.from_env()
+    if throttle is None:
+        yield
+        return
+    with throttle:
+        yield
+
+
 # Custom markers
 def pytest_configure(config):
     """Register custom markers"""
@@ -166,6 +357,36 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "wiremock: tests using wiremock"
     )
+    config.addinivalue_line(
+        "markers", "cold_browser: start the browser from an empty profile and cache"
+    )
+    config.addinivalue_line(
+        "markers", "hang_timeout(seconds): fail the test and kill its browser after this many seconds"
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Abort the test when its body runs past its hang deadline (hang_timeout marker, otherwise test_hang_timeout
+    of the config fixture when the test's fixtures load it). Only the call phase is watched, so an abort is always reported
+    as a test failure and never lands in fixture setup or teardown"""
+    marker = item.get_closest_marker("hang_timeout")
+    timeout = marker.args[0] if marker else getattr(item.funcargs.get("config"), "test_hang_timeout", None)
+    if not timeout:
+        yield
+        return
+
+    from utils.hang_watchdog import HangWatchdog
+    watchdog = HangWatchdog(item.nodeid, timeout, lambda: item.funcargs.get("driver")).start()
+    try:
+        yield
+    finally:
+        watchdog.cancel()
+
+    if watchdog.fired:
+        import allure
+        for path in watchdog.artifacts:
+            allure.attach.file(path, name=os.path.basename(path))
 
 
 @pytest.fixture(autouse=True)
@@ -179,6 +400,7 @@ def log_test_execution(request):
 @pytest.fixture
 def iframe_page(driver, config):
     """IFrame page fixture"""
+    from pages.iframe_page import IFramePage
     logger = LoggerConfig.get_logger(__name__)
 
     page = IFramePage(driver)
@@ -10,8 +10,8 @@ class DynamicLoadingPage(BasePage):
     START_BUTTON = (By.CSS_SELECTOR, "#start button")
     LOADING_INDICATOR = (By.ID, "loading")
     FINISH_TEXT = (By.ID, "finish")
-    EXAMPLE_1_LINK = (By.XPATH, "//a[contains(text(),'Example 1')]")
-    EXAMPLE_2_LINK = (By.XPATH, "//a[contains(text(),'Example 2')]")
+    EXAMPLE_1_LINK = (By.CSS_SELECTOR, "a[href='/dynamic_loading/1']")
+    EXAMPLE_2_LINK = (By.CSS_SELECTOR, "a[href='/dynamic_loading/2']")
 
     def __init__(self, driver):
         super().__init__(driver)
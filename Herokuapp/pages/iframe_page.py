@@ -44,8 +44,7 @@ class IFramePage(BasePage):
     def switch_to_iframe(self) -> None:
         """Switch to the text editor iframe"""
         try:
-            iframe_element = self.wait_for_element(self.IFRAME)
-            self.driver.switch_to.frame(iframe_element)
+            self.switch_to_frame(self.IFRAME)
             self.logger.info("Successfully switched to IFrame")
         except NoSuchFrameException as e:
             self.logger.error(f"Failed to switch to IFrame: {e}")
@@ -55,7 +54,7 @@ class IFramePage(BasePage):
     @log_function_call()
     def switch_to_main_content(self) -> None:
         """Switch back to main content from iframe"""
-        self.driver.switch_to.default_content()
+        self.switch_to_default_content()
         self.logger.info("Switched back to main content")
 
     @allure.step("Clear text editor content")
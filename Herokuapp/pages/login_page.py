@@ -1,4 +1,6 @@
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+from typing import Optional
 from .base_page import BasePage
 import allure
 from utils.log_decorators import log_page_interaction, log_function_call
@@ -10,6 +12,7 @@ class LoginPage(BasePage):
     PASSWORD_FIELD = (By.ID, "password")
     LOGIN_BUTTON = (By.CSS_SELECTOR, "button[type='submit']")
     FLASH_MESSAGE = (By.ID, "flash")
+    FLASH_ERROR = (By.CSS_SELECTOR, "#flash.error")
     LOGOUT_BUTTON = (By.CSS_SELECTOR, "a.button.secondary.radius")
 
     def __init__(self, driver):
@@ -71,11 +74,22 @@ class LoginPage(BasePage):
         self.logger.debug(f"Flash message: {message}")
         return message
 
+    @allure.step("Get login outcome")
+    @log_function_call(log_result=True)
+    def get_login_outcome(self, timeout: int = None) -> Optional[str]:
+        """Wait once for either result of a login: 'success' (logout button) or 'failure' (error flash)"""
+        try:
+            outcome, _ = self.wait_for_any({"success": self.LOGOUT_BUTTON, "failure": self.FLASH_ERROR}, timeout)
+            return outcome
+        except TimeoutException:
+            return None
+
     @allure.step("Check if logout button is visible")
     @log_function_call(log_result=True)
     def is_logout_visible(self) -> bool:
         """Check if logout button is visible (indicates successful login)"""
-        is_visible = self.is_element_present(self.LOGOUT_BUTTON)
+        # Returns as soon as the error flash shows instead of waiting out the timeout for the button
+        is_visible = self.get_login_outcome() == "success"
         self.logger.debug(f"Logout button visible: {is_visible}")
         return is_visible
 
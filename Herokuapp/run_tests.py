@@ -7,7 +7,13 @@ import subprocess
 import sys
 import os
 import argparse
+import shutil
+import glob
+import json
 from utils.logger import LoggerConfig
+from utils.duration_store import DurationStore, read_timings, write_timings
+from utils.work_coordinator import WorkCoordinator
+from utils.resource_monitor import recommend_worker_count, SwapMonitor, WorkerThrottle, WORKER_LIMIT_ENV
 
 # Setup logging
 logger = LoggerConfig.get_logger(__name__)
@@ -130,31 +136,51 @@ def run_with_allure_report(env="dev", browser="chrome", headless=False, log_leve
         return e.returncode
 
 
-def run_parallel_tests(env="dev", browser="chrome", headless=True, log_level="INFO"):
+def run_parallel_tests(env="dev", browser="chrome", headless=True, log_level="INFO",
+                       workers="auto", max_workers=None, driver_mode="browser"):
     """Run tests in parallel"""
     logger.info("Running tests in parallel...")
 
+    if workers == "auto":
+        workers = recommend_worker_count(browser, headless, max_workers, driver_mode=driver_mode)
+    else:
+        workers = int(workers)
+        if max_workers:
+            workers = min(workers, max_workers)
+
     cmd = [
         "pytest",
         "tests/",
-        "-n", "2",  # 2 parallel workers
+        "-n", str(workers),
         "-v",
         "--alluredir=reports/allure-results",
         f"--env={env}",
         f"--browser={browser}",
-        f"--log-level-pytest={log_level}"
+        f"--log-level-pytest={log_level}",
+        f"--driver-mode={driver_mode}"
     ]
 
     if headless:
         cmd.append("--headless")
 
+    # Workers take a slot per test, the monitor shrinks the number of slots if the machine starts swapping
+    limit_dir = os.path.join("reports", ".worker_slots")
+    shutil.rmtree(limit_dir, ignore_errors=True)
+    monitor = SwapMonitor(WorkerThrottle(limit_dir), workers)
+    monitor.start()
+    run_env = {**os.environ, WORKER_LIMIT_ENV: os.path.abspath(limit_dir)}
+
     try:
-        result = subprocess.run(cmd, check=True)
+        result = subprocess.run(cmd, check=True, env=run_env)
         logger.info("Parallel tests completed successfully")
         return result.returncode
     except subprocess.CalledProcessError as e:
         logger.error(f"Parallel tests failed: {e}")
         return e.returncode
+    finally:
+        monitor.stop()
+        if monitor.limit < workers:
+            logger.warning(f"Concurrency was lowered from {workers} to {monitor.limit} workers due to swapping")
 
 
 def run_specific_test(test_name, env="dev", browser="chrome", headless=False, log_level="INFO"):
@@ -184,10 +210,156 @@ def run_specific_test(test_name, env="dev", browser="chrome", headless=False, lo
         return e.returncode
 
 
+def collect_test_ids(test_path="tests/", extra_args=None):
+    """Collect test node ids without running them, RuntimeError when collection itself fails"""
+    # Drop addopts so -v from pytest.ini does not switch collect-only to tree output
+    cmd = ["pytest", test_path, "--collect-only", "-q", "-o", "addopts="] + (extra_args or [])
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    # 5: no tests collected, reported by the caller
+    if result.returncode not in (0, 5):
+        output = result.stderr.strip() or "\n".join(result.stdout.strip().splitlines()[-20:])
+        raise RuntimeError(f"Test collection failed with exit code {result.returncode}:\n{output}")
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+
+def run_distributed_tests(env="dev", browser="chrome", headless=True, log_level="INFO",
+                          local_workers=2, host="127.0.0.1", port=0, lease_timeout=900):
+    """Run tests pulled one at a time from a work coordinator by local and remote workers"""
+    logger.info("Running tests through work coordinator...")
+
+    options = [f"--env={env}", f"--browser={browser}", f"--log-level-pytest={log_level}"]
+    if headless:
+        options.append("--headless")
+
+    store = DurationStore()
+    nodeids = collect_test_ids("tests/", options)
+    if not nodeids:
+        logger.error("No tests collected, the work coordinator is not started")
+        return 1
+    # Longest tests first so the run does not end with one worker on a long test
+    nodeids.sort(key=lambda nodeid: -store.get(nodeid))
+
+    coordinator = WorkCoordinator(nodeids, host=host, port=port, lease_timeout=lease_timeout).start()
+    address = coordinator.address
+    logger.info(f"Remote workers can join with: pytest tests/ --coordinator={address} {' '.join(options)}")
+
+    workers = []
+    try:
+        for index in range(local_workers):
+            cmd = ["pytest", "tests/", "-v", "--alluredir=reports/allure-results",
+                   f"--coordinator={address}", f"--coordinator-worker=local-{index}"] + options
+            workers.append(subprocess.Popen(cmd))
+
+        while not coordinator.wait(timeout=1):
+            if workers and all(worker.poll() is not None for worker in workers) \
+                    and coordinator.connected_workers == 0:
+                logger.error("All workers exited before every test reported a result")
+                break
+    finally:
+        try:
+            for worker in workers:
+                if worker.poll() is None:
+                    try:
+                        worker.wait(timeout=60)
+                    except subprocess.TimeoutExpired:
+                        logger.error(f"Worker {worker.pid} still running 60s after the run, killing it")
+                        worker.kill()
+                        worker.wait()
+        finally:
+            coordinator.stop()
+
+    timings = {nodeid: result["duration"] for nodeid, result in coordinator.results.items()
+               if result["worker"] != "coordinator"}
+    store.update(timings)
+    store.save()
+    write_timings("reports/test_timings.json", timings)
+
+    logger.info(f"Distributed run summary: {coordinator.summary()}")
+    return coordinator.exit_code
+
+
+def run_browser_benchmark(env="dev", browser="chrome", headless=True, profile_names=None, iterations=10,
+                          cache_mode="cold", reuse_service=False):
+    """Launch and quit browsers with each launch profile and report startup/teardown latency"""
+    from utils.driver_factory import BROWSER_PROFILES, benchmark_profiles, resolve_profile
+    from utils.warm_profile import WarmProfile
+    from config.init import Config
+
+    config = Config(env)
+    overrides = config.browser_profiles
+    warm_profile = None
+    if cache_mode == "warm":
+        warm_profile = WarmProfile(browser, config.browser_template_dir, config.browser_warmup_urls,
+                                   shared_cache=config.browser_shared_cache)
+    if not profile_names:
+        profile_names = list(BROWSER_PROFILES) + [name for name in overrides if name not in BROWSER_PROFILES]
+    logger.info(f"Benchmarking {browser} launch profiles {profile_names}, {iterations} iterations each "
+                f"({cache_mode} cache, shared driver service: {reuse_service})")
+
+    profiles = {name: resolve_profile(name, overrides) for name in profile_names}
+    results = benchmark_profiles(browser, profiles, iterations, headless, warm_profile, reuse_service)
+
+    summary = {"browser": browser, "iterations": iterations, "cache": cache_mode,
+               "shared_service": reuse_service, "profiles": results}
+    if warm_profile is not None:
+        # Copying the profile is part of every warm startup, compare it with the cold startup it saves
+        summary["template"] = {"dir": warm_profile.template_dir, "version": warm_profile.version,
+                               "size_mb": warm_profile.profile_size_mb()}
+        logger.info(f"Warm profile: {summary['template']['size_mb']} MB copied per session "
+                    f"from {warm_profile.template_dir}")
+    os.makedirs("reports", exist_ok=True)
+    with open("reports/browser_benchmark.json", 'w', encoding='utf-8') as file:
+        json.dump(summary, file, indent=2)
+
+    logger.info(f"{'profile':<16}{'startup p50':>13}{'startup p95':>13}{'teardown p50':>14}{'teardown p95':>14}"
+                + (f"{'copy p50':>12}{'copy p95':>12}" if warm_profile is not None else ""))
+    for name, stats in results.items():
+        copy_columns = f"{stats['checkout_p50']:>10.0f}ms{stats['checkout_p95']:>10.0f}ms" \
+            if warm_profile is not None else ""
+        logger.info(f"{name:<16}{stats['startup_p50']:>11.0f}ms{stats['startup_p95']:>11.0f}ms"
+                    f"{stats['teardown_p50']:>12.0f}ms{stats['teardown_p95']:>12.0f}ms{copy_columns}")
+    logger.info("Benchmark results saved: reports/browser_benchmark.json")
+    return 0
+
+
+def merge_shard_results(shard_dirs, output_dir="reports"):
+    """Combine allure results and test timings of shard report directories"""
+    logger.info(f"Merging results of {len(shard_dirs)} shards into {output_dir}")
+
+    allure_dir = os.path.join(output_dir, "allure-results")
+    os.makedirs(allure_dir, exist_ok=True)
+    timings = {}
+
+    for shard_dir in shard_dirs:
+        # Allure result files are uniquely named, so shards never overwrite each other
+        result_files = glob.glob(os.path.join(shard_dir, "allure-results", "*"))
+        if os.path.realpath(shard_dir) != os.path.realpath(output_dir):
+            for result_file in result_files:
+                shutil.copy2(result_file, allure_dir)
+
+        timings_file = os.path.join(shard_dir, "test_timings.json")
+        if not os.path.exists(timings_file):
+            logger.warning(f"No test timings found in {shard_dir}")
+            continue
+        shard_timings = read_timings(timings_file)
+        timings.update(shard_timings)
+        logger.info(f"{shard_dir}: {len(result_files)} allure files, {len(shard_timings)} tests, "
+                    f"{sum(shard_timings.values()):.1f}s")
+
+    write_timings(os.path.join(output_dir, "test_timings.json"), timings)
+    store = DurationStore(os.path.join(output_dir, "test_durations.json"))
+    store.update(timings)
+    store.save()
+
+    logger.info(f"Merged timings of {len(timings)} tests, allure results in {allure_dir}")
+    return 0
+
+
 def main():
     """Main function to handle command line arguments"""
     parser = argparse.ArgumentParser(description='Herokuapp parsing')
-    parser.add_argument('--mode', choices=['basic', 'smoke', 'ui', 'allure', 'parallel', 'specific'],
+    parser.add_argument('--mode', choices=['basic', 'smoke', 'ui', 'allure', 'parallel', 'specific', 'merge',
+                                           'distributed', 'browser-benchmark'],
                         default='basic', help='Test execution mode')
     parser.add_argument('--test', help='Specific test to run (for specific mode)')
     parser.add_argument('--env', choices=['dev', 'stage'], default='dev', help='Environment')
@@ -195,11 +367,40 @@ def main():
     parser.add_argument('--headless', action='store_true', help='Run in headless mode')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                         default='INFO', help='Log level')
+    parser.add_argument('--workers', default='auto',
+                        help='Parallel workers: "auto" sizes from CPUs, free memory and browser, or a number')
+    parser.add_argument('--max-workers', type=int, help='Upper limit for parallel workers')
+    parser.add_argument('--shard', help='Run only shard i of n (format i/n), balanced by recorded durations')
+    parser.add_argument('--shard-results', nargs='+', default=[],
+                        help='Report directories of all shards (for merge mode)')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='Run only tests affected by files changed against --changed-base')
+    parser.add_argument('--changed-base', default='HEAD', help='Git revision to diff against for --changed-only')
+    parser.add_argument('--driver-mode', choices=['browser', 'context'], default='browser',
+                        help='Browser per test, or isolated contexts in one shared Chrome (for parallel mode)')
+    parser.add_argument('--profiles', nargs='+', help='Launch profiles to benchmark (default: all)')
+    parser.add_argument('--browser-cache', choices=['warm', 'cold'], default='cold',
+                        help='Start benchmark browsers from the warm profile template or empty profiles')
+    parser.add_argument('--shared-service', action='store_true',
+                        help='Open benchmark sessions against one long-lived driver service')
+    parser.add_argument('--iterations', type=int, default=10, help='Launches per profile (for browser-benchmark mode)')
+    parser.add_argument('--local-workers', type=int, default=2,
+                        help='Workers started on this machine (for distributed mode)')
+    parser.add_argument('--coordinator-host', default='127.0.0.1',
+                        help='Coordinator listen address, 0.0.0.0 to accept remote workers')
+    parser.add_argument('--coordinator-port', type=int, default=0, help='Coordinator port (0: any free port)')
+    parser.add_argument('--lease-timeout', type=float, default=900,
+                        help='Seconds before a test leased to an unresponsive worker is re-queued')
 
     args = parser.parse_args()
 
     # Set environment variables for pytest
     os.environ['PYTEST_CURRENT_TEST'] = '1'
+    if args.shard:
+        os.environ['PYTEST_ADDOPTS'] = f"{os.environ.get('PYTEST_ADDOPTS', '')} --shard={args.shard}".strip()
+    if args.changed_only:
+        os.environ['PYTEST_ADDOPTS'] = (f"{os.environ.get('PYTEST_ADDOPTS', '')} "
+                                        f"--changed-only --changed-base={args.changed_base}").strip()
 
     logger.info(f"Starting test execution in {args.mode} mode")
     logger.info(f"Environment: {args.env}, Browser: {args.browser}, Headless: {args.headless}")
@@ -214,12 +415,28 @@ def main():
         elif args.mode == 'allure':
             return run_with_allure_report(args.env, args.browser, args.headless, args.log_level)
         elif args.mode == 'parallel':
-            return run_parallel_tests(args.env, args.browser, args.headless, args.log_level)
+            return run_parallel_tests(args.env, args.browser, args.headless, args.log_level,
+                                      args.workers, args.max_workers, args.driver_mode)
         elif args.mode == 'specific':
             if not args.test:
                 logger.error("Please specify a test file with --test")
                 return 1
             return run_specific_test(args.test, args.env, args.browser, args.headless, args.log_level)
+        elif args.mode == 'distributed':
+            return run_distributed_tests(args.env, args.browser, args.headless, args.log_level,
+                                         args.local_workers, args.coordinator_host, args.coordinator_port,
+                                         args.lease_timeout)
+        elif args.mode == 'browser-benchmark':
+            if args.iterations < 1:
+                logger.error("Please specify --iterations of at least 1")
+                return 1
+            return run_browser_benchmark(args.env, args.browser, args.headless, args.profiles, args.iterations,
+                                         args.browser_cache, args.shared_service)
+        elif args.mode == 'merge':
+            if not args.shard_results:
+                logger.error("Please specify shard report directories with --shard-results")
+                return 1
+            return merge_shard_results(args.shard_results)
         else:
             logger.error(f"Unknown mode: {args.mode}")
             return 1
@@ -1,13 +1,29 @@
 import psycopg2
-from typing import Dict, Any, List, Optional
+import select
+import time
+from typing import Dict, Any, List, Optional, Callable
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
+from services.query_profiler import QueryProfiler
 from utils.log_decorators import LoggingMixin, log_database_operation, log_function_call
 
 
 class DatabaseService(LoggingMixin):
-    def __init__(self, db_config: Dict[str, Any]):
+    NOTIFY_CHANNEL = "test_row_changes"
+    NOTIFY_TRIGGER = "notify_row_change"
+    # Advisory lock keys: serialising trigger DDL, and held shared by every connection using the triggers
+    NOTIFY_INSTALL_LOCK = 7340031
+    NOTIFY_USERS_LOCK = 7340032
+    # Statements whose plan is captured with EXPLAIN ANALYZE, and with a plain EXPLAIN
+    ANALYZED_STATEMENTS = ("SELECT", "VALUES", "TABLE")
+    EXPLAINED_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "MERGE", "WITH")
+
+    def __init__(self, db_config: Dict[str, Any], slow_query_threshold_ms: float = 200):
         self.db_config = db_config
         self.connection = None
+        self.listen_connection = None
+        self.notify_tables = None
+        self.profiler = QueryProfiler(slow_query_threshold_ms)
         self.logger.debug("Initialized DatabaseService")
 
     @log_function_call()
@@ -23,6 +39,9 @@ class DatabaseService(LoggingMixin):
     @log_function_call()
     def disconnect(self) -> None:
         """Close database connection"""
+        if self.listen_connection:
+            self.listen_connection.close()
+            self.listen_connection = None
         if self.connection:
             self.connection.close()
             self.logger.info("Database connection closed")
@@ -33,10 +52,13 @@ class DatabaseService(LoggingMixin):
         """Execute SELECT query and return results"""
         try:
             with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                start_time = time.perf_counter()
                 cursor.execute(query, params)
                 results = cursor.fetchall()
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 self.logger.debug(f"Query returned {len(results)} rows")
-                return [dict(row) for row in results]
+            self._profile(query, params, duration_ms)
+            return [dict(row) for row in results]
         except psycopg2.Error as e:
             self.logger.error(f"Query execution failed: {e}")
             raise
@@ -47,11 +69,15 @@ class DatabaseService(LoggingMixin):
         """Execute UPDATE/INSERT/DELETE query"""
         try:
             with self.connection.cursor() as cursor:
+                start_time = time.perf_counter()
                 cursor.execute(query, params)
-                self.connection.commit()
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 affected_rows = cursor.rowcount
                 self.logger.debug(f"Update affected {affected_rows} rows")
-                return affected_rows
+            # The plan is captured inside the statement's own transaction, before it is committed
+            self._profile(query, params, duration_ms)
+            self.connection.commit()
+            return affected_rows
         except psycopg2.Error as e:
             self.connection.rollback()
             self.logger.error(f"Update execution failed: {e}")
@@ -77,4 +103,189 @@ class DatabaseService(LoggingMixin):
         results = self.execute_query(query, (username,))
         user = results[0] if results else None
         self.logger.debug(f"User lookup for {username}: {'Found' if user else 'Not found'}")
-        return user
\ No newline at end of file
+        return user
+
+    @log_database_operation("Install change notifications")
+    @log_function_call(log_args=True, log_result=True)
+    def install_change_notifications(self, tables: List[str], schema: str = "public") -> List[str]:
+        """Install statement-level triggers that NOTIFY on every write to the given tables.
+        Workers running in parallel install them once, the last one to finish removes them"""
+        if not tables:
+            raise ValueError("Change notifications need an explicit list of tables")
+        # Held shared while this connection uses the triggers, so the last user can tell it is the last.
+        # Taken before the DDL lock, waiting here while another connection is removing the triggers
+        self._advisory_lock("pg_advisory_lock_shared")
+        self.notify_tables = (schema, list(tables))
+
+        statements = [sql.SQL("""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify({channel}, TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """).format(function=sql.Identifier(schema, self.NOTIFY_TRIGGER), channel=sql.Literal(self.NOTIFY_CHANNEL))]
+        for table in tables:
+            params = self._trigger_params(schema, table)
+            statements.append(sql.SQL(
+                "DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_trigger "
+                "WHERE tgname = {name} AND tgrelid = {regclass}::regclass) THEN "
+                "CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                "FOR EACH STATEMENT EXECUTE FUNCTION {function}(); END IF; END $$"
+            ).format(**params))
+        self._run_ddl(*statements)
+
+        self.logger.info(f"Change notifications installed for {len(tables)} tables in schema '{schema}'")
+        return list(tables)
+
+    @log_database_operation("Remove change notifications")
+    @log_function_call()
+    def remove_change_notifications(self) -> bool:
+        """Drop the notification triggers unless another connection still uses them, True if dropped"""
+        if self.notify_tables is None:
+            return False
+        schema, tables = self.notify_tables
+        self.notify_tables = None
+        self._advisory_lock("pg_advisory_unlock_shared")
+        if not self._advisory_lock("pg_try_advisory_lock"):
+            self.logger.debug("Change notifications still used by other connections, keeping them")
+            return False
+        try:
+            statements = [sql.SQL("DROP TRIGGER IF EXISTS {trigger} ON {table}").format(
+                **self._trigger_params(schema, table)) for table in tables]
+            statements.append(sql.SQL("DROP FUNCTION IF EXISTS {}()").format(
+                sql.Identifier(schema, self.NOTIFY_TRIGGER)))
+            self._run_ddl(*statements)
+        finally:
+            self._advisory_lock("pg_advisory_unlock")
+        self.logger.info(f"Change notifications removed from {len(tables)} tables in schema '{schema}'")
+        return True
+
+    def _trigger_params(self, schema: str, table: str) -> Dict[str, Any]:
+        return {
+            "trigger": sql.Identifier(self.NOTIFY_TRIGGER),
+            "name": sql.Literal(self.NOTIFY_TRIGGER),
+            "table": sql.Identifier(schema, table),
+            "regclass": sql.Literal(f'"{schema}"."{table}"'),
+            "function": sql.Identifier(schema, self.NOTIFY_TRIGGER)
+        }
+
+    def _advisory_lock(self, function: str) -> bool:
+        """Call a session-level advisory lock function on the lock held by users of the triggers"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql.SQL("SELECT {}({})").format(sql.SQL(function),
+                                                          sql.Literal(self.NOTIFY_USERS_LOCK)))
+            result = cursor.fetchone()[0]
+        self.connection.commit()
+        return result is not False
+
+    def _run_ddl(self, *statements) -> None:
+        """Run statements in one transaction on a plain cursor (not profiled), serialised across
+        connections by a transaction-level advisory lock"""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(sql.SQL("SELECT pg_advisory_xact_lock({})").format(
+                    sql.Literal(self.NOTIFY_INSTALL_LOCK)))
+                for statement in statements:
+                    cursor.execute(statement)
+            self.connection.commit()
+        except psycopg2.Error:
+            self.connection.rollback()
+            raise
+
+    @log_database_operation("Wait for row")
+    @log_function_call(log_args=True, log_result=True)
+    def wait_for_row(self, query: str, predicate: Callable[[List[Dict[str, Any]]], bool] = None,
+                     timeout: float = 10, params: tuple = None, poll_interval: float = 0.05,
+                     max_poll_interval: float = 1.0) -> List[Dict[str, Any]]:
+        """Wait until query results satisfy predicate, woken by NOTIFY with backoff polling as fallback"""
+        predicate = predicate or bool
+        deadline = time.monotonic() + timeout
+        listener = self._get_listener()
+        interval = poll_interval
+        checks = 0
+
+        while True:
+            rows = self.execute_query(query, params)
+            checks += 1
+            if predicate(rows):
+                self.logger.debug(f"Row state reached after {checks} checks")
+                return rows
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Row state not reached within {timeout}s after {checks} checks: {query}")
+
+            if listener is not None and self._wait_for_notification(listener, min(interval, remaining)):
+                # Something was written - re-check right away and restart the backoff
+                interval = poll_interval
+            else:
+                if listener is None:
+                    time.sleep(min(interval, remaining))
+                interval = min(interval * 2, max_poll_interval)
+
+    @log_database_operation("Wait for user")
+    @log_function_call(log_args=True, log_result=True)
+    def wait_for_user(self, username: str, timeout: float = 10) -> Dict[str, Any]:
+        """Wait until user row is written to database"""
+        rows = self.wait_for_row("SELECT * FROM users WHERE username = %s", timeout=timeout, params=(username,))
+        return rows[0]
+
+    def _get_listener(self):
+        """Get autocommit connection listening on the change channel, None if LISTEN is unavailable"""
+        if self.listen_connection is not None:
+            return self.listen_connection
+        try:
+            connection = psycopg2.connect(**self.db_config)
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.NOTIFY_CHANNEL)))
+            self.listen_connection = connection
+            self.logger.debug(f"Listening for notifications on channel: {self.NOTIFY_CHANNEL}")
+        except psycopg2.Error as e:
+            self.logger.warning(f"LISTEN unavailable, falling back to polling: {e}")
+        return self.listen_connection
+
+    def _wait_for_notification(self, listener, timeout: float) -> bool:
+        """Block until a change notification arrives or timeout expires"""
+        if not listener.notifies:
+            readable, _, _ = select.select([listener], [], [], timeout)
+            if not readable:
+                return False
+            listener.poll()
+        received = bool(listener.notifies)
+        listener.notifies.clear()
+        return received
+
+    def _profile(self, query: str, params: Optional[tuple], duration_ms: float) -> None:
+        """Record statement timing and capture the plan of slow statements"""
+        if self.profiler.record(query, duration_ms):
+            self.profiler.attach_plan(query, duration_ms, self._capture_plan(query, params))
+
+    def _capture_plan(self, query: str, params: Optional[tuple]) -> Optional[str]:
+        """EXPLAIN the statement inside a savepoint: ANALYZE (which runs it again) only for reads,
+        the estimated plan for writes, no plan for DDL and other statements"""
+        statement_type = self.profiler.statement_type(query)
+        if statement_type in self.ANALYZED_STATEMENTS:
+            explain = "EXPLAIN (ANALYZE, BUFFERS)"
+        elif statement_type in self.EXPLAINED_STATEMENTS:
+            explain = "EXPLAIN"
+        else:
+            return None
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SAVEPOINT query_plan_capture")
+                try:
+                    cursor.execute(f"{explain} {query}", params)
+                    return "\n".join(row[0] for row in cursor.fetchall())
+                finally:
+                    cursor.execute("ROLLBACK TO SAVEPOINT query_plan_capture")
+                    cursor.execute("RELEASE SAVEPOINT query_plan_capture")
+        except psycopg2.Error as e:
+            self.logger.warning(f"Failed to capture query plan: {e}")
+            return None
+
+    @log_function_call()
+    def write_query_report(self, path: str = None, limit: int = 10) -> Dict[str, Any]:
+        """Write report with the slowest normalised statements and their plans"""
+        return self.profiler.write_report(path, limit)
\ No newline at end of file
@@ -0,0 +1,358 @@
+import base64
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List
+from urllib.parse import urlsplit, parse_qs
+from utils.log_decorators import LoggingMixin, log_function_call
+
+
+class EmbeddedMockServer(LoggingMixin):
+    """In-process mock HTTP server implementing the WireMock admin API subset used by WireMockService"""
+
+    DEFAULT_PRIORITY = 5
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.mappings: List[Dict[str, Any]] = []
+        self.journal: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+        self._sequence = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @log_function_call()
+    def start(self) -> "EmbeddedMockServer":
+        """Start serving on a background thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _MockRequestHandler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="embedded-mock-server", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Embedded mock server started: {self.base_url}")
+        return self
+
+    @log_function_call()
+    def stop(self) -> None:
+        """Stop serving and release the port"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self.logger.info("Embedded mock server stopped")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    # Admin API
+
+    def add_mapping(self, mapping: Dict[str, Any], duplicate_policy: str = "OVERWRITE") -> Dict[str, Any]:
+        """Add stub mapping, replacing an existing mapping with the same id"""
+        stored = copy.deepcopy(mapping)
+        stored.setdefault("id", str(uuid.uuid4()))
+        with self._lock:
+            existing = self._find_mapping(stored["id"])
+            if existing is not None:
+                if duplicate_policy == "IGNORE":
+                    return self._public(existing)
+                self.mappings.remove(existing)
+            self._sequence += 1
+            stored["_sequence"] = self._sequence
+            self.mappings.append(stored)
+        return self._public(stored)
+
+    def import_mappings(self, payload: Dict[str, Any]) -> None:
+        """Import mapping set using WireMock importOptions semantics"""
+        options = payload.get("importOptions", {})
+        mappings = payload.get("mappings", [])
+        with self._lock:
+            if options.get("deleteAllNotInImport"):
+                imported_ids = {mapping.get("id") for mapping in mappings}
+                self.mappings = [m for m in self.mappings if m["id"] in imported_ids]
+            for mapping in mappings:
+                self.add_mapping(mapping, options.get("duplicatePolicy", "OVERWRITE"))
+
+    def list_mappings(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._public(m) for m in self.mappings]
+
+    def clear_mappings(self) -> None:
+        with self._lock:
+            self.mappings = []
+
+    def remove_mapping(self, mapping_id: str) -> bool:
+        with self._lock:
+            existing = self._find_mapping(mapping_id)
+            if existing is None:
+                return False
+            self.mappings.remove(existing)
+            return True
+
+    def reset_mappings(self) -> None:
+        """Drop all mappings except persistent ones, like WireMock restoring its backing store"""
+        with self._lock:
+            self.mappings = [m for m in self.mappings if m.get("persistent")]
+
+    def remove_by_metadata(self, pattern: Dict[str, Any]) -> int:
+        with self._lock:
+            keep = [m for m in self.mappings if not _match_metadata(pattern, m.get("metadata", {}))]
+            removed = len(self.mappings) - len(keep)
+            self.mappings = keep
+        return removed
+
+    def find_requests(self, pattern: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self._lock:
+            journal = list(self.journal)
+        return [entry["request"] for entry in journal if _match_request(pattern, entry["request"])]
+
+    def serve_events(self) -> List[Dict[str, Any]]:
+        """Get journal entries, most recent first"""
+        with self._lock:
+            return list(reversed(self.journal))
+
+    def reset_journal(self) -> None:
+        with self._lock:
+            self.journal = []
+
+    # Stub serving
+
+    def serve(self, logged_request: Dict[str, Any]) -> Dict[str, Any]:
+        """Find best matching stub for request and record it in the journal"""
+        with self._lock:
+            candidates = [m for m in self.mappings if _match_request(m.get("request", {}), logged_request)]
+            # Lowest priority number wins, most recently added breaks ties
+            candidates.sort(key=lambda m: (m.get("priority", self.DEFAULT_PRIORITY), -m["_sequence"]))
+            mapping = candidates[0] if candidates else None
+            self.journal.append({
+                "id": str(uuid.uuid4()),
+                "request": logged_request,
+                "wasMatched": mapping is not None,
+                "stubMapping": self._public(mapping) if mapping else None
+            })
+
+        if mapping is None:
+            return {"status": 404, "body": "Request was not matched by any stub mapping"}
+        return mapping.get("response", {})
+
+    def _find_mapping(self, mapping_id: str) -> Optional[Dict[str, Any]]:
+        for mapping in self.mappings:
+            if mapping["id"] == mapping_id:
+                return mapping
+        return None
+
+    @staticmethod
+    def _public(mapping: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in mapping.items() if not key.startswith("_")}
+
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_PUT(self):
+        self._dispatch()
+
+    def do_DELETE(self):
+        self._dispatch()
+
+    def do_PATCH(self):
+        self._dispatch()
+
+    def do_OPTIONS(self):
+        self._dispatch()
+
+    def do_HEAD(self):
+        self._dispatch()
+
+    def log_message(self, format, *args):
+        self.server.mock.logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8", errors="replace") if length else ""
+        path = urlsplit(self.path).path
+        if path.startswith("/__admin"):
+            self._handle_admin(path, body)
+        else:
+            self._handle_stub(body)
+
+    def _handle_admin(self, path: str, body: str):
+        mock = self.server.mock
+        method = self.command
+        payload = json.loads(body) if body else {}
+
+        if path == "/__admin/mappings" and method == "GET":
+            mappings = mock.list_mappings()
+            return self._send_json(200, {"mappings": mappings, "meta": {"total": len(mappings)}})
+        if path == "/__admin/mappings" and method == "POST":
+            return self._send_json(201, mock.add_mapping(payload))
+        if path == "/__admin/mappings" and method == "DELETE":
+            mock.clear_mappings()
+            return self._send_json(200, {})
+        if path == "/__admin/mappings/import" and method == "POST":
+            mock.import_mappings(payload)
+            return self._send_json(200, {})
+        if path == "/__admin/mappings/reset" and method == "POST":
+            mock.reset_mappings()
+            return self._send_json(200, {})
+        if path == "/__admin/mappings/remove-by-metadata" and method == "POST":
+            mock.remove_by_metadata(payload)
+            return self._send_json(200, {})
+        if path.startswith("/__admin/mappings/") and method == "DELETE":
+            found = mock.remove_mapping(path.rsplit("/", 1)[-1])
+            return self._send_json(200 if found else 404, {})
+        if path == "/__admin/reset" and method == "POST":
+            mock.reset_mappings()
+            mock.reset_journal()
+            return self._send_json(200, {})
+        if path == "/__admin/requests" and method == "GET":
+            journal = mock.serve_events()
+            return self._send_json(200, {"requests": journal, "meta": {"total": len(journal)}})
+        if path == "/__admin/requests" and method == "DELETE":
+            mock.reset_journal()
+            return self._send_json(200, {})
+        if path == "/__admin/requests/find" and method == "POST":
+            return self._send_json(200, {"requests": mock.find_requests(payload)})
+        if path == "/__admin/requests/count" and method == "POST":
+            return self._send_json(200, {"count": len(mock.find_requests(payload))})
+
+        return self._send_json(404, {"errors": [{"title": f"Unsupported admin endpoint: {method} {path}"}]})
+
+    def _handle_stub(self, body: str):
+        logged_request = {
+            "url": self.path,
+            "absoluteUrl": f"{self.server.mock.base_url}{self.path}",
+            "method": self.command,
+            "headers": {name: value for name, value in self.headers.items()},
+            "body": body,
+            "loggedDate": int(time.time() * 1000),
+            "loggedDateString": datetime.now(timezone.utc).isoformat()
+        }
+        response = self.server.mock.serve(logged_request)
+
+        delay = response.get("fixedDelayMilliseconds")
+        if delay:
+            time.sleep(delay / 1000)
+
+        headers = dict(response.get("headers", {}))
+        if "jsonBody" in response:
+            payload = json.dumps(response["jsonBody"]).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif "base64Body" in response:
+            payload = base64.b64decode(response["base64Body"])
+        else:
+            payload = str(response.get("body", "")).encode("utf-8")
+        self._send(response.get("status", 200), payload, headers)
+
+    def _send_json(self, status: int, data: Dict[str, Any]):
+        self._send(status, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json"})
+
+    def _send(self, status: int, payload: bytes, headers: Dict[str, str]):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+
+def _match_request(pattern: Dict[str, Any], request: Dict[str, Any]) -> bool:
+    """Match logged request against WireMock request pattern"""
+    method = pattern.get("method", "ANY")
+    if method != "ANY" and method != request["method"]:
+        return False
+
+    url = request["url"]
+    path = urlsplit(url).path
+    if "url" in pattern and pattern["url"] != url:
+        return False
+    if "urlPath" in pattern and pattern["urlPath"] != path:
+        return False
+    if "urlPattern" in pattern and not re.fullmatch(pattern["urlPattern"], url):
+        return False
+    if "urlPathPattern" in pattern and not re.fullmatch(pattern["urlPathPattern"], path):
+        return False
+
+    headers = {name.lower(): value for name, value in request.get("headers", {}).items()}
+    for name, matcher in pattern.get("headers", {}).items():
+        if not _match_value(matcher, headers.get(name.lower())):
+            return False
+
+    query = parse_qs(urlsplit(url).query)
+    for name, matcher in pattern.get("queryParameters", {}).items():
+        values = query.get(name, [None])
+        if not any(_match_value(matcher, value) for value in values):
+            return False
+
+    for matcher in pattern.get("bodyPatterns", []):
+        if not _match_value(matcher, request.get("body", "")):
+            return False
+    return True
+
+
+def _match_value(matcher: Dict[str, Any], value: Optional[str]) -> bool:
+    """Evaluate a single WireMock string value matcher"""
+    if matcher.get("absent"):
+        return value is None
+    if value is None:
+        return False
+    if "equalTo" in matcher:
+        if matcher.get("caseInsensitive"):
+            return value.lower() == str(matcher["equalTo"]).lower()
+        return value == matcher["equalTo"]
+    if "contains" in matcher:
+        return matcher["contains"] in value
+    if "matches" in matcher:
+        return re.fullmatch(matcher["matches"], value, re.DOTALL) is not None
+    if "doesNotMatch" in matcher:
+        return re.fullmatch(matcher["doesNotMatch"], value, re.DOTALL) is None
+    if "equalToJson" in matcher:
+        expected = matcher["equalToJson"]
+        try:
+            return json.loads(value) == (json.loads(expected) if isinstance(expected, str) else expected)
+        except ValueError:
+            return False
+    # An empty matcher only requires the value to be present, unsupported ones
+    # (equalToXml, matchesJsonPath, matchesXPath, ...) never match
+    return not set(matcher) - {"absent", "caseInsensitive"}
+
+
+def _match_metadata(pattern: Dict[str, Any], metadata: Dict[str, Any]) -> bool:
+    """Match metadata against matchesJsonPath pattern with a dotted $.a.b expression"""
+    json_path = pattern.get("matchesJsonPath")
+    if json_path is None:
+        return False
+    matcher = {}
+    if isinstance(json_path, dict):
+        matcher = {key: value for key, value in json_path.items() if key != "expression"}
+        json_path = json_path["expression"]
+
+    value = metadata
+    for key in json_path.lstrip("$").strip(".").split("."):
+        if not isinstance(value, dict) or key not in value:
+            return False
+        value = value[key]
+
+    if not matcher:
+        return True
+    return _match_value(matcher, value if isinstance(value, str) else json.dumps(value))
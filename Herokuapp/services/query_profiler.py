@@ -0,0 +1,132 @@
+import json
+import os
+import re
+from typing import Dict, Any, List, Optional
+from utils.log_decorators import LoggingMixin
+from utils.report_paths import reports_path
+
+
+class QueryProfiler(LoggingMixin):
+    """Per-statement timing histograms and slow-query plan capture"""
+
+    # Upper bounds (ms) of the histogram buckets, the last bucket is open-ended
+    HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    _COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+    _STRING_RE = re.compile(r"'(?:[^']|'')*'")
+    _NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+    _PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s")
+    _IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+    _WHITESPACE_RE = re.compile(r"\s+")
+
+    def __init__(self, slow_threshold_ms: float = 200):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.statements: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        """Reduce a statement to its shape so that calls differing only by values are grouped"""
+        normalized = cls._COMMENT_RE.sub(" ", query)
+        normalized = cls._STRING_RE.sub("?", normalized)
+        normalized = cls._PLACEHOLDER_RE.sub("?", normalized)
+        normalized = cls._NUMBER_RE.sub("?", normalized)
+        normalized = cls._IN_LIST_RE.sub("(...)", normalized)
+        return cls._WHITESPACE_RE.sub(" ", normalized).strip()
+
+    @classmethod
+    def statement_type(cls, query: str) -> str:
+        """Leading keyword of a statement, e.g. SELECT, INSERT, CREATE"""
+        match = re.match(r"[\s(]*(\w+)", cls._COMMENT_RE.sub(" ", query))
+        return match.group(1).upper() if match else ""
+
+    def record(self, query: str, duration_ms: float) -> bool:
+        """Record statement timing, returns True when a plan should be captured"""
+        key = self.normalize(query)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = {
+                "statement": key,
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "slow_calls": 0,
+                "histogram": [0] * (len(self.HISTOGRAM_BUCKETS_MS) + 1),
+                "plan": None,
+                "plan_duration_ms": None
+            }
+            self.statements[key] = stats
+
+        stats["calls"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["histogram"][self._bucket_index(duration_ms)] += 1
+
+        if duration_ms < self.slow_threshold_ms:
+            return False
+
+        stats["slow_calls"] += 1
+        self.logger.warning(f"Slow query ({duration_ms:.1f}ms >= {self.slow_threshold_ms}ms): {key}")
+
+        # Only re-capture the plan when this call is slower than the one we already have
+        captured = stats["plan_duration_ms"]
+        return captured is None or duration_ms > captured
+
+    def attach_plan(self, query: str, duration_ms: float, plan: Optional[str]) -> None:
+        """Store captured EXPLAIN output for the statement"""
+        if plan is None:
+            return
+        stats = self.statements[self.normalize(query)]
+        stats["plan"] = plan
+        stats["plan_duration_ms"] = duration_ms
+
+    def slowest(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get statements ordered by their slowest call"""
+        ordered = sorted(self.statements.values(), key=lambda s: s["max_ms"], reverse=True)
+        return ordered[:limit]
+
+    def build_report(self, limit: int = 10) -> Dict[str, Any]:
+        """Build report with histograms and plans of the slowest statements"""
+        labels = [f"<={bound}ms" for bound in self.HISTOGRAM_BUCKETS_MS]
+        labels.append(f">{self.HISTOGRAM_BUCKETS_MS[-1]}ms")
+
+        statements = []
+        for stats in self.slowest(limit):
+            statements.append({
+                "statement": stats["statement"],
+                "calls": stats["calls"],
+                "slow_calls": stats["slow_calls"],
+                "avg_ms": round(stats["total_ms"] / stats["calls"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "histogram": {label: count for label, count in zip(labels, stats["histogram"]) if count},
+                "plan": stats["plan"]
+            })
+
+        return {
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "total_statements": len(self.statements),
+            "total_calls": sum(s["calls"] for s in self.statements.values()),
+            "slowest": statements
+        }
+
+    def write_report(self, path: str = None, limit: int = 10) -> Dict[str, Any]:
+        """Write session report to file and log the slowest statements"""
+        path = path or reports_path("db_query_report.json")
+        report = self.build_report(limit)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+        self.logger.info(f"Database query report saved: {path} "
+                         f"({report['total_calls']} calls, {report['total_statements']} statements)")
+        for stats in report["slowest"]:
+            self.logger.info(f"{stats['max_ms']:>9.1f}ms max / {stats['avg_ms']:>9.1f}ms avg "
+                             f"x{stats['calls']}: {stats['statement']}")
+            if stats["plan"]:
+                self.logger.debug(f"Plan for {stats['statement']}:\n{stats['plan']}")
+        return report
+
+    def _bucket_index(self, duration_ms: float) -> int:
+        for index, bound in enumerate(self.HISTOGRAM_BUCKETS_MS):
+            if duration_ms <= bound:
+                return index
+        return len(self.HISTOGRAM_BUCKETS_MS)
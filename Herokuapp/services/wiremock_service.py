@@ -1,11 +1,15 @@
+import json
+import time
+import uuid
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from utils.log_decorators import LoggingMixin, log_function_call, log_api_call
 
 
 class WireMockService(LoggingMixin):
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(self, base_url: str = "http://localhost:8080", scope: Optional[Dict[str, str]] = None):
         self.base_url = base_url
+        self.scope = scope
         self.session = requests.Session()
         self.logger.debug(f"Initialized WireMockService with base URL: {base_url}")
 
@@ -14,7 +18,7 @@ class WireMockService(LoggingMixin):
     def create_stub(self, stub_config: Dict[str, Any]) -> bool:
         """Create a new stub mapping"""
         url = f"{self.base_url}/__admin/mappings"
-        response = self.session.post(url, json=stub_config)
+        response = self.session.post(url, json=self._with_scope(stub_config))
 
         if response.status_code == 201:
             self.logger.info(f"Stub created successfully: {stub_config['request']['url']}")
@@ -23,11 +27,67 @@ class WireMockService(LoggingMixin):
             self.logger.error(f"Failed to create stub: {response.text}")
             return False
 
+    @log_api_call("Import stub mappings")
+    @log_function_call(log_result=True)
+    def import_stubs(self, mappings: List[Dict[str, Any]], persistent: bool = False,
+                     duplicate_policy: str = "OVERWRITE") -> bool:
+        """Register a whole set of stub mappings with a single admin call"""
+        prepared = [self._prepare_mapping(self._with_scope(mapping), persistent) for mapping in mappings]
+        url = f"{self.base_url}/__admin/mappings/import"
+        payload = {
+            "mappings": prepared,
+            "importOptions": {
+                "duplicatePolicy": duplicate_policy,
+                "deleteAllNotInImport": False
+            }
+        }
+        response = self.session.post(url, json=payload)
+
+        if response.status_code == 200:
+            self.logger.info(f"Imported {len(prepared)} stub mappings")
+            return True
+        else:
+            self.logger.error(f"Failed to import stub mappings: {response.text}")
+            return False
+
+    @log_api_call("Import stub mapping files")
+    @log_function_call(log_args=True, log_result=True)
+    def import_stub_files(self, *paths: str, persistent: bool = False) -> bool:
+        """Load mapping sets from JSON files and register them in one call"""
+        mappings = []
+        for path in paths:
+            mappings.extend(self.load_stub_file(path))
+        return self.import_stubs(mappings, persistent=persistent)
+
+    @staticmethod
+    def load_stub_file(path: str) -> List[Dict[str, Any]]:
+        """Load mappings from JSON file in WireMock format (single mapping, list or {"mappings": [...]})"""
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            return data.get("mappings", [data])
+        return data
+
     @log_api_call("Create login stub")
     @log_function_call(log_args=True, log_result=True)
     def create_login_stub(self, username: str, success: bool = True) -> bool:
         """Create stub for login endpoint"""
-        stub_config = {
+        stub_config = self.build_login_stub(username, success)
+        self.logger.info(f"Creating login stub for user: {username} (success: {success})")
+        return self.create_stub(stub_config)
+
+    @log_api_call("Create dynamic content stub")
+    @log_function_call(log_args=True, log_result=True)
+    def create_dynamic_content_stub(self, delay: int = 0) -> bool:
+        """Create stub for dynamic content with delay"""
+        stub_config = self.build_dynamic_content_stub(delay)
+        self.logger.info(f"Creating dynamic content stub with delay: {delay}s")
+        return self.create_stub(stub_config)
+
+    @staticmethod
+    def build_login_stub(username: str, success: bool = True) -> Dict[str, Any]:
+        """Build stub mapping for login endpoint"""
+        return {
             "request": {
                 "method": "POST",
                 "url": "/api/login",
@@ -49,14 +109,11 @@ class WireMockService(LoggingMixin):
                 }
             }
         }
-        self.logger.info(f"Creating login stub for user: {username} (success: {success})")
-        return self.create_stub(stub_config)
 
-    @log_api_call("Create dynamic content stub")
-    @log_function_call(log_args=True, log_result=True)
-    def create_dynamic_content_stub(self, delay: int = 0) -> bool:
-        """Create stub for dynamic content with delay"""
-        stub_config = {
+    @staticmethod
+    def build_dynamic_content_stub(delay: int = 0) -> Dict[str, Any]:
+        """Build stub mapping for dynamic content with delay"""
+        return {
             "request": {
                 "method": "GET",
                 "url": "/api/dynamic-content"
@@ -70,8 +127,6 @@ class WireMockService(LoggingMixin):
                 "fixedDelayMilliseconds": delay * 1000
             }
         }
-        self.logger.info(f"Creating dynamic content stub with delay: {delay}s")
-        return self.create_stub(stub_config)
 
     @log_api_call("Reset mappings")
     @log_function_call(log_result=True)
@@ -86,10 +141,100 @@ class WireMockService(LoggingMixin):
             self.logger.warning("Failed to reset WireMock mappings")
         return success
 
+    @log_api_call("Remove mappings by metadata")
+    @log_function_call(log_args=True, log_result=True)
+    def remove_stubs_by_metadata(self, pattern: Dict[str, Any]) -> bool:
+        """Remove only the stub mappings whose metadata matches pattern"""
+        url = f"{self.base_url}/__admin/mappings/remove-by-metadata"
+        response = self.session.post(url, json=pattern)
+        success = response.status_code == 200
+        if success:
+            self.logger.info(f"WireMock mappings removed by metadata: {pattern}")
+        else:
+            self.logger.warning(f"Failed to remove WireMock mappings by metadata: {response.text}")
+        return success
+
+    @log_api_call("Remove scoped mappings")
+    @log_function_call(log_result=True)
+    def remove_scoped_stubs(self) -> bool:
+        """Remove stub mappings registered through this service scope, leaving other workers' stubs intact"""
+        if not self.scope:
+            self.logger.warning("WireMockService has no scope, nothing to remove")
+            return False
+        key = "test" if "test" in self.scope else next(iter(self.scope))
+        return self.remove_stubs_by_metadata({
+            "matchesJsonPath": {
+                "expression": f"$.scope.{key}",
+                "equalTo": self.scope[key]
+            }
+        })
+
     @log_api_call("Get received requests")
     @log_function_call(log_result=True)
     def get_requests(self) -> Dict[str, Any]:
         """Get all received requests"""
         url = f"{self.base_url}/__admin/requests"
         response = self.session.get(url)
-        return response.json()
\ No newline at end of file
+        return response.json()
+
+    @log_api_call("Find received requests")
+    @log_function_call(log_args=True, log_result=True)
+    def find_requests(self, pattern: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Get received requests matching pattern, filtered on the server side"""
+        url = f"{self.base_url}/__admin/requests/find"
+        response = self.session.post(url, json=pattern)
+        response.raise_for_status()
+        return response.json().get("requests", [])
+
+    @log_api_call("Count received requests")
+    @log_function_call(log_args=True, log_result=True)
+    def count_requests(self, pattern: Dict[str, Any]) -> int:
+        """Count received requests matching pattern without downloading the journal"""
+        return self._count_requests(pattern)
+
+    @log_api_call("Wait for received requests")
+    @log_function_call(log_args=True, log_result=True)
+    def wait_for_requests(self, pattern: Dict[str, Any], count: int = 1, timeout: float = 10,
+                          poll_interval: float = 0.05, max_poll_interval: float = 1.0) -> int:
+        """Wait until at least count requests matching pattern have arrived"""
+        deadline = time.monotonic() + timeout
+        interval = poll_interval
+
+        while True:
+            received = self._count_requests(pattern)
+            if received >= count:
+                self.logger.debug(f"Received {received} matching requests")
+                return received
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Expected {count} requests matching {pattern}, got {received} within {timeout}s")
+
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_poll_interval)
+
+    def _count_requests(self, pattern: Dict[str, Any]) -> int:
+        url = f"{self.base_url}/__admin/requests/count"
+        response = self.session.post(url, json=pattern)
+        response.raise_for_status()
+        return response.json()["count"]
+
+    def _with_scope(self, mapping: Dict[str, Any]) -> Dict[str, Any]:
+        """Tag mapping with scope metadata so it can be removed without a global reset"""
+        if not self.scope:
+            return mapping
+        scoped = dict(mapping)
+        scoped["metadata"] = {**mapping.get("metadata", {}), "scope": dict(self.scope)}
+        return scoped
+
+    @staticmethod
+    def _prepare_mapping(mapping: Dict[str, Any], persistent: bool) -> Dict[str, Any]:
+        """Give mapping a content-based id so re-importing the same set overwrites instead of duplicating"""
+        prepared = dict(mapping)
+        if "id" not in prepared:
+            content = json.dumps(mapping, sort_keys=True)
+            prepared["id"] = str(uuid.uuid5(uuid.NAMESPACE_URL, content))
+        if persistent:
+            # Persistent mappings are kept by WireMock when mappings are reset
+            prepared["persistent"] = True
+        return prepared
\ No newline at end of file
@@ -0,0 +1,87 @@
+import pytest
+import allure
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from utils import adaptive_wait
+from utils.adaptive_wait import AdaptiveWait, WaitStats
+from utils.log_decorators import LoggingMixin
+
+
+class FakeClock:
+    """Stands in for the time module of adaptive_wait, sleeping only advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeDriver:
+    """Driver handed to the wait conditions, counting their calls"""
+
+    def __init__(self):
+        self.checks = 0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(adaptive_wait, "time", clock)
+    return clock
+
+
+def wait(timeout, **kwargs):
+    return AdaptiveWait(FakeDriver(), timeout, jitter=0, stats=WaitStats(), **kwargs)
+
+
+def never(driver):
+    driver.checks += 1
+    raise NoSuchElementException("not there yet")
+
+
+@allure.epic("Page Objects")
+@allure.feature("Adaptive Wait")
+@pytest.mark.ui
+class TestAdaptiveWait(LoggingMixin):
+    @allure.story("Polling")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_first_poll_immediate(self, clock):
+        adaptive = wait(10)
+
+        assert adaptive.until(lambda driver: "found") == "found"
+        assert adaptive.polls == 1
+        assert clock.sleeps == []
+
+    @allure.story("Polling")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_interval_grows_up_to_ceiling(self, clock):
+        adaptive = wait(2, initial_interval=0.05, max_interval=0.4, backoff=2)
+
+        with pytest.raises(TimeoutException):
+            adaptive.until(never)
+
+        assert clock.sleeps[:5] == pytest.approx([0.05, 0.1, 0.2, 0.4, 0.4])
+        assert max(clock.sleeps) == pytest.approx(0.4)
+        # The last sleep is cut to the time left, the wait ends on its deadline
+        assert clock.now == pytest.approx(2)
+        assert adaptive.polls == len(clock.sleeps) + 1
+        assert adaptive.stats.summary()["never"]["timeouts"] == 1
+
+    @allure.story("Shared Deadline")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_nested_wait_limited_by_outer_deadline(self, clock):
+        inner = wait(30)
+
+        def inner_wait(driver):
+            return inner.until(never)
+
+        with pytest.raises(TimeoutException):
+            wait(5).until(inner_wait)
+
+        assert clock.now == pytest.approx(5)
+        assert inner.polls > 1
@@ -0,0 +1,143 @@
+import json
+import pytest
+import allure
+from utils import driver_factory
+from utils.browser_contexts import BrowserContextPool, DevToolsConnection
+from utils.log_decorators import LoggingMixin
+
+
+class FakeBrowserSocket:
+    """Browser DevTools endpoint that answers Target commands, sending an event before every reply"""
+
+    def __init__(self):
+        self.commands = []
+        self.contexts = set()
+        self.pending = []
+        self.closed = False
+
+    def send(self, data):
+        command = json.loads(data)
+        self.commands.append(command)
+        method, params = command["method"], command["params"]
+        if method == "Target.createBrowserContext":
+            context_id = f"context-{len(self.commands)}"
+            self.contexts.add(context_id)
+            reply = {"result": {"browserContextId": context_id}}
+        elif method == "Target.createTarget":
+            reply = {"result": {"targetId": f"target-in-{params['browserContextId']}"}}
+        elif method == "Target.disposeBrowserContext" and params["browserContextId"] in self.contexts:
+            self.contexts.remove(params["browserContextId"])
+            reply = {"result": {}}
+        else:
+            reply = {"error": {"code": -32000, "message": "Failed to find context"}}
+        self.pending += [{"method": "Target.targetInfoChanged", "params": {}}, {"id": command["id"], **reply}]
+
+    def recv(self):
+        return json.dumps(self.pending.pop(0))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSharedBrowser:
+    profile = {"window_size": (1280, 720)}
+    debugger_address = "127.0.0.1:9222"
+
+    def __init__(self):
+        self.clients = 0
+
+    def acquire(self):
+        self.clients += 1
+        return self.debugger_address
+
+    def release(self):
+        self.clients -= 1
+
+
+class FakeSwitchTo:
+    def __init__(self, session):
+        self.session = session
+
+    def window(self, handle):
+        self.session.window = handle
+
+
+class FakeSession:
+    """Attached WebDriver session, ChromeDriver would list only its context's targets"""
+
+    def __init__(self, browser_context_id):
+        self.browser_context_id = browser_context_id
+        self.window = None
+        self.quit_called = False
+        self.switch_to = FakeSwitchTo(self)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def browser_socket(monkeypatch):
+    socket = FakeBrowserSocket()
+    monkeypatch.setattr(DevToolsConnection, "connect", classmethod(lambda cls, address: cls(socket)))
+    return socket
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    opened = []
+
+    def attach_driver(address, reuse_service=False, browser_context_id=None):
+        opened.append(FakeSession(browser_context_id))
+        return opened[-1]
+
+    monkeypatch.setattr(driver_factory, "attach_driver", attach_driver)
+    return opened
+
+
+@allure.epic("Browser")
+@allure.feature("Browser Contexts")
+@pytest.mark.ui
+class TestBrowserContexts(LoggingMixin):
+    @allure.story("Context Lifecycle")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_context_opened_and_disposed_over_browser_endpoint(self, browser_socket, sessions):
+        shared_browser = FakeSharedBrowser()
+        pool = BrowserContextPool(shared_browser).start()
+
+        driver = pool.open()
+        assert driver.browser_context_id in browser_socket.contexts
+        assert driver.window == f"target-in-{driver.browser_context_id}"
+
+        pool.close(driver)
+        pool.stop()
+
+        assert [command["method"] for command in browser_socket.commands] == [
+            "Target.createBrowserContext", "Target.createTarget", "Target.disposeBrowserContext"]
+        assert driver.quit_called
+        assert browser_socket.contexts == set()
+        assert browser_socket.closed
+        assert shared_browser.clients == 0
+
+    @allure.story("Context Lifecycle")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_contexts_of_sessions_kept_apart(self, browser_socket, sessions):
+        pool = BrowserContextPool(FakeSharedBrowser()).start()
+        first, second = pool.open(), pool.open()
+        pool.close(first)
+
+        assert first.browser_context_id != second.browser_context_id
+        assert browser_socket.contexts == {second.browser_context_id}
+
+        pool.close(second)
+        pool.stop()
+
+    @allure.story("DevTools Connection")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_browser_error_raised_for_failed_command(self, browser_socket):
+        devtools = DevToolsConnection(browser_socket)
+
+        with pytest.raises(RuntimeError, match="Failed to find context"):
+            devtools.execute("Target.disposeBrowserContext", {"browserContextId": "missing"})
+        # Ids keep increasing, a late reply cannot be taken for the next command's
+        assert devtools.execute("Target.createBrowserContext")["browserContextId"]
+        assert [command["id"] for command in browser_socket.commands] == [1, 2]
@@ -0,0 +1,101 @@
+import pytest
+import allure
+from services.database_service import DatabaseService
+from services.query_profiler import QueryProfiler
+from utils.log_decorators import LoggingMixin
+
+PLAN = [("Seq Scan on users  (cost=0.00..1.01 rows=1 width=4)",)]
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 1
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        self.connection.statements.append(query)
+        self._rows = PLAN if query.startswith("EXPLAIN") else [{"id": 1}]
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    """Records every statement sent, COMMIT and ROLLBACK included"""
+
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.statements.append("COMMIT")
+
+    def rollback(self):
+        self.statements.append("ROLLBACK")
+
+
+@allure.epic("Database")
+@allure.feature("Query Profiling")
+@pytest.mark.database
+class TestDatabaseProfiling(LoggingMixin):
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        # Every statement counts as slow, so each one goes through plan capture
+        self.service = DatabaseService({}, slow_query_threshold_ms=0)
+        self.service.connection = FakeConnection()
+        yield
+
+    @allure.story("Write Plans")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_write_plan_captured_without_analyze_before_commit(self):
+        query = "UPDATE users SET active = %s WHERE id = %s"
+        self.service.execute_update(query, (True, 1))
+
+        assert self.service.connection.statements == [
+            query,
+            "SAVEPOINT query_plan_capture",
+            f"EXPLAIN {query}",
+            "ROLLBACK TO SAVEPOINT query_plan_capture",
+            "RELEASE SAVEPOINT query_plan_capture",
+            "COMMIT"
+        ]
+        report = self.service.profiler.build_report()
+        assert report["slowest"][0]["plan"] == PLAN[0][0]
+
+    @allure.story("Read Plans")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_read_plan_captured_with_analyze(self):
+        query = "SELECT * FROM users WHERE username = %s"
+        assert self.service.execute_query(query, ("alice",)) == [{"id": 1}]
+        assert f"EXPLAIN (ANALYZE, BUFFERS) {query}" in self.service.connection.statements
+
+    @allure.story("DDL")
+    @allure.severity(allure.severity_level.MINOR)
+    def test_ddl_is_not_explained(self):
+        query = "CREATE INDEX users_username ON users (username)"
+        self.service.execute_update(query)
+
+        assert self.service.connection.statements == [query, "COMMIT"]
+        assert self.service.profiler.build_report()["slowest"][0]["plan"] is None
+
+    @allure.story("Statement Grouping")
+    @allure.severity(allure.severity_level.MINOR)
+    def test_statements_differing_by_values_are_grouped(self):
+        profiler = QueryProfiler(slow_threshold_ms=100)
+        assert not profiler.record("SELECT * FROM users WHERE id IN (1, 2, 3) AND name = 'a'", 3)
+        assert profiler.record("SELECT * FROM users WHERE id IN (4, 5) AND name = 'b'", 150)
+
+        report = profiler.build_report()
+        assert report["total_statements"] == 1
+        assert report["slowest"][0]["calls"] == 2
+        assert report["slowest"][0]["slow_calls"] == 1
+        assert QueryProfiler.statement_type("/* tag */ (SELECT 1)") == "SELECT"
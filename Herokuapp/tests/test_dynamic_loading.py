@@ -1,7 +1,6 @@
 import pytest
 import allure
 from pages.dynamic_loading_page import DynamicLoadingPage
-from services.wiremock_service import WireMockService
 from utils.log_decorators import LoggingMixin
 
 
@@ -13,7 +12,6 @@ class TestDynamicLoading(LoggingMixin):
         self.driver = driver
         self.config = config
         self.dynamic_loading_page = DynamicLoadingPage(driver)
-        self.wiremock_service = WireMockService()
 
         self.logger.info(f"Test setup completed for environment: {config.environment}")
 
@@ -71,14 +69,40 @@ class TestDynamicLoading(LoggingMixin):
 
     @allure.story("WireMock Integration")
     @allure.severity(allure.severity_level.NORMAL)
-    def test_dynamic_content_with_wiremock(self):
+    @pytest.mark.wiremock
+    def test_dynamic_content_with_wiremock(self, wiremock_service):
         self.logger.info("Starting test_dynamic_content_with_wiremock")
 
         with allure.step("Setup WireMock stub for dynamic content"):
-            success = self.wiremock_service.create_dynamic_content_stub(delay=2)
+            success = wiremock_service.create_dynamic_content_stub(delay=2)
             assert success, "Failed to create WireMock stub"
             self.logger.info("WireMock stub created successfully")
 
-        with allure.step("Reset WireMock mappings after test"):
-            self.wiremock_service.reset_mappings()
-            self.logger.info("WireMock mappings reset")
\ No newline at end of file
+        with allure.step("Remove this test's WireMock mappings"):
+            assert wiremock_service.remove_scoped_stubs(), "Failed to remove scoped WireMock mappings"
+            self.logger.info("WireMock scoped mappings removed")
+
+    @allure.story("Browser Request Mocking")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_dynamic_content_with_browser_mock(self):
+        self.logger.info("Starting test_dynamic_content_with_browser_mock")
+        from utils.request_interceptor import RequestInterceptor
+        browser_name = self.driver.capabilities.get("browserName")
+        if browser_name not in RequestInterceptor.SUPPORTED_BROWSERS:
+            pytest.skip(f"Browser request mocking needs Chrome DevTools, not available in {browser_name}")
+
+        with allure.step("Mock dynamic content API inside the browser"):
+            route = self.dynamic_loading_page.mock_route(
+                "*/api/dynamic-content",
+                json_body={"content": "Hello World!", "loaded": True},
+                delay=0.5
+            )
+
+        with allure.step("Navigate to dynamic loading page"):
+            self.dynamic_loading_page.navigate_to_dynamic_loading(self.config.base_url)
+
+        with allure.step("Fetch dynamic content from page"):
+            content = self.dynamic_loading_page.fetch_json("/api/dynamic-content")
+            assert content == {"content": "Hello World!", "loaded": True}, f"Unexpected mocked content: {content}"
+            assert route.hits == 1, "Mocked route should serve exactly one request"
+            self.logger.info(f"Browser mock served content: {content}")
\ No newline at end of file
@@ -0,0 +1,127 @@
+import pytest
+import allure
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from pages.base_page import BasePage
+from utils.element_proxy import ElementProxy
+from utils.log_decorators import LoggingMixin
+
+LOCATOR = (By.ID, "submit")
+
+
+class FakeElement:
+    """WebElement stand-in that can go stale or hidden like a re-rendered node"""
+
+    def __init__(self, text):
+        self.text_value = text
+        self.stale = False
+        self.displayed = True
+        self.clicks = 0
+
+    def _check(self):
+        if self.stale:
+            raise StaleElementReferenceException("element is not attached to the page document")
+
+    @property
+    def text(self):
+        self._check()
+        return self.text_value
+
+    def click(self):
+        self._check()
+        self.clicks += 1
+
+    def is_displayed(self):
+        self._check()
+        return self.displayed
+
+    def is_enabled(self):
+        self._check()
+        return True
+
+
+class FakeDriver:
+    """Returns the current element for any locator, counting lookups"""
+
+    def __init__(self, element):
+        self.element = element
+        self.lookups = 0
+
+    def find_element(self, by, value):
+        self.lookups += 1
+        return self.element
+
+
+@allure.epic("Page Objects")
+@allure.feature("Element Cache")
+@pytest.mark.ui
+class TestElementProxy(LoggingMixin):
+    @allure.story("Cached Lookup")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_element_found_once_for_repeated_actions(self):
+        element = FakeElement("Submit")
+        proxy = ElementProxy(LOCATOR, lambda locator: element)
+
+        assert proxy.text == "Submit"
+        proxy.click()
+
+        assert proxy.lookups == 1
+        assert element.clicks == 1
+
+    @allure.story("Stale Element")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_stale_element_found_again_from_locator(self):
+        old, new = FakeElement("Submit"), FakeElement("Submit")
+        found = iter([old, new])
+        proxy = ElementProxy(LOCATOR, lambda locator: next(found))
+        proxy.click()
+
+        old.stale = True
+        proxy.click()
+
+        assert proxy.lookups == 2
+        assert (old.clicks, new.clicks) == (1, 1)
+
+    @allure.story("Stale Element")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_stale_element_failing_ready_check_found_again(self):
+        old, new = FakeElement("Old"), FakeElement("New")
+        found = iter([old, new])
+        proxy = ElementProxy(LOCATOR, lambda locator: next(found), lambda element: element.is_displayed())
+        assert proxy.text == "Old"
+
+        old.stale = True
+
+        assert proxy.element is new
+        assert proxy.lookups == 2
+
+    @allure.story("Wait Condition")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_hidden_element_waited_for_again(self):
+        element = FakeElement("Saved")
+        driver = FakeDriver(element)
+        page = BasePage(driver)
+        proxy = page.element(LOCATOR, page.wait_for_element_visible)
+        assert proxy.text == "Saved"
+
+        # Hidden since the visibility wait found it: cached element must not be reused
+        element.displayed = False
+        driver.element = FakeElement("Shown again")
+
+        assert proxy.text == "Shown again"
+        assert proxy.lookups == 2
+
+    @allure.story("Wait Condition")
+    @allure.severity(allure.severity_level.MINOR)
+    def test_custom_wait_runs_on_every_use(self):
+        driver = FakeDriver(FakeElement("Custom"))
+        page = BasePage(driver)
+
+        def wait_for_custom(locator):
+            return driver.find_element(*locator)
+
+        proxy = page.element(LOCATOR, wait_for_custom)
+        assert proxy.text == "Custom"
+        assert proxy.text == "Custom"
+
+        assert driver.lookups == 2
@@ -0,0 +1,44 @@
+import pytest
+import allure
+from benchmarks.locator_profiler import xpath_to_css
+from utils.log_decorators import LoggingMixin
+
+
+@allure.epic("Page Objects")
+@allure.feature("Locator Profiler")
+@pytest.mark.ui
+class TestXpathToCss(LoggingMixin):
+    @allure.story("CSS Suggestion")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_descendant_and_child_axes(self):
+        assert xpath_to_css("//div//button") == "div button"
+        assert xpath_to_css("//ul/li") == "ul > li"
+        assert xpath_to_css("//*") == "*"
+
+    @allure.story("CSS Suggestion")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_attribute_predicates(self):
+        assert xpath_to_css("//div[@id='main']//button") == 'div[id="main"] button'
+        assert xpath_to_css('//input[@type="text"][@disabled]') == 'input[type="text"][disabled]'
+        assert xpath_to_css("//form[@name='login']/input[@data-test='user']") == \
+            'form[name="login"] > input[data-test="user"]'
+
+    @allure.story("CSS Suggestion")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_contains_predicate(self):
+        assert xpath_to_css("//*[contains(@class, 'btn')]") == '[class*="btn"]'
+        assert xpath_to_css("//a[contains(@href,'/cart')]") == 'a[href*="/cart"]'
+
+    @allure.story("No Direct Translation")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_positional_and_text_predicates_not_translated(self):
+        assert xpath_to_css("//li[2]") is None
+        assert xpath_to_css("//li[last()]") is None
+        assert xpath_to_css("(//div)[1]") is None
+        assert xpath_to_css("//button[text()='Save']") is None
+        assert xpath_to_css("//a[contains(text(), 'Cart')]") is None
+
+    @allure.story("No Direct Translation")
+    @allure.severity(allure.severity_level.MINOR)
+    def test_absolute_path_not_translated(self):
+        assert xpath_to_css("/html/body") is None
@@ -0,0 +1,143 @@
+import time
+import pytest
+import allure
+import requests
+from services.wiremock_service import WireMockService
+from services.embedded_mock_server import EmbeddedMockServer
+from utils.log_decorators import LoggingMixin
+
+
+@allure.epic("Service Virtualization")
+@allure.feature("WireMock Service")
+@pytest.mark.wiremock
+class TestWireMockService(LoggingMixin):
+    @pytest.fixture(autouse=True)
+    def setup(self, wiremock_service, wiremock_url):
+        self.wiremock_service = wiremock_service
+        self.wiremock_url = wiremock_url
+        yield
+        self.logger.info("Test cleanup completed")
+
+    @allure.story("Login Stub")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_login_stub_matches_body(self):
+        with allure.step("Create login stubs"):
+            assert self.wiremock_service.create_login_stub("stub_user_ok", success=True)
+            assert self.wiremock_service.create_login_stub("stub_user_bad", success=False)
+
+        with allure.step("Verify stubs are matched by request body"):
+            response = requests.post(f"{self.wiremock_url}/api/login", json={"username": "stub_user_ok"})
+            assert response.status_code == 200
+            assert response.json()["authenticated"] is True
+
+            response = requests.post(f"{self.wiremock_url}/api/login", json={"username": "stub_user_bad"})
+            assert response.status_code == 401
+
+    @allure.story("Batch Stub Registration")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_import_stubs_registers_whole_set(self):
+        mappings = [
+            {"request": {"method": "GET", "url": f"/api/batch/{index}"},
+             "response": {"status": 200, "jsonBody": {"index": index}}}
+            for index in range(20)
+        ]
+
+        with allure.step("Import mapping set in one call"):
+            assert self.wiremock_service.import_stubs(mappings)
+
+        with allure.step("Verify imported stubs are served"):
+            response = requests.get(f"{self.wiremock_url}/api/batch/7")
+            assert response.json() == {"index": 7}
+
+    @allure.story("Session Stubs")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_session_stubs_are_registered(self):
+        with allure.step("Verify stub from session mapping file is served"):
+            response = requests.get(f"{self.wiremock_url}/api/status")
+            assert response.status_code == 200
+            assert response.json()["status"] == "UP"
+
+    @allure.story("Request Journal")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_find_and_count_requests(self):
+        pattern = {"method": "POST", "url": "/api/journal"}
+        self.wiremock_service.create_stub({"request": pattern, "response": {"status": 204}})
+
+        with allure.step("Send requests"):
+            for index in range(3):
+                requests.post(f"{self.wiremock_url}/api/journal", json={"index": index})
+
+        with allure.step("Verify server-side filtered journal"):
+            assert self.wiremock_service.wait_for_requests(pattern, count=3, timeout=5) >= 3
+            assert self.wiremock_service.count_requests(pattern) >= 3
+            found = self.wiremock_service.find_requests(
+                {**pattern, "bodyPatterns": [{"contains": '"index": 1'}]})
+            assert len(found) >= 1
+
+    @allure.story("Scoped Cleanup")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_scoped_cleanup_keeps_other_scopes(self):
+        other_worker = WireMockService(self.wiremock_url, scope={"worker": "other", "test": "other::test"})
+
+        with allure.step("Create stubs in two scopes"):
+            assert self.wiremock_service.create_stub(
+                {"request": {"method": "GET", "url": "/api/scoped/own"}, "response": {"status": 200}})
+            assert other_worker.create_stub(
+                {"request": {"method": "GET", "url": "/api/scoped/other"}, "response": {"status": 200}})
+
+        with allure.step("Remove own scope only"):
+            assert self.wiremock_service.remove_scoped_stubs()
+            assert requests.get(f"{self.wiremock_url}/api/scoped/own").status_code == 404
+            assert requests.get(f"{self.wiremock_url}/api/scoped/other").status_code == 200
+
+        with allure.step("Cleanup other scope"):
+            assert other_worker.remove_scoped_stubs()
+
+
+@allure.epic("Service Virtualization")
+@allure.feature("Embedded Mock Server")
+@pytest.mark.wiremock
+class TestEmbeddedMockServer(LoggingMixin):
+    @allure.story("Fixed Delay")
+    @allure.severity(allure.severity_level.MINOR)
+    def test_dynamic_content_stub_delay(self):
+        with EmbeddedMockServer() as server:
+            service = WireMockService(server.base_url)
+            stub = service.build_dynamic_content_stub()
+            stub["response"]["fixedDelayMilliseconds"] = 300
+            assert service.create_stub(stub)
+
+            start_time = time.monotonic()
+            response = requests.get(f"{server.base_url}/api/dynamic-content")
+            elapsed = time.monotonic() - start_time
+
+            assert response.json()["content"] == "Hello World!"
+            assert elapsed >= 0.3, f"Response should be delayed, took {elapsed:.3f}s"
+
+    @allure.story("Request Matching")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_unsupported_matcher_does_not_match(self):
+        with EmbeddedMockServer() as server:
+            service = WireMockService(server.base_url)
+            assert service.create_stub({
+                "request": {"method": "POST", "url": "/api/orders",
+                            "bodyPatterns": [{"matchesXPath": "/order[@id='1']"}]},
+                "response": {"status": 201}
+            })
+
+            response = requests.post(f"{server.base_url}/api/orders", data="<order id='2'/>")
+
+            assert response.status_code == 404
+
+    @allure.story("Mappings Reset")
+    @allure.severity(allure.severity_level.MINOR)
+    def test_reset_keeps_persistent_mappings(self):
+        with EmbeddedMockServer() as server:
+            service = WireMockService(server.base_url)
+            assert service.import_stubs([service.build_login_stub("persistent_user")], persistent=True)
+            assert service.create_dynamic_content_stub()
+
+            assert service.reset_mappings()
+
+            mappings = requests.get(f"{server.base_url}/__admin/mappings").json()["mappings"]
+            assert [m["request"]["url"] for m in mappings] == ["/api/login"]
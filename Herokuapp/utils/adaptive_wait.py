@@ -0,0 +1,144 @@
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from .log_decorators import LoggingMixin
+from .report_paths import reports_path
+
+T = TypeVar("T")
+
+# Deadlines of the waits running in this thread, innermost last
+_deadlines = threading.local()
+
+
+class WaitStats(LoggingMixin):
+    """Polls and time used by every wait, summarised by wait name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records: List[Tuple[str, int, float, bool]] = []
+
+    def record(self, name: str, polls: int, elapsed: float, timed_out: bool) -> None:
+        with self._lock:
+            self.records.append((name, polls, elapsed, timed_out))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """name -> waits, timeouts, total/average/max polls and average seconds, most polls first"""
+        grouped: Dict[str, List[Tuple[str, int, float, bool]]] = {}
+        with self._lock:
+            for record in self.records:
+                grouped.setdefault(record[0], []).append(record)
+        summary = {}
+        for name, records in sorted(grouped.items(), key=lambda item: -sum(r[1] for r in item[1])):
+            polls = [record[1] for record in records]
+            summary[name] = {
+                "waits": len(records),
+                "timeouts": sum(1 for record in records if record[3]),
+                "polls": sum(polls),
+                "avg_polls": round(sum(polls) / len(polls), 2),
+                "max_polls": max(polls),
+                "avg_seconds": round(sum(record[2] for record in records) / len(records), 3),
+            }
+        return summary
+
+    def write_report(self, path: str = None) -> Optional[str]:
+        """Summary of the waits of this session; one file per xdist worker"""
+        path = path or reports_path("wait_stats.json")
+        if not self.records:
+            return None
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        if worker:
+            root, ext = os.path.splitext(path)
+            path = f"{root}_{worker}{ext}"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, indent=2)
+        self.logger.info(f"Wait statistics saved: {path}")
+        return path
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+
+# Collects every AdaptiveWait of the process
+wait_stats = WaitStats()
+
+
+class AdaptiveWait:
+    """WebDriverWait replacement that checks the condition at once, then polls with exponential backoff
+    and jitter up to a ceiling; waits started inside a condition share the deadline of the outer wait"""
+
+    INITIAL_INTERVAL = 0.05
+    MAX_INTERVAL = 0.5
+    BACKOFF = 1.6
+    JITTER = 0.2
+
+    def __init__(self, driver, timeout: float, name: str = None, initial_interval: float = INITIAL_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, backoff: float = BACKOFF, jitter: float = JITTER,
+                 ignored_exceptions: Iterable[type] = None, stats: WaitStats = wait_stats):
+        self._driver = driver
+        self._timeout = float(timeout)
+        self.name = name
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self._ignored_exceptions = (NoSuchElementException, *(ignored_exceptions or ()))
+        self.stats = stats
+        self.polls = 0
+
+    def intervals(self):
+        """Sleep before each poll after the first: growing by backoff up to max_interval, +-jitter"""
+        interval = self.initial_interval
+        while True:
+            yield interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            interval = min(interval * self.backoff, self.max_interval)
+
+    def until(self, method: Callable[[Any], T], message: str = "") -> T:
+        """Value of method once it is truthy, TimeoutException when the (shared) deadline passes"""
+        return self._poll(method, message, lambda value: value, "until")
+
+    def until_not(self, method: Callable[[Any], Any], message: str = ""):
+        """Falsy value of method (True if it raised an ignored exception) once it is falsy"""
+        return self._poll(method, message, lambda value: not value, "until_not")
+
+    def _poll(self, method: Callable, message: str, done: Callable[[Any], bool], mode: str):
+        name = self.name or getattr(method, "__name__", None) or method.__class__.__name__
+        start = time.monotonic()
+        deadline = start + self._timeout
+        stack = getattr(_deadlines, "stack", None)
+        if stack is None:
+            stack = _deadlines.stack = []
+        if stack:
+            # A nested wait never outlives the wait it runs in
+            deadline = min(deadline, stack[-1])
+        stack.append(deadline)
+        self.polls = 0
+        screen = stacktrace = None
+        intervals = self.intervals()
+        try:
+            while True:
+                self.polls += 1
+                try:
+                    value = method(self._driver)
+                    if done(value):
+                        self.stats.record(name, self.polls, time.monotonic() - start, False)
+                        return value
+                except self._ignored_exceptions as e:
+                    if mode == "until_not":
+                        self.stats.record(name, self.polls, time.monotonic() - start, False)
+                        return True
+                    screen = getattr(e, "screen", None)
+                    stacktrace = getattr(e, "stacktrace", None)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(next(intervals), remaining))
+        finally:
+            stack.pop()
+        self.stats.record(name, self.polls, time.monotonic() - start, True)
+        raise TimeoutException(message or f"{name} timed out after {self.polls} polls", screen, stacktrace)
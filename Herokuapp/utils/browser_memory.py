@@ -0,0 +1,141 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+from .log_decorators import LoggingMixin
+from .report_paths import reports_path
+from .process_tree import memory_mb
+
+MB = 1024 * 1024
+
+
+def js_heap_mb(driver) -> Optional[float]:
+    """JS heap used by the current page, None where DevTools is not available (Firefox)"""
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return None
+    try:
+        return driver.execute_cdp_cmd("Runtime.getHeapUsage", {})["usedSize"] / MB
+    except Exception:
+        return None
+
+
+def visited_origins(driver) -> Set[str]:
+    """Web origins in the tab's navigation history and the frames of the current page (DevTools)"""
+    urls = [entry["url"] for entry in driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]]
+    frames = [driver.execute_cdp_cmd("Page.getFrameTree", {})["frameTree"]]
+    while frames:
+        frame = frames.pop()
+        urls.append(frame["frame"]["url"])
+        frames.extend(frame.get("childFrames", []))
+    origins = set()
+    for url in urls:
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https") and parts.netloc:
+            origins.add(f"{parts.scheme}://{parts.netloc}")
+    return origins
+
+
+class BrowserMemoryMonitor(LoggingMixin):
+    """Samples browser memory around every test, decides when a reused browser is recycled
+    and records per-test memory deltas"""
+
+    def __init__(self, rss_limit_mb: float = 1500, js_heap_limit_mb: float = 512, max_tests: int = 50,
+                 report_file: str = None):
+        self.rss_limit_mb = rss_limit_mb
+        self.js_heap_limit_mb = js_heap_limit_mb
+        self.max_tests = max_tests
+        self.report_file = report_file or reports_path("browser_memory.json")
+        self.records: List[Dict[str, Any]] = []
+
+    def sample(self, driver, own_processes: bool = True) -> Dict[str, Optional[float]]:
+        """Memory of the browser process tree and JS heap of the current page, in MB"""
+        rss = None
+        if own_processes:
+            pids = getattr(driver, "browser_pids", None)
+            if pids is None:
+                from .driver_reaper import session_process_ids
+                pids = driver.browser_pids = session_process_ids(driver, include_service=False)
+            rss = memory_mb(pids) if pids else None
+        return {"rss_mb": rss, "js_heap_mb": js_heap_mb(driver)}
+
+    def record(self, nodeid: str, before: Dict[str, Optional[float]], after: Dict[str, Optional[float]],
+               tests_in_browser: int = 1) -> None:
+        record = {"test": nodeid, "tests_in_browser": tests_in_browser, "before": before, "after": after}
+        for key in ("rss_mb", "js_heap_mb"):
+            if before[key] is not None and after[key] is not None:
+                record[f"{key}_delta"] = after[key] - before[key]
+        self.records.append(record)
+
+    def over_limit(self, sample: Dict[str, Optional[float]], tests_in_browser: int) -> Optional[str]:
+        """Reason to recycle the browser, None while it is within limits"""
+        if sample["rss_mb"] is not None and sample["rss_mb"] > self.rss_limit_mb:
+            return f"browser memory {sample['rss_mb']:.0f}MB over {self.rss_limit_mb}MB"
+        if sample["js_heap_mb"] is not None and sample["js_heap_mb"] > self.js_heap_limit_mb:
+            return f"JS heap {sample['js_heap_mb']:.0f}MB over {self.js_heap_limit_mb}MB"
+        if self.max_tests and tests_in_browser >= self.max_tests:
+            return f"{tests_in_browser} tests run in browser"
+        return None
+
+    def write_report(self) -> Optional[str]:
+        """Per-test deltas, largest browser memory growth first; one file per xdist worker"""
+        if not self.records:
+            return None
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        path = self.report_file
+        if worker:
+            root, ext = os.path.splitext(path)
+            path = f"{root}_{worker}{ext}"
+        records = sorted(self.records, key=lambda record: record.get("rss_mb_delta", 0), reverse=True)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(records, file, indent=2)
+        top = records[0]
+        if "rss_mb_delta" in top:
+            self.logger.info(f"Largest browser memory growth: {top['test']} ({top['rss_mb_delta']:+.0f}MB)")
+        self.logger.info(f"Browser memory report saved: {path}")
+        return path
+
+
+class ReusableBrowser(LoggingMixin):
+    """Browser kept by a worker between tests, its state is cleared before the next test"""
+
+    def __init__(self):
+        self.driver = None
+        self.tests = 0
+
+    def take(self):
+        """Kept browser, None if there is none"""
+        driver, self.driver = self.driver, None
+        return driver
+
+    def keep(self, driver) -> bool:
+        """Clear cookies and storage of every origin the test visited, False if the browser cannot be reused"""
+        if not hasattr(driver, "execute_cdp_cmd"):
+            # WebDriver alone only reaches the storage of the current origin
+            self.logger.info("Browser without DevTools, storage of visited origins cannot be cleared")
+            return False
+        try:
+            if len(driver.window_handles) > 1:
+                self.logger.info("Test left several windows open, recycling the browser")
+                return False
+            for origin in visited_origins(driver):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            # A new tab starts with empty session storage and navigation history
+            used_tab = driver.current_window_handle
+            driver.switch_to.new_window("tab")
+            fresh_tab = driver.current_window_handle
+            driver.switch_to.window(used_tab)
+            driver.close()
+            driver.switch_to.window(fresh_tab)
+        except Exception as e:
+            self.logger.warning(f"Browser state not cleared, recycling it: {e}")
+            return False
+        self.driver = driver
+        self.tests += 1
+        return True
+
+    def reset(self) -> None:
+        """Forget the browser, the next test starts a new one"""
+        self.driver = None
+        self.tests = 0
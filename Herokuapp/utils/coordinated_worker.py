@@ -0,0 +1,83 @@
+import os
+import socket
+import time
+import pytest
+from .work_coordinator import CoordinatorClient
+from .log_decorators import LoggingMixin
+
+
+class CoordinatedWorkerPlugin(LoggingMixin):
+    """Runs tests leased one at a time from a WorkCoordinator instead of the collected order"""
+
+    WAIT_INTERVAL = 0.5
+
+    def __init__(self, config, address: str, worker: str = None):
+        self.config = config
+        self.address = address
+        self.worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+        self.client = None
+        self._phases = {}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.testsfailed and not session.config.option.continue_on_collection_errors:
+            raise session.Interrupted(f"{session.testsfailed} error(s) during collection")
+        if session.config.option.collectonly:
+            return True
+
+        items = {item.nodeid: item for item in session.items}
+        self.client = CoordinatorClient(self.address, self.worker)
+        self.logger.info(f"Worker {self.worker} connected to coordinator {self.address}")
+        try:
+            current = self._lease(items, block=True)
+            while current is not None:
+                # Lease one ahead so fixtures shared with the next test are not torn down in between
+                upcoming = self._lease(items, block=False)
+                current.config.hook.pytest_runtest_protocol(item=current, nextitem=upcoming)
+                if session.shouldfail:
+                    raise session.Failed(session.shouldfail)
+                if session.shouldstop:
+                    raise session.Interrupted(session.shouldstop)
+                current = upcoming or self._lease(items, block=True)
+        finally:
+            self.client.close()
+        return True
+
+    def pytest_runtest_logreport(self, report):
+        if self.client is None:
+            return
+        phases = self._phases.setdefault(report.nodeid, [])
+        phases.append(report)
+        if report.when != "teardown":
+            return
+
+        reports = self._phases.pop(report.nodeid)
+        if any(r.failed for r in reports):
+            outcome = "failed"
+        elif any(r.skipped for r in reports):
+            outcome = "skipped"
+        else:
+            outcome = "passed"
+        longrepr = next((str(r.longrepr) for r in reports if r.failed), None)
+        self.client.request({"op": "result", "result": {
+            "nodeid": report.nodeid,
+            "outcome": outcome,
+            "duration": sum(r.duration for r in reports),
+            "longrepr": longrepr
+        }})
+
+    def _lease(self, items, block: bool):
+        while True:
+            reply = self.client.request({"op": "next"})
+            if reply["op"] == "run":
+                item = items.get(reply["nodeid"])
+                if item is not None:
+                    return item
+                self.client.request({"op": "result", "result": {
+                    "nodeid": reply["nodeid"], "outcome": "failed", "duration": 0,
+                    "longrepr": f"Test not collected on worker {self.worker}"
+                }})
+                continue
+            if reply["op"] == "done" or not block:
+                return None
+            time.sleep(self.WAIT_INTERVAL)
@@ -1,7 +1,7 @@
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from typing import Callable, Tuple
+from .adaptive_wait import AdaptiveWait
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,11 +11,11 @@ class CustomWaits:
     def __init__(self, driver, timeout: int = 10):
         self.driver = driver
         self.timeout = timeout
-        self.wait = WebDriverWait(driver, timeout)
+        self.wait = AdaptiveWait(driver, timeout)
 
     def wait_for_element_to_have_text(self, locator: Tuple[str, str], text: str, timeout: int = None) -> bool:
         """Wait for element to have specific text"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="CustomWaits.wait_for_element_to_have_text")
         try:
             return wait.until(
                 lambda driver: driver.find_element(*locator).text == text
@@ -26,7 +26,7 @@ class CustomWaits:
 
     def wait_for_element_to_contain_text(self, locator: Tuple[str, str], text: str, timeout: int = None) -> bool:
         """Wait for element to contain specific text"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="CustomWaits.wait_for_element_to_contain_text")
         try:
             return wait.until(
                 lambda driver: text in driver.find_element(*locator).text
@@ -37,7 +37,7 @@ class CustomWaits:
 
     def wait_for_element_to_be_stale(self, element, timeout: int = None) -> bool:
         """Wait for element to become stale (removed from DOM)"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="CustomWaits.wait_for_element_to_be_stale")
         try:
             return wait.until(EC.staleness_of(element))
         except TimeoutException:
@@ -46,7 +46,7 @@ class CustomWaits:
 
     def wait_for_page_to_load(self, timeout: int = None) -> bool:
         """Wait for page to fully load"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="CustomWaits.wait_for_page_to_load")
         try:
             return wait.until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
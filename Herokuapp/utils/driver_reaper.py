@@ -0,0 +1,130 @@
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+from .driver_factory import ReusableServiceMixin, quit_driver
+from .log_decorators import LoggingMixin
+from .process_tree import alive, browser_processes, descendants, find_by_argument, kill_tree, process_table
+
+
+def session_process_ids(driver, include_service: bool = True) -> Set[int]:
+    """Browser process and, unless it is shared, the driver service process of a session"""
+    pids = set()
+    capabilities = driver.capabilities
+    if "moz:processID" in capabilities:
+        pids.add(int(capabilities["moz:processID"]))
+    user_data_dir = capabilities.get("chrome", {}).get("userDataDir")
+    if user_data_dir:
+        table = process_table()
+        matches = find_by_argument(f"--user-data-dir={user_data_dir}", table)
+        # Browser main process: the match whose parent is not a browser process itself
+        pids |= {pid for pid in matches if table[pid][0] not in matches}
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if include_service and process is not None and not isinstance(service, ReusableServiceMixin):
+        pids.add(process.pid)
+    return pids
+
+
+class DriverReaper(LoggingMixin):
+    """Quits sessions on a background thread so the next test does not wait for teardown.
+    Process trees still running after the quit deadline are killed"""
+
+    def __init__(self, quit_timeout: float = 10):
+        self.quit_timeout = quit_timeout
+        self.tracked: Set[int] = set()
+        self.killed: Set[int] = set()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._baseline: Set[int] = set()
+        self._kept: Set[int] = set()
+
+    def start(self) -> "DriverReaper":
+        # Browsers running before this worker started are not ours to report
+        self._baseline = set(browser_processes())
+        self._thread = threading.Thread(target=self._run, name="driver-reaper", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, driver, close: Optional[Callable] = None, own_processes: bool = True) -> None:
+        """Queue session for quitting, close(driver) replaces quit_driver().
+        own_processes=False for sessions attached to a browser other sessions still use"""
+        pids = set()
+        if own_processes:
+            try:
+                pids = session_process_ids(driver)
+            except Exception as e:
+                # Crashed session, whatever it left behind shows up in the leak report
+                self.logger.debug(f"Session processes not found: {e}")
+        self.tracked |= pids
+        self._queue.put((driver, close or quit_driver, pids))
+
+    def keep(self, *pids: int) -> None:
+        """Processes shared with other workers, never reported or killed with their children"""
+        self._kept.update(pids)
+
+    def drain(self) -> None:
+        """Block until every queued session is closed"""
+        self._queue.join()
+
+    def stop(self) -> Dict[int, str]:
+        """Close queued sessions and stop the thread, returns leaked browser processes"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        leaked = self.leaked()
+        if leaked:
+            self.logger.warning(f"Leaked browser processes, killing: "
+                                f"{', '.join(f'{name} ({pid})' for pid, name in sorted(leaked.items()))}")
+            self.killed |= kill_tree(leaked)
+        return leaked
+
+    def leaked(self) -> Dict[int, str]:
+        """Browser and driver processes started by this worker that are still running"""
+        table = process_table()
+        ours = descendants([os.getpid()], table) - {os.getpid()}
+        ours |= alive(self.tracked)
+        ours -= descendants(self._kept, table)
+        return {pid: name for pid, name in browser_processes(table).items()
+                if pid in ours and pid not in self._baseline}
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._reap(*item)
+            except Exception as e:
+                self.logger.error(f"Driver teardown failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _reap(self, driver, close: Callable, pids: Set[int]) -> None:
+        deadline = time.monotonic() + self.quit_timeout
+        closer = threading.Thread(target=self._close, args=(driver, close), name="driver-quit", daemon=True)
+        closer.start()
+        closer.join(self.quit_timeout)
+        if closer.is_alive():
+            self.logger.warning(f"Session did not quit within {self.quit_timeout}s, killing its processes")
+
+        # A browser may still be shutting down right after quit returned
+        remaining = alive(pids)
+        while remaining and time.monotonic() < deadline:
+            time.sleep(0.1)
+            remaining = alive(remaining)
+        if remaining:
+            self.killed |= kill_tree(remaining)
+            self.logger.warning(f"Killed browser processes left by session: {sorted(remaining)}")
+            session_root = getattr(driver, "session_root", None)
+            if session_root:
+                shutil.rmtree(session_root, ignore_errors=True)
+
+    def _close(self, driver, close: Callable) -> None:
+        try:
+            close(driver)
+        except Exception as e:
+            self.logger.warning(f"Failed to quit session: {e}")
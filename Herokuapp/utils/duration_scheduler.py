@@ -0,0 +1,59 @@
+from typing import Callable, List, Optional
+from xdist.scheduler import LoadScheduling
+from .duration_store import DurationStore
+
+
+class DurationScheduling(LoadScheduling):
+    """xdist scheduling that hands out the longest expected tests first"""
+
+    # A worker starts a test only once it knows the next one, so keep exactly two queued
+    PREFETCH = 2
+
+    def __init__(self, config, log=None, store: DurationStore = None,
+                 on_schedule: Optional[Callable[[List[str], int], None]] = None):
+        super().__init__(config, log)
+        self.store = store or DurationStore()
+        self.on_schedule = on_schedule
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = list(self.node2collection.values())[0]
+        expected = [self.store.get(nodeid) for nodeid in self.collection]
+        self.pending[:] = sorted(range(len(self.collection)),
+                                 key=lambda index: (-expected[index], self.collection[index]))
+        if self.on_schedule is not None:
+            self.on_schedule(self.collection, len(self.nodes))
+        if not self.collection:
+            return
+
+        # Deal round-robin so every worker starts with one of the longest tests
+        for _ in range(self.PREFETCH):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration=0):
+        if node.shutting_down:
+            return
+
+        if self.pending:
+            missing = self.PREFETCH - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+
+        self.log("num items waiting for node:", len(self.pending))
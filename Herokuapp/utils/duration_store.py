@@ -0,0 +1,87 @@
+import heapq
+import json
+import os
+import statistics
+from typing import Dict, Iterable, List, Tuple
+from .log_decorators import LoggingMixin
+from .report_paths import reports_path
+
+
+class DurationStore(LoggingMixin):
+    """Historical per-test durations (seconds) kept between runs"""
+
+    DEFAULT_PATH = reports_path("test_durations.json")
+    # Weight of the latest run in the moving average
+    SMOOTHING = 0.5
+    FALLBACK_DURATION = 1.0
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.durations: Dict[str, float] = self._load()
+
+    @property
+    def default_duration(self) -> float:
+        """Expected duration of tests without history"""
+        if not self.durations:
+            return self.FALLBACK_DURATION
+        return statistics.median(self.durations.values())
+
+    def get(self, nodeid: str) -> float:
+        return self.durations.get(nodeid, self.default_duration)
+
+    def expected(self, nodeids: Iterable[str]) -> Dict[str, float]:
+        default = self.default_duration
+        return {nodeid: self.durations.get(nodeid, default) for nodeid in nodeids}
+
+    def update(self, measured: Dict[str, float]) -> None:
+        """Blend measured durations into the history"""
+        for nodeid, duration in measured.items():
+            previous = self.durations.get(nodeid)
+            if previous is None:
+                self.durations[nodeid] = duration
+            else:
+                self.durations[nodeid] = self.SMOOTHING * duration + (1 - self.SMOOTHING) * previous
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({nodeid: round(duration, 4) for nodeid, duration in sorted(self.durations.items())},
+                      file, indent=2)
+        os.replace(tmp_path, self.path)
+        self.logger.debug(f"Test durations saved: {self.path} ({len(self.durations)} tests)")
+
+    def _load(self) -> Dict[str, float]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return {nodeid: float(duration) for nodeid, duration in json.load(file).items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, AttributeError) as e:
+            self.logger.warning(f"Ignoring unreadable durations file {self.path}: {e}")
+            return {}
+
+
+def write_timings(path: str, timings: Dict[str, float]) -> None:
+    """Write durations measured in a single run"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({nodeid: round(duration, 4) for nodeid, duration in sorted(timings.items())}, file, indent=2)
+
+
+def read_timings(path: str) -> Dict[str, float]:
+    with open(path, 'r', encoding='utf-8') as file:
+        return {nodeid: float(duration) for nodeid, duration in json.load(file).items()}
+
+
+def lpt_partition(durations: Dict[str, float], bins: int) -> Tuple[List[List[str]], List[float]]:
+    """Longest-processing-time-first split of tests into bins, deterministic for equal input"""
+    buckets = [[] for _ in range(bins)]
+    totals = [0.0] * bins
+    heap = [(0.0, index) for index in range(bins)]
+    for nodeid in sorted(durations, key=lambda n: (-durations[n], n)):
+        total, index = heapq.heappop(heap)
+        buckets[index].append(nodeid)
+        totals[index] = total + durations[nodeid]
+        heapq.heappush(heap, (totals[index], index))
+    return buckets, totals
@@ -1,9 +1,11 @@
 import logging
 import logging.config
+import copy
 import json
 import os
 from pathlib import Path
 from typing import Optional, Dict, Any
+from .report_paths import logs_dir
 
 
 class LoggerConfig:
@@ -102,16 +104,29 @@ class LoggerConfig:
         }
     }
 
+    # Configuration and level currently applied, None until logging is first set up
+    _active_config: Optional[Dict[str, Any]] = None
+    _active_level: Optional[str] = None
+
     @classmethod
-    def setup_logging(cls, config: Optional[Dict[str, Any]] = None, log_level: str = 'INFO'):
-        """Setup centralized logging configuration"""
+    def setup_logging(cls, config: Optional[Dict[str, Any]] = None, log_level: str = 'INFO', force: bool = False):
+        """Setup centralized logging configuration, repeated calls only adjust levels"""
+        if cls._active_config is not None and config is None and not force:
+            if log_level and log_level != cls._active_level:
+                cls._apply_log_level(log_level)
+            return
 
         # Create logs directory
-        log_dir = Path('logs')
-        log_dir.mkdir(exist_ok=True)
+        log_dir = Path(logs_dir())
+        log_dir.mkdir(parents=True, exist_ok=True)
 
-        # Use provided config or default
-        logging_config = config or cls.DEFAULT_CONFIG
+        # Use provided config or default, DEFAULT_CONFIG itself is never modified
+        logging_config = copy.deepcopy(config or cls.DEFAULT_CONFIG)
+        if config is None:
+            # Default log files go to the log directory of this run
+            for handler in logging_config['handlers'].values():
+                if 'filename' in handler:
+                    handler['filename'] = str(log_dir / Path(handler['filename']).name)
 
         # Update log levels based on parameter
         if log_level:
@@ -119,6 +134,8 @@ class LoggerConfig:
 
         # Apply configuration
         logging.config.dictConfig(logging_config)
+        cls._active_config = logging_config
+        cls._active_level = log_level
 
         # Capture warnings
         logging.captureWarnings(True)
@@ -126,6 +143,25 @@ class LoggerConfig:
         logger = logging.getLogger(__name__)
         logger.info("Herokuapp logging configuration initialized")
 
+    @classmethod
+    def ensure_configured(cls):
+        """Setup logging with defaults unless it is already configured"""
+        if cls._active_config is None:
+            cls.setup_logging()
+
+    @classmethod
+    def _apply_log_level(cls, log_level: str):
+        """Change levels of configured loggers and handlers without rebuilding handlers"""
+        cls._update_log_levels(cls._active_config, log_level)
+        for name, logger_config in cls._active_config['loggers'].items():
+            logger = logging.getLogger(name)
+            logger.setLevel(logger_config['level'])
+            for handler in logger.handlers:
+                handler_config = cls._active_config['handlers'].get(handler.get_name())
+                if handler_config and 'level' in handler_config:
+                    handler.setLevel(handler_config['level'])
+        cls._active_level = log_level
+
     @classmethod
     def _update_log_levels(cls, config: Dict[str, Any], log_level: str):
         """Update log levels in configuration"""
@@ -144,9 +180,6 @@ class LoggerConfig:
 
     @classmethod
     def get_logger(cls, name: str) -> logging.Logger:
-        """Get logger with given name"""
+        """Get logger with given name, configuring logging on first use"""
+        cls.ensure_configured()
         return logging.getLogger(name)
-
-
-# Initialize logging when module is imported
-LoggerConfig.setup_logging()
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Pytest plugin for duration-aware scheduling.
+Keeps historical per-test durations and distributes xdist work longest-first.
+"""
+
+import time
+from collections import defaultdict
+from typing import List, Tuple
+import pytest
+from .duration_store import DurationStore, lpt_partition, write_timings
+from .log_decorators import LoggingMixin
+from .report_paths import reports_path
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("scheduling", "duration-aware scheduling")
+    group.addoption(
+        "--durations-file", action="store", default=DurationStore.DEFAULT_PATH,
+        help="JSON file with historical per-test durations"
+    )
+    group.addoption(
+        "--scheduler", action="store", default="duration", choices=["duration", "xdist"],
+        help="Worker scheduling: longest expected tests first, or xdist default load scheduling"
+    )
+    group.addoption(
+        "--shard", action="store", default=None,
+        help="Run only shard i of n (format i/n), tests are split by recorded duration"
+    )
+    group.addoption(
+        "--timings-file", action="store", default=reports_path("test_timings.json"),
+        help="JSON file receiving the durations measured in this run"
+    )
+    group.addoption(
+        "--coordinator", action="store", default=None,
+        help="host:port of a work coordinator to pull tests from one at a time"
+    )
+    group.addoption(
+        "--coordinator-worker", action="store", default=None,
+        help="Worker name reported to the coordinator (default: hostname-pid)"
+    )
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse "i/n" into 1-based shard index and shard count"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise pytest.UsageError(f"--shard expects i/n, got: {value}")
+    if not 1 <= index <= count:
+        raise pytest.UsageError(f"--shard index must be between 1 and {count}, got: {index}")
+    return index, count
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(DurationSchedulingPlugin(config), "duration_scheduling")
+    address = config.getoption("--coordinator")
+    if address:
+        from .coordinated_worker import CoordinatedWorkerPlugin
+        worker = CoordinatedWorkerPlugin(config, address, config.getoption("--coordinator-worker"))
+        config.pluginmanager.register(worker, "coordinated_worker")
+
+
+class DurationSchedulingPlugin(LoggingMixin):
+    """Records test durations and reports estimated vs actual wall time"""
+
+    def __init__(self, config):
+        self.config = config
+        self.store = DurationStore(config.getoption("--durations-file"))
+        self.measured = defaultdict(float)
+        self.worker_busy = defaultdict(float)
+        self.workers = 1
+        self.estimated = None
+        self.run_started = None
+        self.last_report = None
+        shard = config.getoption("--shard")
+        self.shard = parse_shard(shard) if shard else None
+
+    @property
+    def is_worker(self) -> bool:
+        return hasattr(self.config, "workerinput")
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        if config.getoption("--scheduler") != "duration" or config.getoption("dist") != "load":
+            return None
+        from .duration_scheduler import DurationScheduling
+        return DurationScheduling(config, log, store=self.store, on_schedule=self.report_estimate)
+
+    def pytest_collection_modifyitems(self, config, items):
+        if self.shard is None:
+            return
+        index, count = self.shard
+        # Same collection and durations file give the same split on every machine
+        buckets, totals = lpt_partition(self.store.expected(item.nodeid for item in items), count)
+        selected_ids = set(buckets[index - 1])
+        selected = [item for item in items if item.nodeid in selected_ids]
+        deselected = [item for item in items if item.nodeid not in selected_ids]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+        if not self.is_worker:
+            self._write_line(f"Shard {index}/{count}: {len(selected)} of {len(selected) + len(deselected)} "
+                             f"tests, expected {totals[index - 1]:.1f}s")
+
+    def pytest_collection_finish(self, session):
+        # Under xdist the controller does not collect, the scheduler reports the estimate instead
+        if self.is_worker or self.config.pluginmanager.hasplugin("dsession"):
+            return
+        self.report_estimate([item.nodeid for item in session.items], 1)
+
+    def report_estimate(self, nodeids: List[str], workers: int) -> None:
+        """Print expected wall time of the run for the given number of workers"""
+        self.workers = max(1, workers)
+        self.run_started = time.monotonic()
+        if not nodeids:
+            return
+        expected = self.store.expected(nodeids)
+        _, totals = lpt_partition(expected, self.workers)
+        self.estimated = max(totals)
+        known = sum(1 for nodeid in nodeids if nodeid in self.store.durations)
+        self._write_line(f"Estimated wall time: {self.estimated:.1f}s for {len(nodeids)} tests on "
+                         f"{self.workers} worker(s) ({known} with recorded durations)")
+
+    def pytest_runtest_logreport(self, report):
+        if self.is_worker:
+            return
+        self.measured[report.nodeid] += report.duration
+        node = getattr(report, "node", None)
+        worker = node.gateway.id if node is not None else "main"
+        self.worker_busy[worker] += report.duration
+        self.last_report = time.monotonic()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.is_worker or self.run_started is None or self.last_report is None:
+            return
+        makespan = self.last_report - self.run_started
+        idle = max(0.0, makespan * self.workers - sum(self.worker_busy.values()))
+        estimate = f", estimated {self.estimated:.1f}s" if self.estimated is not None else ""
+        terminalreporter.write_sep("-", "duration scheduling")
+        terminalreporter.write_line(f"Makespan: {makespan:.1f}s{estimate}, "
+                                    f"idle worker time: {idle:.1f}s")
+        for worker, busy in sorted(self.worker_busy.items()):
+            terminalreporter.write_line(f"  {worker}: {busy:.1f}s busy")
+
+    def pytest_sessionfinish(self, session):
+        # Coordinated workers only see part of the run, the coordinator keeps the history
+        if self.is_worker or not self.measured or self.config.getoption("--coordinator"):
+            return
+        write_timings(self.config.getoption("--timings-file"), self.measured)
+        # Shards are split by the recorded durations, which must stay the same on every machine:
+        # only merging the shard results (run_tests.py --mode=merge) updates the history
+        if self.shard is not None:
+            return
+        self.store.update(self.measured)
+        self.store.save()
+
+    def _write_line(self, message: str) -> None:
+        reporter = self.config.pluginmanager.get_plugin("terminalreporter")
+        if reporter is not None:
+            reporter.write_line(message)
+        self.logger.debug(message)
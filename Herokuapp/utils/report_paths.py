@@ -0,0 +1,15 @@
+import os
+
+# Set by run_all.py so concurrent suites of one project keep their reports and logs apart
+REPORTS_DIR_ENV = "TEST_REPORTS_DIR"
+
+
+def reports_path(*parts: str) -> str:
+    """Path inside the reports directory of this run, reports/ unless TEST_REPORTS_DIR is set"""
+    return os.path.join(os.environ.get(REPORTS_DIR_ENV) or "reports", *parts)
+
+
+def logs_dir() -> str:
+    """Log directory of this run, logs/ unless TEST_REPORTS_DIR is set"""
+    reports_dir = os.environ.get(REPORTS_DIR_ENV)
+    return os.path.join(reports_dir, "logs") if reports_dir else "logs"
@@ -0,0 +1,215 @@
+import base64
+import fnmatch
+import json
+import threading
+import weakref
+import trio
+from typing import Callable, Dict, Any, List, Optional
+from .log_decorators import LoggingMixin
+
+
+class MockRoute:
+    """Request handler served by the browser through DevTools Fetch interception"""
+
+    def __init__(self, url_pattern: str, status: int = 200, body: Optional[str] = None,
+                 json_body: Any = None, headers: Optional[Dict[str, str]] = None,
+                 handler: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+                 delay: float = 0, method: Optional[str] = None):
+        self.url_pattern = url_pattern
+        self.status = status
+        self.body = body
+        self.json_body = json_body
+        self.headers = headers or {}
+        self.handler = handler
+        self.delay = delay
+        self.method = method.upper() if method else None
+        self.hits = 0
+
+    def matches(self, request: Dict[str, Any]) -> bool:
+        if self.method and self.method != request["method"]:
+            return False
+        return fnmatch.fnmatchcase(request["url"], self.url_pattern)
+
+    def respond(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build response for request, None lets the request continue to the network"""
+        if self.handler is not None:
+            return self.handler(request)
+        if self.json_body is not None:
+            headers = {"Content-Type": "application/json", **self.headers}
+            return {"status": self.status, "headers": headers, "body": json.dumps(self.json_body)}
+        if self.body is not None:
+            return {"status": self.status, "headers": self.headers, "body": self.body}
+        # Latency-only route
+        return None
+
+
+class RequestInterceptor(LoggingMixin):
+    """Serves mocked responses inside Chrome through the DevTools Fetch domain"""
+
+    START_TIMEOUT = 10
+    # browserName capabilities of Chromium browsers that expose the DevTools Fetch domain
+    SUPPORTED_BROWSERS = ("chrome", "chrome-headless-shell", "MicrosoftEdge", "msedge")
+    _instances = weakref.WeakKeyDictionary()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, driver):
+        browser_name = driver.capabilities.get("browserName", "")
+        if browser_name not in self.SUPPORTED_BROWSERS:
+            raise ValueError(f"Request mocking is not supported for browser: {browser_name}")
+        self.driver = driver
+        self.routes: List[MockRoute] = []
+        self._routes_lock = threading.Lock()
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._trio_token = None
+        self._session = None
+        self._devtools = None
+        self._nursery = None
+
+    @classmethod
+    def for_driver(cls, driver) -> "RequestInterceptor":
+        """Get interceptor bound to driver, creating it on first use"""
+        with cls._instances_lock:
+            interceptor = cls._instances.get(driver)
+            if interceptor is None:
+                interceptor = cls(driver)
+                cls._instances[driver] = interceptor
+            return interceptor
+
+    @classmethod
+    def release(cls, driver) -> None:
+        """Stop interceptor bound to driver, if one was started"""
+        with cls._instances_lock:
+            interceptor = cls._instances.pop(driver, None)
+        if interceptor is not None:
+            interceptor.stop()
+
+    def add_route(self, url_pattern: str, **kwargs) -> MockRoute:
+        """Register handler for requests whose URL matches glob pattern (kwargs as in MockRoute)"""
+        route = MockRoute(url_pattern, **kwargs)
+        with self._routes_lock:
+            # Most recently added route takes precedence
+            self.routes.insert(0, route)
+        self.logger.info(f"Mock route added: {route.method or 'ANY'} {url_pattern}")
+        self._sync_patterns()
+        return route
+
+    def clear_routes(self) -> None:
+        with self._routes_lock:
+            self.routes = []
+        self._sync_patterns()
+
+    def start(self) -> None:
+        """Start DevTools event loop on a background thread"""
+        if self._thread is not None:
+            return
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run_loop, name="request-interceptor", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(self.START_TIMEOUT):
+            error = "did not start in time"
+        elif self._error is not None:
+            error = f"failed to start: {self._error}"
+        else:
+            self.logger.debug("Request interceptor started")
+            return
+        # Forget the failed loop, the next route added starts a new one instead of using a dead thread
+        self._thread = self._trio_token = self._nursery = None
+        self._session = self._devtools = None
+        raise RuntimeError(f"Request interceptor {error}")
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        if self._trio_token is not None and self._nursery is not None:
+            try:
+                trio.from_thread.run_sync(self._nursery.cancel_scope.cancel, trio_token=self._trio_token)
+            except trio.RunFinishedError:
+                pass
+        self._thread.join(timeout=self.START_TIMEOUT)
+        self._thread = None
+        self.logger.debug("Request interceptor stopped")
+
+    def _sync_patterns(self) -> None:
+        if self._thread is None:
+            if self.routes:
+                self.start()
+            return
+        trio.from_thread.run(self._apply_patterns, trio_token=self._trio_token)
+
+    def _run_loop(self) -> None:
+        try:
+            trio.run(self._serve)
+        except Exception as e:
+            self._error = e
+            self.logger.error(f"Request interceptor stopped with error: {e}")
+        finally:
+            self._ready.set()
+
+    async def _serve(self) -> None:
+        self._trio_token = trio.lowlevel.current_trio_token()
+        async with self.driver.bidi_connection() as connection:
+            self._session, self._devtools = connection.session, connection.devtools
+            await self._apply_patterns()
+            events = self._session.listen(self._devtools.fetch.RequestPaused)
+            async with trio.open_nursery() as nursery:
+                self._nursery = nursery
+                self._ready.set()
+                async for event in events:
+                    nursery.start_soon(self._handle, event)
+
+    async def _apply_patterns(self) -> None:
+        fetch = self._devtools.fetch
+        with self._routes_lock:
+            patterns = sorted({route.url_pattern for route in self.routes})
+        if patterns:
+            await self._session.execute(fetch.enable(patterns=[fetch.RequestPattern(url_pattern=p) for p in patterns]))
+        else:
+            await self._session.execute(fetch.disable())
+
+    async def _handle(self, event) -> None:
+        # An error escaping into the nursery would stop the interceptor and leave later requests paused
+        try:
+            await self._respond(event)
+        except Exception as e:
+            self.logger.error(f"Mocking {event.request.method} {event.request.url} failed, passing it through: {e}")
+            try:
+                await self._session.execute(self._devtools.fetch.continue_request(request_id=event.request_id))
+            except Exception as e:
+                self.logger.error(f"Paused request {event.request.url} could not be continued: {e}")
+
+    async def _respond(self, event) -> None:
+        fetch = self._devtools.fetch
+        request = {
+            "url": event.request.url,
+            "method": event.request.method,
+            "headers": dict(event.request.headers),
+            "body": event.request.post_data
+        }
+        with self._routes_lock:
+            route = next((r for r in self.routes if r.matches(request)), None)
+
+        response = None
+        if route is not None:
+            route.hits += 1
+            if route.delay:
+                await trio.sleep(route.delay)
+            response = await trio.to_thread.run_sync(route.respond, request)
+
+        if response is None:
+            await self._session.execute(fetch.continue_request(request_id=event.request_id))
+            return
+
+        body = response.get("body") or ""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        await self._session.execute(fetch.fulfill_request(
+            request_id=event.request_id,
+            response_code=response.get("status", 200),
+            response_headers=[fetch.HeaderEntry(name=name, value=str(value))
+                              for name, value in response.get("headers", {}).items()],
+            body=base64.b64encode(body).decode("ascii")
+        ))
+        self.logger.debug(f"Served mocked response for {request['method']} {request['url']}")
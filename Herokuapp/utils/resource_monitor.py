@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from .log_decorators import LoggingMixin
+from .logger import LoggerConfig
+
+try:
+    import fcntl
+except ImportError:  # Windows: worker throttling is not available
+    fcntl = None
+
+# Approximate resident memory of one browser under load, in MB
+BROWSER_MEMORY_MB = {
+    ("chrome", True): 450,
+    ("chrome", False): 650,
+    ("firefox", True): 500,
+    ("firefox", False): 700
+}
+
+# Approximate memory of one isolated browser context (a tab) in a shared Chrome, in MB
+BROWSER_CONTEXT_MEMORY_MB = 150
+
+WORKER_LIMIT_ENV = "HEROKUAPP_WORKER_LIMIT_DIR"
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def available_memory_mb() -> Optional[float]:
+    """Memory available for new processes without swapping, None if unknown"""
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def recommend_worker_count(browser: str = "chrome", headless: bool = True, max_workers: int = None,
+                           reserve_memory_mb: float = 1024, driver_mode: str = "browser") -> int:
+    """Work out xdist worker count from CPUs, free memory and browser footprint"""
+    cpus = available_cpus()
+    # Keep one core for the xdist controller and the OS on bigger machines
+    by_cpu = cpus - 1 if cpus > 2 else cpus
+
+    per_worker_mb = BROWSER_MEMORY_MB.get((browser.lower(), headless), 650)
+    if driver_mode == "context":
+        # Workers share one browser, each only adds the contexts of its running test
+        per_worker_mb = BROWSER_CONTEXT_MEMORY_MB
+        reserve_memory_mb += BROWSER_MEMORY_MB.get((browser.lower(), headless), 650)
+    memory_mb = available_memory_mb()
+    by_memory = int((memory_mb - reserve_memory_mb) // per_worker_mb) if memory_mb is not None else by_cpu
+
+    workers = max(1, min(by_cpu, by_memory))
+    if max_workers:
+        workers = min(workers, max_workers)
+
+    memory_desc = f"{memory_mb:.0f}MB" if memory_mb is not None else "unknown"
+    logger = LoggerConfig.get_logger(__name__)
+    logger.info(f"Worker count: {workers} (cpus: {cpus}, available memory: {memory_desc}, "
+                f"{browser} {'headless' if headless else 'headed'} {driver_mode} mode ~{per_worker_mb}MB per worker)")
+    return workers
+
+
+def read_swap_pages() -> Optional[int]:
+    """Total pages swapped in and out since boot, None if unknown"""
+    try:
+        counters = {}
+        with open("/proc/vmstat", "r", encoding="utf-8") as file:
+            for line in file:
+                name, value = line.split()
+                counters[name] = int(value)
+        return counters.get("pswpin", 0) + counters.get("pswpout", 0)
+    except OSError:
+        return None
+
+
+class WorkerThrottle:
+    """File-lock slots limiting how many xdist workers run a test at the same time"""
+
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, limit_dir: str):
+        self.limit_dir = Path(limit_dir)
+        self._slot_file = None
+
+    @classmethod
+    def from_env(cls) -> Optional["WorkerThrottle"]:
+        limit_dir = os.environ.get(WORKER_LIMIT_ENV)
+        if not limit_dir or fcntl is None:
+            return None
+        return cls(limit_dir)
+
+    @property
+    def limit_file(self) -> Path:
+        return self.limit_dir / "limit"
+
+    def set_limit(self, limit: int) -> None:
+        self.limit_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.limit_dir / "limit.tmp"
+        tmp_file.write_text(str(limit), encoding="utf-8")
+        os.replace(tmp_file, self.limit_file)
+
+    def get_limit(self) -> int:
+        try:
+            return max(1, int(self.limit_file.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            return 1
+
+    def acquire(self) -> None:
+        """Block until one of the currently allowed slots is free"""
+        while True:
+            for slot in range(self.get_limit()):
+                slot_file = open(self.limit_dir / f"slot-{slot}.lock", "w")
+                try:
+                    fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    self._slot_file = slot_file
+                    return
+                except OSError:
+                    slot_file.close()
+            time.sleep(self.POLL_INTERVAL)
+
+    def release(self) -> None:
+        if self._slot_file is not None:
+            fcntl.flock(self._slot_file, fcntl.LOCK_UN)
+            self._slot_file.close()
+            self._slot_file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class SwapMonitor(LoggingMixin, threading.Thread):
+    """Lowers the running worker limit while the machine is swapping"""
+
+    def __init__(self, throttle: WorkerThrottle, workers: int, interval: float = 2.0,
+                 swap_pages_per_second: float = 256):
+        super().__init__(name="swap-monitor", daemon=True)
+        self.throttle = throttle
+        self.limit = workers
+        self.interval = interval
+        self.swap_pages_per_second = swap_pages_per_second
+        self._stop_event = threading.Event()
+        self.throttle.set_limit(workers)
+
+    def run(self) -> None:
+        previous = read_swap_pages()
+        if previous is None:
+            self.logger.debug("Swap statistics not available, worker limit stays fixed")
+            return
+        while not self._stop_event.wait(self.interval):
+            current = read_swap_pages()
+            rate = (current - previous) / self.interval
+            previous = current
+            if rate >= self.swap_pages_per_second and self.limit > 1:
+                self.limit -= 1
+                self.throttle.set_limit(self.limit)
+                self.logger.warning(f"Swapping detected ({rate:.0f} pages/s), "
+                               f"lowering concurrent workers to {self.limit}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
@@ -0,0 +1,133 @@
+import functools
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Callable, List, Optional, Tuple
+from .log_decorators import LoggingMixin
+
+# Binaries looked up on PATH when <BROWSER>_BINARY is not set
+BROWSER_BINARIES = {
+    "chrome": ("google-chrome", "google-chrome-stable", "chrome", "chromium", "chromium-browser"),
+    "firefox": ("firefox",)
+}
+
+
+def copy_tree(source: str, destination: str) -> None:
+    """Copy directory, sharing blocks copy-on-write where the filesystem supports it"""
+    try:
+        subprocess.run(["cp", "-a", "--reflink=auto", source, destination], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        # No GNU cp (macOS, Windows)
+        shutil.copytree(source, destination, symlinks=True)
+
+
+@functools.lru_cache(maxsize=None)
+def browser_version(browser: str) -> Optional[str]:
+    """Version printed by the installed browser (<BROWSER>_BINARY or PATH), None when it cannot be told"""
+    binary = os.environ.get(f"{browser.upper()}_BINARY")
+    if not binary:
+        binary = next(filter(None, map(shutil.which, BROWSER_BINARIES.get(browser, ()))), None)
+    if not binary:
+        return None
+    try:
+        output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"\d+(?:\.\d+)+", output)
+    return match.group(0) if match else None
+
+
+class WarmProfile(LoggingMixin):
+    """Pre-built browser profile copied for every browser session, with an HTTP disk cache that all sessions share.
+    Templates are kept per browser version, a profile written by another version is never reused"""
+
+    # Files that mark a profile as in use by a running browser
+    LOCK_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lock", ".parentlock", "parent.lock")
+
+    def __init__(self, browser: str, template_root: str, warmup_urls: List[str], shared_cache: bool = True,
+                 version: Optional[str] = None):
+        self.browser = browser.lower()
+        self.version = version or browser_version(self.browser)
+        self.template_root = os.path.abspath(template_root)
+        name = f"{self.browser}-{self.version}" if self.version else self.browser
+        self.template_dir = os.path.join(self.template_root, name)
+        self.warmup_urls = warmup_urls
+        self.shared_cache = shared_cache
+        # Milliseconds spent copying the profile for each checkout
+        self.checkout_times: List[float] = []
+
+    @property
+    def profile_dir(self) -> str:
+        return os.path.join(self.template_dir, "profile")
+
+    @property
+    def cache_dir(self) -> str:
+        return os.path.join(self.template_dir, "cache")
+
+    def ensure_template(self, launch: Callable[[str, Optional[str]], object]) -> None:
+        """Build the template once, launch(user_data_dir, cache_dir) starts a browser using the given dirs"""
+        if os.path.isdir(self.template_dir):
+            return
+
+        os.makedirs(self.template_root, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=f".{self.browser}-building-", dir=self.template_root)
+        profile_dir = os.path.join(build_dir, "profile")
+        cache_dir = os.path.join(build_dir, "cache") if self.shared_cache else None
+        self.logger.info(f"Building warm {self.browser} profile template: {self.template_dir}")
+        try:
+            driver = launch(profile_dir, cache_dir)
+            try:
+                for url in self.warmup_urls:
+                    driver.get(url)
+            finally:
+                driver.quit()
+            self._remove_lock_files(profile_dir)
+            # Atomic publish, a worker that loses the race keeps using the winner's template
+            os.rename(build_dir, self.template_dir)
+            self._remove_stale_templates()
+        except OSError:
+            if not os.path.isdir(self.template_dir):
+                raise
+            self.logger.debug("Profile template was built by another worker")
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    def checkout(self) -> Tuple[str, Optional[str], str]:
+        """Copy profile for one session, returns user data dir, shared cache dir and the session root to remove"""
+        started = time.perf_counter()
+        session_root = tempfile.mkdtemp(prefix=f"{self.browser}-session-")
+        user_data_dir = os.path.join(session_root, "profile")
+        copy_tree(self.profile_dir, user_data_dir)
+
+        # Every session points at the template's cache, only the profile is copied
+        cache_dir = self.cache_dir if self.shared_cache and os.path.isdir(self.cache_dir) else None
+        self.checkout_times.append((time.perf_counter() - started) * 1000)
+        return user_data_dir, cache_dir, session_root
+
+    def profile_size_mb(self) -> float:
+        """Size of the profile copied for every session"""
+        total = 0
+        for root, _, files in os.walk(self.profile_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if not os.path.islink(path):
+                    total += os.path.getsize(path)
+        return round(total / (1024 * 1024), 1)
+
+    def _remove_stale_templates(self) -> None:
+        # Templates of earlier versions of this browser; build dirs start with a dot and are skipped
+        for name in os.listdir(self.template_root):
+            path = os.path.join(self.template_root, name)
+            if path != self.template_dir and (name == self.browser or name.startswith(f"{self.browser}-")):
+                self.logger.info(f"Removing {self.browser} profile template of another version: {path}")
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _remove_lock_files(self, profile_dir: str) -> None:
+        # Chrome's singleton files are dangling symlinks once the browser has exited, os.walk still lists them
+        for root, _, files in os.walk(profile_dir):
+            for name in files:
+                if name in self.LOCK_FILES:
+                    os.remove(os.path.join(root, name))
@@ -0,0 +1,208 @@
+import json
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .log_decorators import LoggingMixin
+
+
+class WorkCoordinator(LoggingMixin):
+    """Hands out tests one at a time to workers connecting over TCP (JSON lines)"""
+
+    def __init__(self, nodeids: List[str], host: str = "127.0.0.1", port: int = 0,
+                 lease_timeout: float = 900, max_attempts: int = 2,
+                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.host = host
+        self.port = port
+        self.total = len(nodeids)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.on_result = on_result
+        self.pending = deque(nodeids)
+        self.leases: Dict[str, Tuple[str, float]] = {}
+        self.attempts: Dict[str, int] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.workers = set()
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._server = None
+        self._threads = []
+        if not nodeids:
+            self._finished.set()
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def connected_workers(self) -> int:
+        with self._lock:
+            return len(self.workers)
+
+    @property
+    def exit_code(self) -> int:
+        if len(self.results) < self.total:
+            return 1
+        return 0 if all(r["outcome"] in ("passed", "skipped") for r in self.results.values()) else 1
+
+    def start(self) -> "WorkCoordinator":
+        coordinator = self
+
+        class Handler(_CoordinatorHandler):
+            pass
+
+        Handler.coordinator = coordinator
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="coordinator-server", daemon=True),
+            threading.Thread(target=self._expire_leases, name="coordinator-leases", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.logger.info(f"Work coordinator listening on {self.address} with {self.total} tests")
+        return self
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait until every test has a result"""
+        return self._finished.wait(timeout)
+
+    def stop(self) -> None:
+        self._finished.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def summary(self) -> Dict[str, int]:
+        counts = {"total": self.total, "missing": self.total - len(self.results)}
+        for result in self.results.values():
+            counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+        return counts
+
+    def next_test(self, worker: str) -> Dict[str, Any]:
+        """Lease the next test to worker"""
+        with self._lock:
+            if self.pending:
+                nodeid = self.pending.popleft()
+                self.leases[nodeid] = (worker, time.monotonic() + self.lease_timeout)
+                self.attempts[nodeid] = self.attempts.get(nodeid, 0) + 1
+                return {"op": "run", "nodeid": nodeid}
+            if self.leases:
+                # Leased tests may still come back if their worker dies
+                return {"op": "wait"}
+            return {"op": "done"}
+
+    def complete(self, worker: str, result: Dict[str, Any]) -> None:
+        """Record result reported by worker, later duplicates of the same test are ignored"""
+        nodeid = result["nodeid"]
+        with self._lock:
+            self.leases.pop(nodeid, None)
+            if nodeid in self.results:
+                return
+            if nodeid in self.pending:
+                # Late result of a test that was already re-queued
+                self.pending.remove(nodeid)
+            result = {**result, "worker": worker, "attempts": self.attempts.get(nodeid, 1)}
+            self.results[nodeid] = result
+            done = len(self.results)
+        self.logger.info(f"[{done}/{self.total}] {result['outcome'].upper()} {nodeid} "
+                         f"({result.get('duration', 0):.1f}s, {worker})")
+        if self.on_result is not None:
+            self.on_result(result)
+        self._check_finished()
+
+    def register_worker(self, worker: str) -> None:
+        with self._lock:
+            self.workers.add(worker)
+        self.logger.info(f"Worker connected: {worker}")
+
+    def release_worker(self, worker: str) -> None:
+        """Re-queue tests leased to a worker that disconnected"""
+        with self._lock:
+            self.workers.discard(worker)
+            lost = [nodeid for nodeid, (owner, _) in self.leases.items() if owner == worker]
+        for nodeid in lost:
+            self._requeue(nodeid, f"worker {worker} disconnected")
+        self.logger.info(f"Worker disconnected: {worker}")
+
+    def _requeue(self, nodeid: str, reason: str) -> None:
+        with self._lock:
+            if self.leases.pop(nodeid, None) is None or nodeid in self.results:
+                return
+            if self.attempts.get(nodeid, 0) < self.max_attempts:
+                # Put it in front so the retry does not wait behind the whole queue
+                self.pending.appendleft(nodeid)
+                self.logger.warning(f"Re-queued {nodeid}: {reason}")
+                return
+        self.complete("coordinator", {"nodeid": nodeid, "outcome": "failed", "duration": 0,
+                                      "longrepr": f"Gave up after {self.max_attempts} attempts: {reason}"})
+
+    def _expire_leases(self) -> None:
+        while not self._finished.wait(1):
+            now = time.monotonic()
+            with self._lock:
+                expired = [(nodeid, owner) for nodeid, (owner, deadline) in self.leases.items() if deadline < now]
+            for nodeid, owner in expired:
+                self._requeue(nodeid, f"lease held by {owner} expired after {self.lease_timeout}s")
+
+    def _check_finished(self) -> None:
+        if len(self.results) >= self.total:
+            self._finished.set()
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    coordinator: WorkCoordinator = None
+
+    def handle(self):
+        worker = f"{self.client_address[0]}:{self.client_address[1]}"
+        registered = False
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                op = message.get("op")
+                if op == "hello":
+                    worker = message.get("worker") or worker
+                    self.coordinator.register_worker(worker)
+                    registered = True
+                    reply = {"op": "ok"}
+                elif op == "next":
+                    reply = self.coordinator.next_test(worker)
+                elif op == "result":
+                    self.coordinator.complete(worker, message["result"])
+                    reply = {"op": "ok"}
+                else:
+                    reply = {"op": "error", "message": f"Unknown op: {op}"}
+                self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+                self.wfile.flush()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            if registered:
+                self.coordinator.release_worker(worker)
+
+
+class CoordinatorClient:
+    """Worker side of the coordinator protocol"""
+
+    def __init__(self, address: str, worker: str):
+        host, port = address.rsplit(":", 1)
+        self.worker = worker
+        self._socket = socket.create_connection((host, int(port)))
+        self._file = self._socket.makefile("rwb")
+        self.request({"op": "hello", "worker": worker})
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self._file.write((json.dumps(message) + "\n").encode("utf-8"))
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Coordinator closed the connection")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../core'))
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.select import Select
 from core_project.core.base.base_page import BasePage
+from core_project.core.utils.adaptive_wait import AdaptiveWait
 import allure
 import time
 from core_project.core.utils.log_decorators import log_page_interaction, log_function_call
@@ -181,9 +182,8 @@ class SearchResultsPage(BasePage):
     def wait_for_element_to_disappear(self, locator: tuple, timeout: int = 10) -> bool:
         """Wait for element to disappear from DOM"""
         try:
-            from selenium.webdriver.support.ui import WebDriverWait
             from selenium.webdriver.support import expected_conditions as EC
-            wait = WebDriverWait(self.driver, timeout)
+            wait = AdaptiveWait(self.driver, timeout, name="wait_for_element_to_disappear")
             return wait.until(EC.invisibility_of_element_located(locator))
         except:
             return True  # Element already disappeared or not present
\ No newline at end of file
@@ -1,11 +1,7 @@
 import pytest
-import allure
 import sys
 import os
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
 
 # Добавляем пути для импортов
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'core'))
@@ -15,6 +11,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'amazon'))
 from core_project.herokuapp.config.init import Config as HerokuappConfig
 from core_project.amazon.config.init import Config as AmazonConfig
 from core_project.core.utils.logger import LoggerConfig
+from core_project.core.utils.report_paths import reports_path
+
+pytest_plugins = ["core_project.core.utils.pytest_selection"]
 
 
 def pytest_addoption(parser):
@@ -31,6 +30,18 @@ def pytest_addoption(parser):
     parser.addoption(
         "--log-level-pytest", action="store", default="INFO", help="Log level"
     )
+    parser.addoption(
+        "--browser-profile", action="store", default=None,
+        help="Browser launch profile: fast-headless, debug, parity or one defined in config"
+    )
+    parser.addoption(
+        "--browser-cache", action="store", default=None, choices=["warm", "cold"],
+        help="warm: start from a copy of a pre-built profile sharing one HTTP cache, cold: empty temporary profile"
+    )
+    parser.addoption(
+        "--driver-mode", action="store", default=None, choices=["browser", "context"],
+        help="browser: a browser per test, context: an isolated context per test in one shared Chrome"
+    )
     parser.addoption(
         "--project", action="store", default="herokuapp", help="Project: herokuapp or amazon"
     )
@@ -58,51 +69,148 @@ def config(request):
     return config_obj
 
 
+@pytest.fixture(scope="session")
+def driver_reaper(config):
+    """Background teardown of browser sessions, reports browser processes leaked by this worker"""
+    from core_project.core.base.driver_reaper import DriverReaper
+    reaper = DriverReaper(config.driver_quit_timeout).start()
+    yield reaper
+    reaper.stop()
+
+
+@pytest.fixture(scope="session")
+def driver_services(config, driver_reaper):
+    """Driver services shared by all sessions of this worker, stopped at the end of the run"""
+    yield config.driver_service_reuse
+    # Sessions still being quit need their service
+    driver_reaper.drain()
+    if config.driver_service_reuse:
+        from core_project.core.base.webdriver_factory import shutdown_services
+        shutdown_services()
+
+
+@pytest.fixture(scope="session")
+def browser_context_pool(request, config, driver_reaper, driver_services):
+    """Shared Chrome for context driver mode, None when every test starts its own browser"""
+    from core_project.core.base.browser_contexts import BrowserContextPool, SharedBrowser
+    from core_project.core.base.webdriver_factory import resolve_profile
+    logger = LoggerConfig.get_logger(__name__)
+
+    mode = request.config.getoption("--driver-mode") or config.driver_mode
+    browser = request.config.getoption("--browser")
+    if mode != "context":
+        yield None
+        return
+    if browser.lower() != "chrome":
+        logger.warning(f"Context driver mode needs Chrome, starting a {browser} browser per test")
+        yield None
+        return
+
+    headless = request.config.getoption("--headless") or config.headless
+    profile_name = (request.config.getoption("--browser-profile") or config.browser_profile
+                    or ("fast-headless" if headless else "debug"))
+    shared_browser = SharedBrowser(config.shared_browser_dir, resolve_profile(profile_name, config.browser_profiles),
+                                   headless)
+    pool = BrowserContextPool(shared_browser, reuse_service=driver_services).start()
+    # Other workers may still use the shared browser when this one finishes
+    driver_reaper.keep(shared_browser.state["pid"])
+    try:
+        yield pool
+    finally:
+        driver_reaper.drain()
+        pool.stop()
+
+
+@pytest.fixture(scope="session")
+def browser_memory(config):
+    """Browser memory sampled around every test, per-test deltas saved in reports/browser_memory.json"""
+    from core_project.core.base.browser_memory import BrowserMemoryMonitor
+    monitor = BrowserMemoryMonitor(**config.browser_memory_limits)
+    yield monitor
+    monitor.write_report()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def wait_stats():
+    """Polls used by every page wait, summarised by wait in reports/wait_stats.json"""
+    from core_project.core.utils.adaptive_wait import wait_stats
+    yield wait_stats
+    wait_stats.write_report()
+
+
+@pytest.fixture(scope="session")
+def reusable_browser(driver_reaper, driver_services):
+    """Browser this worker keeps between tests when browser_reuse is on"""
+    from core_project.core.base.browser_memory import ReusableBrowser
+    from core_project.core.base.webdriver_factory import quit_driver
+    kept = ReusableBrowser()
+    yield kept
+    driver = kept.take()
+    if driver is not None:
+        driver_reaper.submit(driver, quit_driver)
+
+
 @pytest.fixture
-def driver(request, config):
+def driver(request, config, driver_reaper, driver_services, browser_context_pool, browser_memory,
+           reusable_browser):
     """WebDriver fixture with custom options"""
+    # Imported here so collection-only and API-only runs do not load selenium
+    from core_project.core.base.webdriver_factory import create_driver, quit_driver, resolve_profile
+    from core_project.core.utils.warm_profile import WarmProfile
     logger = LoggerConfig.get_logger(__name__)
 
     browser = request.config.getoption("--browser")
     headless = request.config.getoption("--headless") or config.headless
+    profile_name = (request.config.getoption("--browser-profile") or config.browser_profile
+                    or ("fast-headless" if headless else "debug"))
 
-    logger.info(f"Initializing {browser} browser (headless: {headless})")
-
-    if browser.lower() == "chrome":
-        options = Options()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
+    # Performance tests marked cold_browser always measure cold loads
+    cache_mode = "cold" if request.node.get_closest_marker("cold_browser") else \
+        (request.config.getoption("--browser-cache") or config.browser_cache_mode)
+    warm_profile = None
+    if cache_mode == "warm":
+        warm_profile = WarmProfile(browser, config.browser_template_dir, config.browser_warmup_urls,
+                                   shared_cache=config.browser_shared_cache)
 
-        driver = webdriver.Chrome(options=options)
-    elif browser.lower() == "firefox":
-        options = FirefoxOptions()
-        if headless:
-            options.add_argument("--headless")
+    logger.info(f"Initializing {browser} browser (headless: {headless}, profile: {profile_name}, "
+                f"cache: {cache_mode})")
 
-        driver = webdriver.Firefox(options=options)
+    # Tests that need a cold start never share a browser
+    reuse = (config.browser_reuse and browser_context_pool is None
+             and not request.node.get_closest_marker("cold_browser"))
+    driver = reusable_browser.take() if reuse else None
+    if driver is not None:
+        logger.info(f"Reusing browser, {reusable_browser.tests} tests run in it")
+    elif browser_context_pool is not None:
+        driver = browser_context_pool.open()
     else:
-        raise ValueError(f"Unsupported browser: {browser}")
-
+        # A kept browser this test does not reuse (cold_browser) would otherwise leak its session
+        kept = reusable_browser.take()
+        if kept is not None:
+            driver_reaper.submit(kept, quit_driver)
+        driver = create_driver(browser, resolve_profile(profile_name, config.browser_profiles), headless,
+                               warm_profile, reuse_service=driver_services)
+        reusable_browser.reset()
     driver.implicitly_wait(config.timeout)
-    driver.maximize_window()
 
     logger.info("WebDriver initialized successfully")
 
+    own_processes = browser_context_pool is None
+    memory_before = browser_memory.sample(driver, own_processes)
+
     yield driver
 
     # Take screenshot on test failure
     if hasattr(request.node, 'rep_call') and request.node.rep_call.failed:
         try:
-            screenshot_dir = "reports/screenshots"
+            screenshot_dir = reports_path("screenshots")
             os.makedirs(screenshot_dir, exist_ok=True)
             screenshot_path = os.path.join(
                 screenshot_dir,
                 f"{request.node.name}_{int(time.time())}.png"
             )
             driver.save_screenshot(screenshot_path)
+            import allure
             allure.attach.file(
                 screenshot_path,
                 name="failure_screenshot",
@@ -112,6 +220,56 @@ def driver(request, config):
         except Exception as e:
             logger.error(f"Failed to take screenshot: {e}")
 
-    driver.quit()
-    logger.info("WebDriver closed")
+    tests_in_browser = reusable_browser.tests + 1 if reuse else 1
+    memory_after = browser_memory.sample(driver, own_processes)
+    browser_memory.record(request.node.nodeid, memory_before, memory_after, tests_in_browser)
+    if reuse:
+        failed = hasattr(request.node, 'rep_call') and request.node.rep_call.failed
+        recycle_reason = "test failed" if failed else browser_memory.over_limit(memory_after, tests_in_browser)
+        if recycle_reason is None and reusable_browser.keep(driver):
+            return
+        logger.info(f"Recycling browser: {recycle_reason or 'state not cleared'}")
+        reusable_browser.reset()
+
+    close = browser_context_pool.close if browser_context_pool is not None else quit_driver
+    if config.driver_async_quit:
+        # The next test starts while this session quits in the background
+        driver_reaper.submit(driver, close, own_processes)
+        logger.info("WebDriver queued for teardown")
+    else:
+        close(driver)
+        logger.info("WebDriver closed")
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Hook to add additional information to test reports"""
+    outcome = yield
+    rep = outcome.get_result()
+
+    # Set test result for driver fixture
+    setattr(item, "rep_" + rep.when, rep)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Abort the test when its body runs past its hang deadline (hang_timeout marker, otherwise test_hang_timeout
+    of the config fixture when the test's fixtures load it). Only the call phase is watched, so an abort is always reported
+    as a test failure and never lands in fixture setup or teardown"""
+    marker = item.get_closest_marker("hang_timeout")
+    timeout = marker.args[0] if marker else getattr(item.funcargs.get("config"), "test_hang_timeout", None)
+    if not timeout:
+        yield
+        return
+
+    from core_project.core.base.hang_watchdog import HangWatchdog
+    watchdog = HangWatchdog(item.nodeid, timeout, lambda: item.funcargs.get("driver")).start()
+    try:
+        yield
+    finally:
+        watchdog.cancel()
 
+    if watchdog.fired:
+        import allure
+        for path in watchdog.artifacts:
+            allure.attach.file(path, name=os.path.basename(path))
@@ -1,12 +1,61 @@
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import (TimeoutException, StaleElementReferenceException,
+                                        ElementClickInterceptedException, ElementNotInteractableException)
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.common.action_chains import ActionChains
 import allure
 import time
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from core_project.core.utils.log_decorators import log_function_call, log_page_interaction, LoggingMixin
+from core_project.core.base.element_proxy import ElementProxy
+from core_project.core.utils.adaptive_wait import AdaptiveWait
+
+
+# Finds the first match of every locator in one round trip: {name: element or null}
+FIND_LOCATORS_SCRIPT = """
+var locators = arguments[0], visibleOnly = arguments[1], found = {};
+function isVisible(element) {
+    if (!element.getClientRects().length) { return false; }
+    var style = window.getComputedStyle(element);
+    return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+}
+function candidates(by, value) {
+    switch (by) {
+        case 'id': return document.querySelectorAll('[id="' + CSS.escape(value) + '"]');
+        case 'css selector': return document.querySelectorAll(value);
+        case 'name': return document.getElementsByName(value);
+        case 'class name': return document.getElementsByClassName(value);
+        case 'tag name': return document.getElementsByTagName(value);
+        case 'link text':
+        case 'partial link text':
+            return Array.prototype.filter.call(document.getElementsByTagName('a'), function (link) {
+                var text = link.innerText.trim();
+                return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+            });
+        case 'xpath':
+            var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+            return nodes;
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+locators.forEach(function (locator) {
+    var elements = candidates(locator[1], locator[2]);
+    found[locator[0]] = null;
+    for (var i = 0; i < elements.length; i++) {
+        if (!visibleOnly || isVisible(elements[i])) { found[locator[0]] = elements[i]; break; }
+    }
+});
+return found;
+"""
+
+# Condition a cached element must still meet to be reused, by the wait that found it
+ELEMENT_CONDITIONS = {
+    "wait_for_element": lambda element: True,
+    "wait_for_element_visible": lambda element: element.is_displayed(),
+    "wait_for_element_clickable": lambda element: element.is_displayed() and element.is_enabled(),
+}
 
 
 class BasePage(LoggingMixin):
@@ -15,42 +64,111 @@ class BasePage(LoggingMixin):
     def __init__(self, driver):
         self.driver = driver
         self.timeout = 15
-        self._wait = WebDriverWait(self.driver, self.timeout)
+        self._wait = AdaptiveWait(self.driver, self.timeout)
         self.actions = ActionChains(self.driver)
+        self._elements: Dict[Tuple[Tuple[str, str], str], ElementProxy] = {}
         self.logger.debug(f"Initialized {self.__class__.__name__}")
 
     @log_function_call(log_args=False, log_time=True)
     def wait_for_element(self, locator: Tuple[str, str], timeout: int = None) -> WebElement:
         """Custom wait for element with retry logic"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="wait_for_element")
         return wait.until(EC.presence_of_element_located(locator))
 
     @log_function_call(log_args=False, log_time=True)
     def wait_for_element_clickable(self, locator: Tuple[str, str], timeout: int = None) -> WebElement:
         """Wait for element to be clickable"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="wait_for_element_clickable")
         return wait.until(EC.element_to_be_clickable(locator))
 
     @log_function_call(log_args=False)
     def wait_for_element_visible(self, locator: Tuple[str, str], timeout: int = None) -> WebElement:
         """Wait for element to be visible"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="wait_for_element_visible")
         return wait.until(EC.visibility_of_element_located(locator))
 
+    def find_locators(self, locators: Dict[str, Tuple[str, str]],
+                      visible: bool = True) -> Dict[str, Optional[WebElement]]:
+        """First matching element of every locator, all found in one script call"""
+        return self.driver.execute_script(
+            FIND_LOCATORS_SCRIPT, [[name, by, value] for name, (by, value) in locators.items()], visible)
+
+    @log_function_call(log_args=False, log_time=True)
+    def wait_for_any(self, locators: Dict[str, Tuple[str, str]], timeout: int = None,
+                     visible: bool = True) -> Tuple[str, WebElement]:
+        """Wait until any locator matches, returns its name and element (earlier names win ties)"""
+        def any_found(driver):
+            found = self.find_locators(locators, visible)
+            return next(((name, found[name]) for name in locators if found.get(name) is not None), False)
+
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="wait_for_any")
+        try:
+            return wait.until(any_found)
+        except TimeoutException:
+            raise TimeoutException(f"None of {list(locators)} found within {timeout or self.timeout}s")
+
+    @log_function_call(log_args=False, log_time=True)
+    def wait_for_all(self, locators: Dict[str, Tuple[str, str]], timeout: int = None,
+                     visible: bool = True) -> Dict[str, WebElement]:
+        """Wait until every locator matches, returns elements by name"""
+        missing = list(locators)
+
+        def all_found(driver):
+            found = self.find_locators(locators, visible)
+            missing[:] = [name for name in locators if found.get(name) is None]
+            return found if not missing else False
+
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="wait_for_all")
+        try:
+            return wait.until(all_found)
+        except TimeoutException:
+            raise TimeoutException(f"{missing} not found within {timeout or self.timeout}s")
+
+    def element(self, locator: Tuple[str, str], wait: Callable = None) -> ElementProxy:
+        """Cached element for locator, found with wait (presence by default) on first use, when stale
+        and when it no longer meets the condition of wait; other waits find the element on every use"""
+        wait = wait or self.wait_for_element
+        key = (locator, wait.__name__)
+        proxy = self._elements.get(key)
+        if proxy is None:
+            ready = ELEMENT_CONDITIONS.get(wait.__name__, lambda element: False)
+            proxy = self._elements[key] = ElementProxy(locator, wait, ready)
+        return proxy
+
+    def invalidate_elements(self) -> None:
+        """Forget cached elements, called on navigation and frame switches"""
+        for proxy in self._elements.values():
+            proxy.invalidate()
+
+    def switch_to_frame(self, frame) -> None:
+        """Switch into frame (locator, element, name or index)"""
+        if isinstance(frame, tuple):
+            frame = self.wait_for_element(frame)
+        self.driver.switch_to.frame(frame)
+        self.invalidate_elements()
+
+    def switch_to_default_content(self) -> None:
+        """Switch back to the top-level document"""
+        self.driver.switch_to.default_content()
+        self.invalidate_elements()
+
     @log_function_call(log_args=False)
     def click_with_retry(self, locator: Tuple[str, str], retries: int = 3) -> None:
-        """Click element with retry for stale element references"""
+        """Click element, finding it again if it went stale or was not clickable yet"""
+        proxy = self.element(locator, self.wait_for_element_clickable)
         for attempt in range(retries):
             try:
-                element = self.wait_for_element_clickable(locator)
-                element.click()
+                proxy.click()
                 self.logger.debug(f"Successfully clicked element on attempt {attempt + 1}")
                 return
-            except StaleElementReferenceException:
+            except (StaleElementReferenceException, ElementClickInterceptedException,
+                    ElementNotInteractableException) as e:
                 if attempt == retries - 1:
                     self.logger.error(f"Failed to click element after {retries} attempts")
                     raise
-                self.logger.warning(f"Stale element detected, retrying {attempt + 1}/{retries}")
+                # A cached element may be covered or disabled now, wait until it is clickable again
+                proxy.invalidate()
+                self.logger.warning(f"{e.__class__.__name__} on click, retrying {attempt + 1}/{retries}")
 
     @log_page_interaction("Safe click on element")
     def safe_click(self, locator: Tuple[str, str]) -> None:
@@ -59,8 +177,7 @@ class BasePage(LoggingMixin):
             self.click_with_retry(locator)
         except Exception as e:
             self.logger.warning(f"Standard click failed, trying JavaScript: {e}")
-            element = self.wait_for_element(locator)
-            self.driver.execute_script("arguments[0].click();", element)
+            self.element(locator).perform(lambda element: self.driver.execute_script("arguments[0].click();", element))
 
     @log_function_call(log_args=False)
     def is_element_present(self, locator: Tuple[str, str], timeout: int = None) -> bool:
@@ -84,13 +201,12 @@ class BasePage(LoggingMixin):
     @log_function_call(log_result=True)
     def get_element_text(self, locator: Tuple[str, str]) -> str:
         """Safely get element text"""
-        element = self.wait_for_element_visible(locator)
-        return element.text.strip()
+        return self.element(locator, self.wait_for_element_visible).text.strip()
 
     @log_page_interaction("Type text into field")
     def type_text(self, locator: Tuple[str, str], text: str) -> None:
         """Type text into field with clearing"""
-        element = self.wait_for_element_clickable(locator)
+        element = self.element(locator, self.wait_for_element_clickable)
         element.clear()
         element.send_keys(text)
         self.logger.debug(f"Typed text into field")
@@ -104,13 +220,15 @@ class BasePage(LoggingMixin):
     @log_function_call()
     def scroll_to_element(self, locator: Tuple[str, str]) -> None:
         """Scroll to element"""
-        element = self.wait_for_element(locator)
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        self.element(locator).perform(
+            lambda element: self.driver.execute_script("arguments[0].scrollIntoView(true);", element))
 
     @log_function_call(log_time=True)
     def wait_for_page_to_load(self, timeout: int = None) -> bool:
         """Wait for page to fully load"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        # Called after navigation, elements of the previous document are gone
+        self.invalidate_elements()
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="wait_for_page_to_load")
         try:
             return wait.until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
@@ -122,7 +240,7 @@ class BasePage(LoggingMixin):
     @log_function_call(log_time=True)
     def wait_for_url_contains(self, text: str, timeout: int = None) -> bool:
         """Wait for URL to contain specific text"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="wait_for_url_contains")
         try:
             return wait.until(EC.url_contains(text))
         except TimeoutException:
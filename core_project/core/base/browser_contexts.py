@@ -0,0 +1,260 @@
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+import websocket
+from core_project.core.utils.log_decorators import LoggingMixin
+
+try:
+    import fcntl
+except ImportError:  # Windows: a shared browser cannot be coordinated between workers
+    fcntl = None
+
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chrome", "chromium", "chromium-browser")
+
+
+def find_chrome_binary() -> str:
+    """Chrome executable from CHROME_BINARY or PATH"""
+    binary = os.environ.get("CHROME_BINARY")
+    if binary:
+        return binary
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise RuntimeError("Chrome binary not found, set CHROME_BINARY")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedBrowser(LoggingMixin):
+    """One Chrome process per machine, xdist workers attach to it over its DevTools port.
+    The last worker to release it stops the browser"""
+
+    def __init__(self, state_dir: str, profile: Dict[str, Any], headless: bool = True,
+                 binary: Optional[str] = None, startup_timeout: float = 20):
+        if fcntl is None:
+            raise RuntimeError("Shared browser requires a POSIX system")
+        self.state_dir = os.path.abspath(state_dir)
+        self.profile = profile
+        self.headless = headless
+        self.binary = binary
+        self.startup_timeout = startup_timeout
+        self.state: Optional[Dict[str, Any]] = None
+
+    @property
+    def clients_dir(self) -> str:
+        return os.path.join(self.state_dir, "clients")
+
+    @property
+    def state_file(self) -> str:
+        return os.path.join(self.state_dir, "browser.json")
+
+    @property
+    def debugger_address(self) -> str:
+        return f"127.0.0.1:{self.state['port']}"
+
+    def acquire(self) -> str:
+        """Register this process as a client, launching Chrome if no live one exists; returns debugger address"""
+        os.makedirs(self.clients_dir, exist_ok=True)
+        with self._lock():
+            state = self._read_state()
+            if state is None or not self._is_alive(state):
+                state = self._launch()
+            open(os.path.join(self.clients_dir, str(os.getpid())), "w").close()
+        self.state = state
+        return self.debugger_address
+
+    def release(self) -> None:
+        """Unregister this process, stopping Chrome when no other worker uses it"""
+        with self._lock():
+            own = os.path.join(self.clients_dir, str(os.getpid()))
+            if os.path.exists(own):
+                os.remove(own)
+            # Workers that crashed never released, they do not keep the browser alive
+            clients = []
+            for name in os.listdir(self.clients_dir):
+                if _pid_alive(int(name)):
+                    clients.append(name)
+                else:
+                    os.remove(os.path.join(self.clients_dir, name))
+            if clients:
+                return
+            state = self._read_state()
+            if state is not None:
+                self._stop(state)
+                os.remove(self.state_file)
+
+    def _launch(self) -> Dict[str, Any]:
+        port = _free_port()
+        user_data_dir = tempfile.mkdtemp(prefix="shared-chrome-")
+        width, height = self.profile["window_size"]
+        args = [self.binary or find_chrome_binary(), f"--remote-debugging-port={port}",
+                f"--user-data-dir={user_data_dir}", f"--window-size={width},{height}"]
+        if self.headless:
+            args.append("--headless=new")
+        args += self.profile.get("chrome_args", [])
+        args.append("about:blank")
+
+        # Own session so a worker's Ctrl+C does not reach the browser other workers still use
+        process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        state = {"pid": process.pid, "port": port, "user_data_dir": user_data_dir}
+        deadline = time.monotonic() + self.startup_timeout
+        while not self._is_alive(state):
+            if process.poll() is not None or time.monotonic() > deadline:
+                self._stop(state)
+                raise RuntimeError(f"Shared Chrome did not start on port {port}")
+            time.sleep(0.1)
+
+        with open(self.state_file, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        self.logger.info(f"Started shared Chrome (pid {process.pid}) on port {port}")
+        return state
+
+    def _stop(self, state: Dict[str, Any]) -> None:
+        try:
+            os.killpg(state["pid"], signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+        shutil.rmtree(state["user_data_dir"], ignore_errors=True)
+        self.logger.info(f"Stopped shared Chrome (pid {state['pid']})")
+
+    def _read_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _is_alive(state: Dict[str, Any]) -> bool:
+        if not _pid_alive(state["pid"]):
+            return False
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{state['port']}/json/version", timeout=1):
+                return True
+        except OSError:
+            return False
+
+    @contextmanager
+    def _lock(self):
+        with open(os.path.join(self.state_dir, "lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class DevToolsConnection:
+    """Browser-level DevTools websocket, independent of any WebDriver session. Not thread-safe"""
+
+    def __init__(self, socket):
+        self.socket = socket
+        self._last_id = 0
+
+    @classmethod
+    def connect(cls, address: str, timeout: float = 10) -> "DevToolsConnection":
+        """Connect to the browser endpoint listed by /json/version of the debugger address"""
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout) as response:
+            url = json.load(response)["webSocketDebuggerUrl"]
+        # Chrome refuses websocket handshakes with an Origin header unless started with --remote-allow-origins
+        return cls(websocket.create_connection(url, timeout=timeout, suppress_origin=True))
+
+    def execute(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._last_id += 1
+        command_id = self._last_id
+        self.socket.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+        while True:
+            # Events arriving before the reply have no id
+            message = json.loads(self.socket.recv())
+            if message.get("id") == command_id:
+                break
+        if "error" in message:
+            raise RuntimeError(f"{method} failed: {message['error'].get('message')}")
+        return message["result"]
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+class BrowserContextPool(LoggingMixin):
+    """Hands out WebDriver sessions that each own an isolated browser context (separate cookies and storage)
+    in the shared Chrome. Thread-safe, so one worker can run several sessions at once"""
+
+    def __init__(self, shared_browser: SharedBrowser, reuse_service: bool = True):
+        self.shared_browser = shared_browser
+        self.reuse_service = reuse_service
+        self.devtools: Optional[DevToolsConnection] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "BrowserContextPool":
+        address = self.shared_browser.acquire()
+        # Contexts are created and disposed over the browser endpoint, test sessions can close at any time
+        self.devtools = DevToolsConnection.connect(address)
+        return self
+
+    def open(self):
+        """New session attached to a fresh browser context"""
+        from .webdriver_factory import attach_driver
+        width, height = self.shared_browser.profile["window_size"]
+        with self._lock:
+            context_id = self.devtools.execute(
+                "Target.createBrowserContext", {"disposeOnDetach": False})["browserContextId"]
+            target_id = self.devtools.execute(
+                "Target.createTarget",
+                {"url": "about:blank", "browserContextId": context_id, "width": width, "height": height})["targetId"]
+
+        # The session lists only this context's pages, the other workers' pages stay out of window_handles
+        driver = attach_driver(self.shared_browser.debugger_address, self.reuse_service, context_id)
+        # ChromeDriver window handles are DevTools target ids
+        driver.switch_to.window(target_id)
+        driver.browser_context_pool = self
+        self.logger.debug(f"Opened browser context {context_id}")
+        return driver
+
+    def close(self, driver) -> None:
+        """End the session and dispose its context with every page opened in it"""
+        try:
+            driver.quit()
+        finally:
+            if not getattr(driver, "browser_context_disposed", False):
+                self._dispose(driver)
+
+    def abort(self, driver) -> None:
+        """Dispose the context under a session that is stuck, its pending command fails"""
+        self._dispose(driver)
+
+    def _dispose(self, driver) -> None:
+        with self._lock:
+            self.devtools.execute("Target.disposeBrowserContext", {"browserContextId": driver.browser_context_id})
+        driver.browser_context_disposed = True
+        self.logger.debug(f"Disposed browser context {driver.browser_context_id}")
+
+    def stop(self) -> None:
+        if self.devtools is not None:
+            self.devtools.close()
+            self.devtools = None
+        self.shared_browser.release()
@@ -0,0 +1,56 @@
+from typing import Callable, Optional, Tuple, TypeVar
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
+
+T = TypeVar("T")
+
+
+class ElementProxy:
+    """WebElement found on first use and kept for later actions, found again from its locator when stale
+    or when it no longer passes ready (e.g. hidden or disabled since the wait that found it)"""
+
+    def __init__(self, locator: Tuple[str, str], find: Callable[[Tuple[str, str]], WebElement],
+                 ready: Optional[Callable[[WebElement], bool]] = None):
+        self.locator = locator
+        self._find = find
+        self._ready = ready
+        self._element = None
+        self.lookups = 0
+
+    @property
+    def element(self) -> WebElement:
+        """Underlying WebElement, e.g. for execute_script arguments"""
+        if self._element is not None and not self._still_ready():
+            self._element = None
+        if self._element is None:
+            self._element = self._find(self.locator)
+            self.lookups += 1
+        return self._element
+
+    def invalidate(self) -> None:
+        self._element = None
+
+    def perform(self, action: Callable[[WebElement], T]) -> T:
+        """Run action on the element, finding it again once if the page replaced it"""
+        try:
+            return action(self.element)
+        except StaleElementReferenceException:
+            self.invalidate()
+            return action(self.element)
+
+    def __getattr__(self, name: str):
+        value = self.perform(lambda element: getattr(element, name))
+        if not callable(value):
+            return value
+        return lambda *args, **kwargs: self.perform(lambda element: getattr(element, name)(*args, **kwargs))
+
+    def __repr__(self) -> str:
+        return f"ElementProxy({self.locator!r}, cached={self._element is not None})"
+
+    def _still_ready(self) -> bool:
+        if self._ready is None:
+            return True
+        try:
+            return self._ready(self._element)
+        except StaleElementReferenceException:
+            return False
@@ -0,0 +1,120 @@
+import ctypes
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, List, Optional
+from core_project.core.utils.log_decorators import LoggingMixin
+from core_project.core.utils.report_paths import reports_path
+
+
+class HangTimeout(BaseException):
+    """Raised in a test that passed its hang deadline.
+    BaseException so retry decorators catching Exception do not swallow it"""
+
+
+def format_thread_stacks() -> str:
+    """Python stack of every thread"""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    parts = []
+    for thread_id, frame in sys._current_frames().items():
+        parts.append(f"Thread {names.get(thread_id, thread_id)} ({thread_id}):\n")
+        parts.append("".join(traceback.format_stack(frame)))
+    return "\n".join(parts)
+
+
+class HangWatchdog(LoggingMixin):
+    """Fails a test still running after its deadline: dumps Python stacks, captures the browser if it still
+    answers, then kills the browser so the blocked WebDriver call returns at once"""
+
+    def __init__(self, nodeid: str, timeout: float, get_driver: Callable[[], object] = lambda: None,
+                 report_dir: str = None, capture_timeout: float = 5):
+        self.nodeid = nodeid
+        self.timeout = timeout
+        self.get_driver = get_driver
+        self.report_dir = report_dir or reports_path("hangs")
+        self.capture_timeout = capture_timeout
+        self.fired = False
+        self.artifacts: List[str] = []
+        self._thread_id = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def start(self) -> "HangWatchdog":
+        self._thread_id = threading.get_ident()
+        self._timer = threading.Timer(self.timeout, self._fire)
+        self._timer.name = "hang-watchdog"
+        self._timer.daemon = True
+        self._timer.start()
+        return self
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._finished = True
+            self._timer.cancel()
+            if self.fired:
+                # The test ended on its own before the pending exception was delivered
+                self._set_async_exception(None)
+
+    def _fire(self) -> None:
+        with self._lock:
+            if self._finished:
+                return
+            self.fired = True
+        self.logger.error(f"{self.nodeid} still running after {self.timeout}s, aborting")
+
+        base_path = os.path.join(self.report_dir, f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', self.nodeid)}_{int(time.time())}")
+        os.makedirs(self.report_dir, exist_ok=True)
+        with open(f"{base_path}_stacks.txt", "w", encoding="utf-8") as file:
+            file.write(format_thread_stacks())
+        self.artifacts.append(f"{base_path}_stacks.txt")
+
+        driver = self.get_driver()
+        if driver is not None:
+            self._capture(driver, base_path)
+            self._abort(driver)
+
+        with self._lock:
+            if not self._finished:
+                self._set_async_exception(HangTimeout)
+        self.logger.error(f"Hang diagnostics saved: {', '.join(self.artifacts)}")
+
+    def _capture(self, driver, base_path: str) -> None:
+        # The session may be stuck behind the hung command, so give up after capture_timeout
+        def capture():
+            with open(f"{base_path}_url.txt", "w", encoding="utf-8") as file:
+                file.write(driver.current_url)
+            self.artifacts.append(f"{base_path}_url.txt")
+            if driver.save_screenshot(f"{base_path}.png"):
+                self.artifacts.append(f"{base_path}.png")
+
+        capturer = threading.Thread(target=self._ignore_errors, args=(capture,), name="hang-capture", daemon=True)
+        capturer.start()
+        capturer.join(self.capture_timeout)
+        if capturer.is_alive():
+            self.logger.warning("Browser not responding, state not captured")
+
+    def _abort(self, driver) -> None:
+        pool = getattr(driver, "browser_context_pool", None)
+        if pool is not None:
+            # Shared browser: close only this test's context
+            self._ignore_errors(pool.abort, driver)
+            return
+        from core_project.core.base.driver_reaper import session_process_ids
+        from core_project.core.utils.process_tree import kill_tree
+        killed = kill_tree(session_process_ids(driver))
+        self.logger.error(f"Killed browser processes: {sorted(killed)}")
+
+    def _set_async_exception(self, exception: Optional[type]) -> None:
+        # Delivered once the test thread runs Python code again, i.e. as soon as the blocked call returns
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self._thread_id),
+                                                   ctypes.py_object(exception) if exception else None)
+
+    def _ignore_errors(self, function: Callable, *args) -> None:
+        try:
+            function(*args)
+        except Exception as e:
+            self.logger.debug(f"Hang diagnostics step failed: {e}")
@@ -0,0 +1,296 @@
+import copy
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Set
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchWindowException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.remote.switch_to import SwitchTo
+from core_project.core.utils.logger import LoggerConfig
+from core_project.core.utils.warm_profile import WarmProfile
+
+# Chrome switches that stop background work unrelated to the page under test
+CHROME_QUIET_ARGS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-breakpad",
+    "--disable-client-side-phishing-detection",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-domain-reliability",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-hang-monitor",
+    "--disable-ipc-flooding-protection",
+    "--disable-popup-blocking",
+    "--disable-prompt-on-repost",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,InterestFeedContentSuggestions,"
+    "CalculateNativeWinOcclusion,AutofillServerCommunication",
+    "--metrics-recording-only",
+    "--password-store=basic",
+    "--use-mock-keychain",
+    "--mute-audio"
+]
+
+# Firefox preferences with the same purpose
+FIREFOX_QUIET_PREFS = {
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "browser.startup.page": 0,
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "extensions.update.enabled": False,
+    "network.captive-portal-service.enabled": False
+}
+
+# headless: True/False forces the mode (logged when it overrides the requested one), None follows --headless and config
+# window: "size" uses window_size at launch, "maximize" maximizes headed windows, "none" leaves the default
+BROWSER_PROFILES = {
+    "fast-headless": {
+        "headless": True,
+        "window": "size",
+        "window_size": [1920, 1080],
+        "chrome_args": ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--hide-scrollbars"]
+                       + CHROME_QUIET_ARGS,
+        "firefox_prefs": FIREFOX_QUIET_PREFS
+    },
+    "debug": {
+        # Headed unless --headless is given, the default profile of headed runs
+        "headless": None,
+        "window": "maximize",
+        "window_size": [1920, 1080],
+        "chrome_args": ["--no-sandbox", "--disable-dev-shm-usage", "--no-first-run", "--no-default-browser-check"],
+        "firefox_prefs": {}
+    },
+    "parity": {
+        # Closest to a real user's browser: no background features disabled
+        "headless": None,
+        "window": "size",
+        "window_size": [1920, 1080],
+        "chrome_args": ["--no-sandbox", "--disable-dev-shm-usage"],
+        "firefox_prefs": {}
+    }
+}
+
+
+class ReusableServiceMixin:
+    """Driver service kept running across sessions, driver.quit() leaves the process alive"""
+
+    def start(self) -> None:
+        process = getattr(self, "process", None)
+        if process is not None and process.poll() is None:
+            return
+        super().start()
+
+    def stop(self) -> None:
+        # Called by driver.quit()
+        pass
+
+    def shutdown(self) -> None:
+        super().stop()
+
+
+class ReusableChromeService(ReusableServiceMixin, ChromeService):
+    pass
+
+
+class ReusableFirefoxService(ReusableServiceMixin, FirefoxService):
+    pass
+
+
+REUSABLE_SERVICES = {"chrome": ReusableChromeService, "firefox": ReusableFirefoxService}
+
+
+class BrowserContextSwitchTo(SwitchTo):
+    """Refuses to switch a browser context session to a page of another context"""
+
+    def window(self, window_name: str) -> None:
+        if window_name in self._driver.foreign_window_handles():
+            raise NoSuchWindowException(f"Window {window_name} belongs to another browser context")
+        super().window(window_name)
+
+
+class BrowserContextChrome(webdriver.Chrome):
+    """Chrome session attached to a shared browser. With browser_context_id set it only sees the pages of
+    that context: ChromeDriver lists every page target of the browser, other workers' pages included"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.browser_context_id: Optional[str] = None
+        self._switch_to = BrowserContextSwitchTo(self)
+
+    @property
+    def window_handles(self) -> List[str]:
+        handles = super().window_handles
+        if self.browser_context_id is None:
+            return handles
+        owned = self._context_targets()
+        return [handle for handle in handles if handle in owned]
+
+    def foreign_window_handles(self) -> List[str]:
+        """Handles of pages that belong to other browser contexts"""
+        if self.browser_context_id is None:
+            return []
+        owned = self._context_targets()
+        return [handle for handle in super().window_handles if handle not in owned]
+
+    def _context_targets(self) -> Set[str]:
+        # ChromeDriver window handles are DevTools target ids
+        targets = self.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]
+        return {target["targetId"] for target in targets
+                if target.get("browserContextId") == self.browser_context_id}
+
+
+# One driver service per browser and process, i.e. per xdist worker
+_services: Dict[str, ReusableServiceMixin] = {}
+_services_lock = threading.Lock()
+
+
+def get_service(browser: str, options) -> ReusableServiceMixin:
+    """Running driver service for this process, the driver binary is resolved once per run"""
+    browser = browser.lower()
+    with _services_lock:
+        service = _services.get(browser)
+        if service is None:
+            service = REUSABLE_SERVICES[browser]()
+            service.path = _driver_path(service, options)
+            _services[browser] = service
+            logger = LoggerConfig.get_logger(__name__)
+            logger.info(f"Starting shared {browser} driver service: {service.path}")
+        # Restarts the process if it died with a crashed session
+        service.start()
+        return service
+
+
+def shutdown_services() -> None:
+    """Stop driver services started by get_service()"""
+    with _services_lock:
+        for browser, service in _services.items():
+            try:
+                service.shutdown()
+            except Exception as e:
+                logger = LoggerConfig.get_logger(__name__)
+                logger.warning(f"Failed to stop {browser} driver service: {e}")
+        _services.clear()
+
+
+def _driver_path(service, options) -> str:
+    # Selenium Manager lookup, the result is stored on the service so later sessions skip it
+    from selenium.webdriver.common.driver_finder import DriverFinder
+    return DriverFinder.get_path(service, options)
+
+
+def resolve_profile(name: str, overrides: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Profile defined in code with keys overridden from config"""
+    overrides = overrides or {}
+    if name not in BROWSER_PROFILES and name not in overrides:
+        raise ValueError(f"Unknown browser profile: {name}")
+    profile = copy.deepcopy(BROWSER_PROFILES.get(name, BROWSER_PROFILES["parity"]))
+    profile.update(copy.deepcopy(overrides.get(name, {})))
+    profile["name"] = name
+    return profile
+
+
+def create_driver(browser: str = "chrome", profile: Dict[str, Any] = None, headless: bool = False,
+                  warm_profile: Optional[WarmProfile] = None, reuse_service: bool = False):
+    """Start a browser with the given launch profile, from a copy of the warm profile template if given.
+    With reuse_service the session is opened against this process' long-lived driver service"""
+    profile = profile or resolve_profile("parity")
+    if profile["headless"] is not None and profile["headless"] != headless:
+        logger = LoggerConfig.get_logger(__name__)
+        logger.info(f"Browser profile {profile['name']} forces headless={profile['headless']}, "
+                    f"requested headless={headless}")
+        headless = profile["headless"]
+
+    if warm_profile is None:
+        return _launch(browser, profile, headless, reuse_service=reuse_service)
+
+    warm_profile.ensure_template(
+        lambda user_data_dir, cache_dir: _launch(browser, profile, headless, user_data_dir, cache_dir,
+                                                reuse_service))
+    user_data_dir, cache_dir, session_root = warm_profile.checkout()
+    try:
+        driver = _launch(browser, profile, headless, user_data_dir, cache_dir, reuse_service)
+    except Exception:
+        shutil.rmtree(session_root, ignore_errors=True)
+        raise
+    driver.session_root = session_root
+    return driver
+
+
+def attach_driver(debugger_address: str, reuse_service: bool = False, browser_context_id: Optional[str] = None):
+    """Session on a Chrome already listening on host:port, quitting it leaves the browser running.
+    With browser_context_id the session only lists and switches to the pages of that browser context"""
+    options = Options()
+    options.add_experimental_option("debuggerAddress", debugger_address)
+    service = get_service("chrome", options) if reuse_service else None
+    driver = BrowserContextChrome(options=options, service=service)
+    driver.browser_context_id = browser_context_id
+    return driver
+
+
+def quit_driver(driver) -> None:
+    """Quit browser and remove its per-session profile copy"""
+    driver.quit()
+    session_root = getattr(driver, "session_root", None)
+    if session_root:
+        shutil.rmtree(session_root, ignore_errors=True)
+
+
+def _launch(browser: str, profile: Dict[str, Any], headless: bool, user_data_dir: Optional[str] = None,
+            cache_dir: Optional[str] = None, reuse_service: bool = False):
+    width, height = profile["window_size"]
+
+    if browser.lower() == "chrome":
+        options = Options()
+        if headless:
+            options.add_argument("--headless=new")
+        for argument in profile.get("chrome_args", []):
+            options.add_argument(argument)
+        if profile["window"] == "size":
+            options.add_argument(f"--window-size={width},{height}")
+        if user_data_dir:
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+        if cache_dir:
+            options.add_argument(f"--disk-cache-dir={cache_dir}")
+        service = get_service(browser, options) if reuse_service else None
+        driver = webdriver.Chrome(options=options, service=service)
+    elif browser.lower() == "firefox":
+        options = FirefoxOptions()
+        if headless:
+            options.add_argument("--headless")
+        for name, value in profile.get("firefox_prefs", {}).items():
+            options.set_preference(name, value)
+        if profile["window"] == "size":
+            options.add_argument(f"--width={width}")
+            options.add_argument(f"--height={height}")
+        if user_data_dir:
+            options.add_argument("-profile")
+            options.add_argument(user_data_dir)
+        if cache_dir:
+            options.set_preference("browser.cache.disk.parent_directory", cache_dir)
+        service = get_service(browser, options) if reuse_service else None
+        driver = webdriver.Firefox(options=options, service=service)
+    else:
+        raise ValueError(f"Unsupported browser: {browser}")
+
+    # Maximizing a headless window has no effect and costs a round trip
+    if profile["window"] == "maximize" and not headless:
+        driver.maximize_window()
+
+    logger = LoggerConfig.get_logger(__name__)
+    logger.info(f"Started {browser} with profile {profile['name']} (headless: {headless}, "
+                f"user data: {user_data_dir or 'temporary'}, shared service: {reuse_service})")
+    return driver
@@ -46,4 +46,60 @@ class Config:
 
     @property
     def timeout(self):
-        return self.get('timeout', 15)
\ No newline at end of file
+        return self.get('timeout', 15)
+
+    @property
+    def browser_profile(self):
+        return self.get('browser_profile')
+
+    @property
+    def browser_profiles(self):
+        return self.get('browser_profiles', {})
+
+    @property
+    def browser_cache_mode(self):
+        return self.get('browser_cache_mode', 'cold')
+
+    @property
+    def browser_template_dir(self):
+        return self.get('browser_template_dir', 'reports/browser-template')
+
+    @property
+    def browser_shared_cache(self):
+        return self.get('browser_shared_cache', True)
+
+    @property
+    def browser_warmup_urls(self):
+        return self.get('browser_warmup_urls', [self.base_url])
+
+    @property
+    def driver_service_reuse(self):
+        return self.get('driver_service_reuse', True)
+
+    @property
+    def driver_mode(self):
+        return self.get('driver_mode', 'browser')
+
+    @property
+    def shared_browser_dir(self):
+        return self.get('shared_browser_dir', 'reports/shared-browser')
+
+    @property
+    def driver_async_quit(self):
+        return self.get('driver_async_quit', True)
+
+    @property
+    def driver_quit_timeout(self):
+        return self.get('driver_quit_timeout', 10)
+
+    @property
+    def test_hang_timeout(self):
+        return self.get('test_hang_timeout')
+
+    @property
+    def browser_reuse(self):
+        return self.get('browser_reuse', False)
+
+    @property
+    def browser_memory_limits(self):
+        return self.get('browser_memory_limits', {})
\ No newline at end of file
@@ -1,7 +1,7 @@
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from typing import Callable, Tuple
+from core_project.core.utils.adaptive_wait import AdaptiveWait
 from core_project.core.utils.logger import LoggerConfig
 
 
@@ -9,12 +9,12 @@ class CustomWaits:
     def __init__(self, driver, timeout: int = 10):
         self.driver = driver
         self.timeout = timeout
-        self.wait = WebDriverWait(driver, timeout)
+        self.wait = AdaptiveWait(driver, timeout)
         self.logger = LoggerConfig.get_logger(__name__)
 
     def wait_for_element_to_have_text(self, locator: Tuple[str, str], text: str, timeout: int = None) -> bool:
         """Wait for element to have specific text"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="CustomWaits.wait_for_element_to_have_text")
         try:
             return wait.until(
                 lambda driver: driver.find_element(*locator).text == text
@@ -25,7 +25,7 @@ class CustomWaits:
 
     def wait_for_element_to_contain_text(self, locator: Tuple[str, str], text: str, timeout: int = None) -> bool:
         """Wait for element to contain specific text"""
-        wait = WebDriverWait(self.driver, timeout or self.timeout)
+        wait = AdaptiveWait(self.driver, timeout or self.timeout, name="CustomWaits.wait_for_element_to_contain_text")
         try:
             return wait.until(
                 lambda driver: text in driver.find_element(*locator).text
@@ -0,0 +1,174 @@
+import ast
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from core_project.core.utils.log_decorators import LoggingMixin
+
+
+class DependencyMap(LoggingMixin):
+    """Maps test files to the project modules they import, directly or through other modules"""
+
+    # Changes to these affect every test: files relative to the project root,
+    # directories at any depth (core_project keeps a config/ per site)
+    GLOBAL_FILES = ("conftest.py", "pytest.ini", "requirements.txt")
+    GLOBAL_DIRS = ("config",)
+
+    def __init__(self, project_root: str = ".", source_roots: Optional[List[str]] = None,
+                 cache_path: str = "reports/dependency_map.json"):
+        self.project_root = Path(project_root).resolve()
+        # core_project modules are imported as core_project.*, so the repository root is a source root too
+        source_roots = source_roots or [self.project_root, self.project_root.parent]
+        self.source_roots = [Path(root).resolve() for root in source_roots]
+        self.cache_path = cache_path
+        self._cache = self._load_cache()
+        self.coverage: Dict[str, Set[str]] = {}
+
+    def test_dependencies(self, test_file: str) -> Set[str]:
+        """Project files the test file depends on, including conftest files above it"""
+        test_path = Path(test_file).resolve()
+        roots = [test_path]
+        directory = test_path.parent
+        while directory == self.project_root or self.project_root in directory.parents:
+            conftest = directory / "conftest.py"
+            if conftest.exists():
+                roots.append(conftest)
+            directory = directory.parent
+
+        seen: Set[str] = set()
+        stack = [str(path) for path in roots]
+        while stack:
+            path = stack.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            stack.extend(dep for dep in self._direct_imports(path) if dep not in seen)
+        seen.update(self.coverage.get(str(test_path), ()))
+        return seen
+
+    def add_coverage(self, data_file: str = ".coverage") -> bool:
+        """Add files executed per test from coverage contexts (pytest --cov --cov-context=test)"""
+        if not os.path.exists(data_file):
+            return False
+        try:
+            from coverage import CoverageData
+        except ImportError:
+            self.logger.debug("coverage is not installed, using static imports only")
+            return False
+
+        data = CoverageData(basename=data_file)
+        data.read()
+        for measured_file in data.measured_files():
+            for contexts in (data.contexts_by_lineno(measured_file) or {}).values():
+                for context in contexts:
+                    if "::" not in context:
+                        continue
+                    test_file = str((self.project_root / context.split("::")[0]).resolve())
+                    self.coverage.setdefault(test_file, set()).add(str(Path(measured_file).resolve()))
+        self.logger.info(f"Coverage contexts loaded for {len(self.coverage)} test files")
+        return True
+
+    def affected_tests(self, test_files: Iterable[str], changed_files: Iterable[str]) -> Optional[List[str]]:
+        """Test files affected by the changes, None when every test is affected"""
+        changed = {str(Path(path).resolve()) for path in changed_files}
+        for path in changed:
+            if self._is_global(Path(path)):
+                self.logger.info(f"Global change, selecting all tests: {path}")
+                return None
+
+        affected = []
+        for test_file in test_files:
+            if self.test_dependencies(test_file) & changed:
+                affected.append(test_file)
+        self._save_cache()
+        return affected
+
+    def _is_global(self, path: Path) -> bool:
+        try:
+            relative = path.relative_to(self.project_root)
+        except ValueError:
+            return False
+        return str(relative) in self.GLOBAL_FILES or any(part in self.GLOBAL_DIRS for part in relative.parts[:-1])
+
+    def _direct_imports(self, path: str) -> List[str]:
+        """Project files imported by a module, cached by modification time"""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return []
+        cached = self._cache.get(path)
+        if cached and cached["mtime"] == mtime:
+            return cached["imports"]
+
+        imports = sorted(self._resolve_imports(Path(path)))
+        self._cache[path] = {"mtime": mtime, "imports": imports}
+        return imports
+
+    def _resolve_imports(self, path: Path) -> Set[str]:
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        except (OSError, SyntaxError, ValueError) as e:
+            self.logger.warning(f"Cannot parse {path}: {e}")
+            return set()
+
+        resolved = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    resolved.update(self._find_module(alias.name))
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    package = path.parent
+                    for _ in range(node.level - 1):
+                        package = package.parent
+                    bases = [package.joinpath(*node.module.split(".")) if node.module else package]
+                else:
+                    resolved.update(self._find_module(node.module))
+                    bases = [root.joinpath(*node.module.split(".")) for root in self.source_roots]
+                for base in bases:
+                    resolved.update(self._module_files(base))
+                    # "from package import module" imports a submodule
+                    for alias in node.names:
+                        resolved.update(self._module_files(base / alias.name))
+        resolved.discard(str(path))
+        return resolved
+
+    def _find_module(self, name: str) -> Set[str]:
+        found = set()
+        parts = name.split(".")
+        for root in self.source_roots:
+            # Importing a.b.c also runs a/__init__.py and a/b/__init__.py
+            for index in range(1, len(parts) + 1):
+                found.update(self._module_files(root.joinpath(*parts[:index])))
+        return found
+
+    @staticmethod
+    def _module_files(base: Path) -> Set[str]:
+        for candidate in (base.with_suffix(".py"), base / "__init__.py"):
+            if candidate.is_file():
+                return {str(candidate.resolve())}
+        return set()
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self) -> None:
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf-8') as file:
+            json.dump(self._cache, file, indent=1)
+
+
+def changed_files(base: str = "HEAD", cwd: str = ".") -> List[str]:
+    """Files changed against git base, including uncommitted and untracked files"""
+    top_level = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=cwd, check=True,
+                               capture_output=True, text=True).stdout.strip()
+    diff = subprocess.run(["git", "diff", "--name-only", base], cwd=top_level, check=True,
+                          capture_output=True, text=True).stdout.splitlines()
+    untracked = subprocess.run(["git", "ls-files", "--others", "--exclude-standard"], cwd=top_level,
+                               check=True, capture_output=True, text=True).stdout.splitlines()
+    return [os.path.join(top_level, path) for path in diff + untracked if path]
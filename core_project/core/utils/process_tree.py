@@ -0,0 +1,106 @@
+import os
+import signal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Executable names of browsers and their drivers
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "chromedriver", "firefox", "geckodriver")
+
+
+def process_table() -> Dict[int, Tuple[int, str, str]]:
+    """pid -> (parent pid, name, command line) of every process, empty where /proc is not available"""
+    table = {}
+    try:
+        pids = [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return table
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "r", encoding="utf-8", errors="replace") as file:
+                stat = file.read()
+            with open(f"/proc/{pid}/cmdline", "rb") as file:
+                cmdline = file.read().replace(b"\0", b" ").decode("utf-8", errors="replace").strip()
+        except OSError:
+            continue
+        # The name is in parentheses and may contain spaces, fields after it are space separated
+        name = stat[stat.index("(") + 1:stat.rindex(")")]
+        ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        table[pid] = (ppid, name, cmdline)
+    return table
+
+
+def descendants(pids: Iterable[int], table: Optional[Dict[int, Tuple[int, str, str]]] = None) -> Set[int]:
+    """Given processes and all their children, recursively"""
+    table = process_table() if table is None else table
+    children: Dict[int, List[int]] = {}
+    for pid, (ppid, _, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    found = set()
+    stack = [pid for pid in pids if pid in table]
+    while stack:
+        pid = stack.pop()
+        if pid not in found:
+            found.add(pid)
+            stack.extend(children.get(pid, []))
+    return found
+
+
+def find_by_argument(argument: str, table: Optional[Dict[int, Tuple[int, str, str]]] = None) -> Set[int]:
+    """Processes whose command line contains argument"""
+    table = process_table() if table is None else table
+    return {pid for pid, (_, _, cmdline) in table.items() if argument in cmdline}
+
+
+def browser_processes(table: Optional[Dict[int, Tuple[int, str, str]]] = None) -> Dict[int, str]:
+    """pid -> name of running browser and driver processes"""
+    table = process_table() if table is None else table
+    return {pid: name for pid, (_, name, _) in table.items()
+            if any(name.lower().startswith(browser) for browser in BROWSER_PROCESS_NAMES)}
+
+
+def alive(pids: Iterable[int]) -> Set[int]:
+    """Processes that still exist and are not zombies"""
+    table = process_table()
+    if not table:
+        return set()
+    return {pid for pid in pids if pid in table and _state(pid) != "Z"}
+
+
+def kill_tree(pids: Iterable[int]) -> Set[int]:
+    """SIGKILL processes and their descendants, returns the pids signalled"""
+    targets = descendants(pids)
+    for pid in targets:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    return targets
+
+
+def memory_mb(pids: Iterable[int]) -> float:
+    """Memory of processes and their descendants in MB: proportional set size where the kernel reports it,
+    so pages shared between browser processes are not counted several times, resident set size otherwise"""
+    total_kb = 0
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+    for pid in descendants(pids):
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as file:
+                total_kb += next(int(line.split()[1]) for line in file if line.startswith("Pss:"))
+            continue
+        except (OSError, StopIteration):
+            pass
+        try:
+            with open(f"/proc/{pid}/statm", "r", encoding="utf-8") as file:
+                total_kb += int(file.read().split()[1]) * page_kb
+        except OSError:
+            pass
+    return total_kb / 1024
+
+
+def _state(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8", errors="replace") as file:
+            stat = file.read()
+        return stat[stat.rindex(")") + 2:].split()[0]
+    except OSError:
+        return ""
+
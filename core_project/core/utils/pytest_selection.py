@@ -0,0 +1,53 @@
+"""
+Pytest plugin for change-based test selection.
+Runs only the tests whose imported modules changed against a git base.
+"""
+
+import os
+import pytest
+from core_project.core.utils.dependency_map import DependencyMap, changed_files
+from core_project.core.utils.logger import LoggerConfig
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("selection", "change-based test selection")
+    group.addoption(
+        "--changed-only", action="store_true",
+        help="Run only tests affected by files changed against --changed-base"
+    )
+    group.addoption(
+        "--changed-base", action="store", default="HEAD",
+        help="Git revision to diff against, e.g. origin/main (default: uncommitted changes)"
+    )
+    group.addoption(
+        "--coverage-data", action="store", default=".coverage",
+        help="Coverage data recorded with --cov-context=test, refines the import map when present"
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    if not config.getoption("--changed-only") or not items:
+        return
+
+    dependency_map = DependencyMap(str(config.rootpath))
+    dependency_map.add_coverage(config.getoption("--coverage-data"))
+    changed = changed_files(config.getoption("--changed-base"), str(config.rootpath))
+
+    test_files = sorted({str(item.path) for item in items})
+    affected = dependency_map.affected_tests(test_files, changed)
+    if affected is None:
+        return
+
+    affected = set(affected)
+    selected = [item for item in items if str(item.path) in affected]
+    deselected = [item for item in items if str(item.path) not in affected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+    if not hasattr(config, "workerinput"):
+        names = ", ".join(sorted(os.path.relpath(path, config.rootpath) for path in affected)) or "none"
+        logger = LoggerConfig.get_logger(__name__)
+        logger.info(f"Changed-only selection: {len(selected)} of {len(selected) + len(deselected)} tests "
+                    f"from {len(changed)} changed files (affected test files: {names})")
@@ -4,6 +4,8 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../core'))
 
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+from typing import Optional
 from core_project.core.pages.common_components import LoginPage as CoreLoginPage
 import allure
 from core_project.core.utils.log_decorators import log_page_interaction, log_function_call
@@ -14,6 +16,7 @@ class LoginPage(CoreLoginPage):
 
     # Herokuapp specific locators
     FLASH_MESSAGE = (By.ID, "flash")
+    FLASH_ERROR = (By.CSS_SELECTOR, "#flash.error")
     LOGOUT_BUTTON = (By.CSS_SELECTOR, "a.button.secondary.radius")
 
     def __init__(self, driver):
@@ -36,11 +39,22 @@ class LoginPage(CoreLoginPage):
         self.logger.debug(f"Flash message: {message}")
         return message
 
+    @allure.step("Get login outcome")
+    @log_function_call(log_result=True)
+    def get_login_outcome(self, timeout: int = None) -> Optional[str]:
+        """Wait once for either result of a login: 'success' (logout button) or 'failure' (error flash)"""
+        try:
+            outcome, _ = self.wait_for_any({"success": self.LOGOUT_BUTTON, "failure": self.FLASH_ERROR}, timeout)
+            return outcome
+        except TimeoutException:
+            return None
+
     @allure.step("Check if logout button is visible")
     @log_function_call(log_result=True)
     def is_logout_visible(self) -> bool:
         """Check if logout button is visible (Herokuapp specific)"""
-        is_visible = self.is_element_present(self.LOGOUT_BUTTON)
+        # Returns as soon as the error flash shows instead of waiting out the timeout for the button
+        is_visible = self.get_login_outcome() == "success"
         self.logger.debug(f"Logout button visible: {is_visible}")
         return is_visible
 
@@ -49,7 +63,7 @@ class LoginPage(CoreLoginPage):
     def is_logout_not_present(self) -> bool:
         """Verify that logout button is not present on page"""
         try:
-            return not self.is_element_present(self.LOGOUT_BUTTON, timeout=2)
+            return self.get_login_outcome(timeout=2) != "success"
         except Exception as e:
             self.logger.debug(f"Error checking logout absence: {e}")
             return True  # If error the element doesn't present
@@ -0,0 +1,263 @@
+"""
+Test orchestrator for all projects
+Runs Herokuapp and core_project suites concurrently and merges their results
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from core_project.core.utils.logger import LoggerConfig
+from core_project.core.utils.report_paths import REPORTS_DIR_ENV
+
+# Configured in main, importing the orchestrator does not set up logging
+logger = logging.getLogger("run_all")
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORTS_DIR = os.path.join(ROOT_DIR, "reports")
+
+# Project name -> working directory and pytest arguments
+PROJECTS = {
+    "herokuapp": {
+        "cwd": os.path.join(ROOT_DIR, "Herokuapp"),
+        "args": ["tests/"]
+    },
+    "amazon": {
+        "cwd": os.path.join(ROOT_DIR, "core_project"),
+        "args": ["amazon/tests/", "--project=amazon"]
+    },
+    "core-herokuapp": {
+        "cwd": os.path.join(ROOT_DIR, "core_project"),
+        "args": ["herokuapp/tests/", "--project=herokuapp"]
+    }
+}
+
+MODE_MARKERS = {"all": None, "smoke": "smoke", "ui": "ui", "api": "api", "database": "database"}
+
+# pytest exit code when no test matched the selection
+NO_TESTS_COLLECTED = 5
+# Exit code of a suite stopped by its timeout or killed by a signal
+TERMINATED = 124
+# Seconds a timed out suite gets to exit after SIGTERM before it is killed
+KILL_GRACE = 30
+
+
+class Suite:
+    """One pytest run of a project in a given mode"""
+
+    def __init__(self, project, mode="all", workers=None, nice=0, timeout=None):
+        if project not in PROJECTS:
+            raise ValueError(f"Unknown project: {project}")
+        if mode not in MODE_MARKERS:
+            raise ValueError(f"Unknown mode: {mode}")
+        self.project = project
+        self.mode = mode
+        self.workers = workers
+        self.nice = nice
+        self.timeout = timeout
+        self.process = None
+        self.reader = None
+        self.started = None
+        self.duration = None
+        self.returncode = None
+        self.timed_out = False
+
+    @classmethod
+    def parse(cls, spec, nice=0, timeout=None):
+        """Build suite from project[:mode[:workers[:nice[:timeout]]]], empty or missing parts use the defaults"""
+        parts = spec.split(":") + [""] * 4
+        project, mode, workers, suite_nice, suite_timeout = parts[:5]
+        return cls(project, mode or "all", int(workers) if workers else None,
+                   int(suite_nice) if suite_nice else nice, float(suite_timeout) if suite_timeout else timeout)
+
+    @property
+    def name(self):
+        return f"{self.project}-{self.mode}"
+
+    @property
+    def reports_dir(self):
+        """Reports and logs of this suite, kept apart from other suites running in the same project"""
+        return os.path.join(REPORTS_DIR, "runs", self.name)
+
+    @property
+    def allure_dir(self):
+        return os.path.join(self.reports_dir, "allure-results")
+
+    @property
+    def exit_code(self):
+        """Exit code of the run, TERMINATED when the timeout or a signal stopped it"""
+        if self.timed_out or (self.returncode is not None and self.returncode < 0):
+            return TERMINATED
+        return self.returncode
+
+    def build_command(self, env, browser, headless, log_level, pytest_args=()):
+        cmd = [sys.executable, "-m", "pytest"] + PROJECTS[self.project]["args"] + [
+            f"--alluredir={self.allure_dir}",
+            f"--env={env}",
+            f"--browser={browser}",
+            f"--log-level-pytest={log_level}"
+        ]
+        marker = MODE_MARKERS[self.mode]
+        if marker:
+            cmd += ["-m", marker]
+        if self.workers:
+            cmd += ["-n", str(self.workers)]
+        if headless:
+            cmd.append("--headless")
+        return cmd + list(pytest_args)
+
+    def start(self, env, browser, headless, log_level, pytest_args=()):
+        shutil.rmtree(self.allure_dir, ignore_errors=True)
+        cmd = self.build_command(env, browser, headless, log_level, pytest_args)
+        logger.info(f"[{self.name}] {' '.join(cmd)}")
+
+        self.started = time.monotonic()
+        self.process = subprocess.Popen(
+            cmd,
+            cwd=PROJECTS[self.project]["cwd"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env={**os.environ, "PYTHONUNBUFFERED": "1", REPORTS_DIR_ENV: self.reports_dir},
+            preexec_fn=self._limit_resources if os.name == "posix" else None
+        )
+        self.reader = threading.Thread(target=self._stream_output, name=f"{self.name}-output", daemon=True)
+        self.reader.start()
+
+    def poll(self):
+        """Update status, returns True once the suite has finished"""
+        if self.returncode is not None:
+            return True
+        if self.process.poll() is None:
+            elapsed = time.monotonic() - self.started
+            if self.timeout and elapsed > self.timeout and not self.timed_out:
+                logger.error(f"[{self.name}] Timed out after {self.timeout}s, terminating")
+                self.timed_out = True
+                self.process.terminate()
+            elif self.timed_out and elapsed > self.timeout + KILL_GRACE:
+                logger.error(f"[{self.name}] Still running {KILL_GRACE}s after terminate, killing")
+                self.process.kill()
+            return False
+
+        self.reader.join()
+        self.returncode = self.process.returncode
+        self.duration = time.monotonic() - self.started
+        logger.info(f"[{self.name}] Finished with exit code {self.exit_code} in {self.duration:.1f}s")
+        return True
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+
+    def _limit_resources(self):
+        if self.nice:
+            os.nice(self.nice)
+
+    def _stream_output(self):
+        for line in self.process.stdout:
+            sys.stdout.write(f"[{self.name}] {line}")
+            sys.stdout.flush()
+
+
+def merge_allure_results(suites, output_dir=os.path.join(REPORTS_DIR, "allure-results")):
+    """Copy allure results of all suites into one directory"""
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir, exist_ok=True)
+    copied = 0
+    for suite in suites:
+        if not os.path.isdir(suite.allure_dir):
+            continue
+        for file_name in os.listdir(suite.allure_dir):
+            shutil.copy2(os.path.join(suite.allure_dir, file_name), output_dir)
+            copied += 1
+    logger.info(f"Merged {copied} allure result files into {output_dir}")
+    return output_dir
+
+
+def combined_exit_code(suites):
+    """0 when every suite passed or had no matching tests, otherwise the highest failure code;
+    a suite stopped by its timeout or a signal counts as TERMINATED"""
+    failures = [suite.exit_code for suite in suites if suite.exit_code not in (0, NO_TESTS_COLLECTED)]
+    return max(failures) if failures else 0
+
+
+def run_suites(suites, env="dev", browser="chrome", headless=True, log_level="INFO", max_concurrent=None,
+               pytest_args=()):
+    """Run suites concurrently, at most max_concurrent at a time, pytest_args are passed to every suite"""
+    waiting = list(suites)
+    running = []
+    try:
+        while waiting or running:
+            while waiting and (not max_concurrent or len(running) < max_concurrent):
+                suite = waiting.pop(0)
+                suite.start(env, browser, headless, log_level, pytest_args)
+                running.append(suite)
+            running = [suite for suite in running if not suite.poll()]
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        logger.error("Interrupted, stopping running suites")
+        for suite in running:
+            suite.stop()
+            suite.poll()
+        raise
+
+    for suite in suites:
+        logger.info(f"{suite.name:<25} exit code {suite.exit_code:<3} {suite.duration:.1f}s")
+    return combined_exit_code(suites)
+
+
+def main():
+    """Main function to handle command line arguments"""
+    parser = argparse.ArgumentParser(description='Run all project test suites')
+    parser.add_argument('--suites', nargs='+', default=['herokuapp', 'amazon', 'core-herokuapp'],
+                        help='Suites as project[:mode[:workers[:nice[:timeout]]]], '
+                             'e.g. herokuapp:smoke:2 amazon:ui::10:600')
+    parser.add_argument('--env', choices=['dev', 'stage'], default='dev', help='Environment')
+    parser.add_argument('--browser', choices=['chrome', 'firefox'], default='chrome', help='Browser')
+    parser.add_argument('--headless', action='store_true', help='Run in headless mode')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        default='INFO', help='Log level')
+    parser.add_argument('--max-concurrent', type=int, help='Maximum suites running at the same time')
+    parser.add_argument('--nice', type=int, default=0, help='Default scheduling priority increment of the suites')
+    parser.add_argument('--timeout', type=float, help='Default wall time limit per suite in seconds')
+    parser.add_argument('--report', action='store_true', help='Generate Allure report from merged results')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='Run only tests affected by files changed against --changed-base')
+    parser.add_argument('--changed-base', '--changed-since', default='HEAD',
+                        help='Git revision to diff against for --changed-only')
+
+    args = parser.parse_args()
+    LoggerConfig.setup_logging(log_level=args.log_level)
+
+    try:
+        suites = [Suite.parse(spec, args.nice, args.timeout) for spec in args.suites]
+    except ValueError as e:
+        logger.error(e)
+        return 1
+
+    pytest_args = ["--changed-only", f"--changed-base={args.changed_base}"] if args.changed_only else []
+    logger.info(f"Running suites: {', '.join(suite.name for suite in suites)}")
+    exit_code = run_suites(suites, args.env, args.browser, args.headless, args.log_level, args.max_concurrent,
+                           pytest_args)
+    results_dir = merge_allure_results(suites)
+
+    if args.report:
+        try:
+            subprocess.run(["allure", "generate", results_dir, "-o", os.path.join(REPORTS_DIR, "allure-report"),
+                            "--clean"], check=True)
+            logger.info(f"Allure report generated: {os.path.join(REPORTS_DIR, 'allure-report', 'index.html')}")
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            logger.error(f"Allure report generation failed: {e}")
+
+    logger.info(f"Combined exit code: {exit_code}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())